@@ -1,2 +1,89 @@
-from .client import *
-from .oauth import *
\ No newline at end of file
+'''
+Submodules are imported the first time one of their names is used (PEP 562), so
+`import SpotifyAPI` does not pull in requests, asyncio, http.server etc. until they are
+needed, and `from SpotifyAPI import SpotifyClient` only loads the client.
+'''
+import importlib
+
+# name: submodule it is defined in
+EXPORTS = {
+    "SpotifyClient": "client",
+    "EndpointTemplate": "endpoints",
+    "ENDPOINTS": "endpoints",
+    "add_endpoint_methods": "endpoints",
+    "ResponseCache": "cache",
+    "InterningDecoder": "interning",
+    "BloomFilter": "negative",
+    "NegativeCache": "negative",
+    "SpotifyOAuth": "oauth",
+    "SpotifyPKCE": "oauth",
+    "JPEG_SIGNATURE": "images",
+    "MAX_COVER_SIZE": "images",
+    "CoverImage": "images",
+    "Base64Stream": "images",
+    "prepare_cover_image": "images",
+    "CoverUploadResult": "images",
+    "CoverUploadReport": "images",
+    "upload_cover_images": "images",
+    "SEARCH_TYPES": "search",
+    "search_stream": "search",
+    "MatchIndex": "matching",
+    "IdSet": "ids",
+    "URI_TYPES": "ids",
+    "encode_ids": "ids",
+    "decode_ids": "ids",
+    "validate_ids": "ids",
+    "encode_uris": "ids",
+    "decode_uris": "ids",
+    "validate_uris": "ids",
+    "to_id_list": "ids",
+    "base62_to_int": "ids",
+    "int_to_base62": "ids",
+    "crawl_related_artists": "crawler",
+    "fetch_discography": "discography",
+    "MarketVariants": "markets",
+    "fetch_market_variants": "markets",
+    "PlaybackWatcher": "playback",
+    "PLAYBACK_COMMANDS": "playback",
+    "PlaybackQueue": "playback",
+    "CatalogMatcher": "matching",
+    "RateLimiter": "concurrency",
+    "AdaptiveConcurrencyLimiter": "concurrency",
+    "call_deadline": "concurrency",
+    "HedgePolicy": "concurrency",
+    "RequestPool": "concurrency",
+    "JSONCheckpoint": "checkpoint",
+    "iterate_pages": "pagination",
+    "iterate_items": "pagination",
+    "LIBRARY_COLLECTIONS": "library",
+    "SAVED_ITEM_METHODS": "library",
+    "export_library": "library",
+    "IncrementalSync": "sync",
+    "MembershipBitmap": "membership",
+    "LibraryMembership": "membership",
+    "WriteBehindQueue": "writebehind",
+    "AuthorizationFlow": "callback",
+    "AuthCallbackServer": "callback",
+    "AsyncAuthCallbackServer": "callback",
+    "UserSession": "sessions",
+    "SessionManager": "sessions",
+    "ReplayResponse": "replay",
+    "ReplayTransport": "replay",
+    "RecordingTransport": "replay",
+    "MARKETS": "mockserver",
+    "SyntheticCatalog": "mockserver",
+    "MockSpotifyServer": "mockserver",
+}
+
+__all__ = list(EXPORTS)
+
+def __getattr__(name):
+    if name not in EXPORTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(f".{EXPORTS[name]}", __name__), name)
+    # later lookups skip __getattr__
+    globals()[name] = value
+    return value
+
+def __dir__():
+    return sorted(set(globals()) | set(EXPORTS))
@@ -0,0 +1,56 @@
+
+__all__ = ["ResponseCache"]
+
+import threading
+import time
+from collections import OrderedDict
+
+class ResponseCache(object):
+    '''
+    LRU cache of decoded responses, keyed by url, that can be shared between clients and threads.
+
+    Parameters:
+        max_size: number of responses kept, the least recently used is dropped past it
+        ttl: seconds a response stays valid
+
+    Only endpoints marked cacheable in ENDPOINTS (catalog data that is the same for every
+    user) are cached, so one cache can serve every client of an app:
+
+        client.cache = ResponseCache(max_size=10000, ttl=3600)
+
+    NOTE: every hit returns the same object, do not modify cached responses.
+    '''
+    def __init__(self, max_size:int=1024, ttl:float=300.0):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        with self.lock:
+            return len(self.entries)
+
+    def get(self, key:str):
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry != None and entry[0] > time.monotonic():
+                self.entries.move_to_end(key)
+                self.hits += 1
+                return entry[1]
+            if entry != None:
+                del self.entries[key]
+            self.misses += 1
+            return None
+
+    def set(self, key:str, value):
+        with self.lock:
+            self.entries[key] = (time.monotonic() + self.ttl, value)
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_size:
+                self.entries.popitem(last=False)
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
@@ -0,0 +1,275 @@
+
+__all__ = ["AuthorizationFlow", "AuthCallbackServer", "AsyncAuthCallbackServer"]
+
+import asyncio
+import secrets
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+
+'''
+Local callback server for the Authorization Code and PKCE flows
+
+Instead of pasting the redirected url into input(), the redirect_uri of the app points
+to this server (ex. http://127.0.0.1:8080/callback). Each authorization gets a random
+state, so any number of users can authorize at the same time; when Spotify redirects
+back, the code is matched to its flow by the state and exchanged for tokens.
+
+Reference: https://developer.spotify.com/documentation/web-api/concepts/redirect_uri
+'''
+class AuthorizationFlow(object):
+    def __init__(self, auth, state:str, url:str, flows=None):
+        self.auth = auth
+        self.state = state
+        self.url = url
+        # the CallbackFlows the flow is pending in, it is removed from them on timeout
+        self.flows = flows
+        self.error = None
+        self.done = threading.Event()
+
+    def finish(self, error=None):
+        self.error = error
+        self.done.set()
+
+    def result(self):
+        if self.error != None:
+            raise Exception(f"Authorization failed, {self.error}")
+        return self.auth
+
+    def wait(self, timeout:float|None=None):
+        '''
+            Blocks until the user is redirected back, returns the authorized client
+        '''
+        if not self.done.wait(timeout):
+            self.expire()
+        return self.result()
+
+    def expire(self):
+        if self.flows != None:
+            self.flows.discard(self.state)
+        raise Exception("Authorization failed, timed out waiting for the redirect.")
+
+class AsyncAuthorizationFlow(AuthorizationFlow):
+    def __init__(self, auth, state:str, url:str, flows=None):
+        super().__init__(auth, state, url, flows)
+        self.async_done = asyncio.Event()
+        self.lock = threading.Lock()
+        try:
+            self.loop = asyncio.get_running_loop()
+        except RuntimeError:
+            # set by wait
+            self.loop = None
+
+    def finish(self, error=None):
+        super().finish(error)
+        # asyncio.Event is not thread safe, finish can run in a token request thread or cancel()
+        with self.lock:
+            if self.loop != None:
+                self.loop.call_soon_threadsafe(self.async_done.set)
+
+    async def wait(self, timeout:float|None=None):
+        with self.lock:
+            self.loop = asyncio.get_running_loop()
+            finished = self.done.is_set()
+        if not finished:
+            try:
+                await asyncio.wait_for(self.async_done.wait(), timeout)
+            except asyncio.TimeoutError:
+                self.expire()
+        return self.result()
+
+class CallbackFlows(object):
+    '''
+    Pending flows keyed by state, shared by the sync and asyncio servers
+    '''
+    flow_class = AuthorizationFlow
+
+    def __init__(self, host:str="127.0.0.1", port:int=8080, path:str="/callback", exchange:bool=True):
+        self.host = host
+        self.port = port
+        self.path = path
+        self.exchange = exchange
+        self.flows = {}
+        self.lock = threading.Lock()
+
+    @property
+    def redirect_uri(self):
+        return f"http://{self.host}:{self.port}{self.path}"
+
+    def authorize(self, auth, scopes:list|None=None, show_dialog:bool=False):
+        '''
+            Starts an authorization for auth (SpotifyOAuth or SpotifyPKCE)
+
+            Returns: AuthorizationFlow, send the user to flow.url and then wait() on it
+        '''
+        state = secrets.token_urlsafe(16)
+        url = auth.get_authorize_url(scopes=scopes, state=state, show_dialog=show_dialog)
+        flow = self.flow_class(auth, state, url, self)
+        with self.lock:
+            self.flows[state] = flow
+        return flow
+
+    def cancel(self, state:str):
+        with self.lock:
+            flow = self.flows.pop(state, None)
+        if flow != None:
+            flow.finish("cancelled")
+
+    def discard(self, state:str):
+        '''
+            Removes the flow without finishing it, ex. after its wait() timed out
+        '''
+        with self.lock:
+            self.flows.pop(state, None)
+
+    def pending(self):
+        with self.lock:
+            return len(self.flows)
+
+    def match_callback(self, target:str):
+        '''
+            Returns (flow, code, error) for the request target, flow is None if it does not
+            belong to a pending authorization
+        '''
+        parsed_url = urlparse(target)
+        if parsed_url.path != self.path:
+            return None, None, None
+        query = parse_qs(parsed_url.query)
+        state = query.get("state", [None])[0]
+        with self.lock:
+            flow = self.flows.pop(state, None)
+        code = query.get("code", [None])[0]
+        error = query.get("error", [None])[0]
+        if flow != None and error == None and code == None:
+            error = "the authorization code is missing"
+        return flow, code, error
+
+    def complete(self, flow, code, error):
+        if error != None:
+            flow.finish(error)
+            return
+        try:
+            flow.auth.set_code(code, flow.state)
+            if self.exchange:
+                flow.auth.exchange_code()
+        except Exception as e:
+            flow.finish(str(e))
+            return
+        flow.finish()
+
+    def get_page(self, flow, error):
+        if flow == None:
+            return 404, "Unknown or expired authorization."
+        if error != None or flow.error != None:
+            return 400, f"Authorization failed: {error or flow.error}"
+        return 200, "Authorization complete, you can close this window."
+
+class AuthCallbackServer(CallbackFlows):
+    '''
+    Callback server running in a background thread, each redirect is handled in its own thread.
+
+    Example:
+        server = AuthCallbackServer(port=8080).start()
+        auth = SpotifyOAuth(client_id, client_secret, server.redirect_uri)
+        flow = server.authorize(auth, scopes=["user-library-read"])
+        print(flow.url)
+        flow.wait(timeout=300)
+    '''
+    def start(self):
+        flows = self
+
+        class CallbackHandler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                flow, code, error = flows.match_callback(self.path)
+                if flow != None:
+                    flows.complete(flow, code, error)
+                status, body = flows.get_page(flow, error)
+                body = body.encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "text/plain; charset=utf-8")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                return
+
+        self.server = ThreadingHTTPServer((self.host, self.port), CallbackHandler)
+        self.server.daemon_threads = True
+        # port 0 picks a free port
+        self.port = self.server.server_address[1]
+        self.thread = threading.Thread(target=self.server.serve_forever, name="spotify-api-callback", daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+        self.thread.join()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.stop()
+
+class AsyncAuthCallbackServer(CallbackFlows):
+    '''
+    asyncio version of AuthCallbackServer. The token requests are blocking, so they are run
+    in the default executor of the loop.
+
+    Example:
+        server = await AsyncAuthCallbackServer(port=8080).start()
+        flow = server.authorize(auth, scopes=["user-library-read"])
+        await flow.wait(timeout=300)
+    '''
+    flow_class = AsyncAuthorizationFlow
+    statuses = {200: "OK", 400: "Bad Request", 404: "Not Found"}
+
+    async def start(self):
+        self.server = await asyncio.start_server(self.handle_connection, self.host, self.port)
+        self.port = self.server.sockets[0].getsockname()[1]
+        return self
+
+    async def stop(self):
+        self.server.close()
+        await self.server.wait_closed()
+
+    async def handle_connection(self, reader, writer):
+        try:
+            request_line = await reader.readline()
+            # skip the headers, only the request target is needed
+            while (await reader.readline()) not in (b"\r\n", b"\n", b""):
+                pass
+            parts = request_line.decode("latin-1").split()
+            if len(parts) < 2 or parts[0] != "GET":
+                flow, error = None, None
+            else:
+                flow, code, error = self.match_callback(parts[1])
+                if flow != None:
+                    loop = asyncio.get_running_loop()
+                    if error == None and self.exchange:
+                        # the flow is finished on the loop, so AsyncAuthorizationFlow.wait wakes up
+                        try:
+                            await loop.run_in_executor(None, flow.auth.set_code, code, flow.state)
+                            await loop.run_in_executor(None, flow.auth.exchange_code)
+                        except Exception as e:
+                            error = str(e)
+                        flow.finish(error)
+                    else:
+                        self.complete(flow, code, error)
+            status, body = self.get_page(flow, error)
+            body = body.encode("utf-8")
+            writer.write(f"HTTP/1.1 {status} {self.statuses[status]}\r\n"
+                         "Content-Type: text/plain; charset=utf-8\r\n"
+                         f"Content-Length: {len(body)}\r\n"
+                         "Connection: close\r\n\r\n".encode("latin-1") + body)
+            await writer.drain()
+        finally:
+            writer.close()
+
+    async def __aenter__(self):
+        return await self.start()
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        await self.stop()
@@ -0,0 +1,42 @@
+
+__all__ = ["JSONCheckpoint"]
+
+import json
+import os
+import threading
+
+class JSONCheckpoint(object):
+    '''
+    Small key-value store kept in a JSON file, used to resume long running jobs.
+
+    Every set() rewrites the file through a temporary file and os.replace, so the
+    checkpoint on disk is never half written if the process is killed.
+    '''
+    def __init__(self, path:str):
+        self.path = path
+        self.lock = threading.Lock()
+        self.data = {}
+        if os.path.exists(path):
+            with open(path, "r", encoding="utf-8") as f:
+                self.data = json.load(f)
+
+    def get(self, key:str, default=None):
+        with self.lock:
+            return self.data.get(key, default)
+
+    def set(self, key:str, value):
+        with self.lock:
+            self.data[key] = value
+            self.save()
+
+    def delete(self, key:str):
+        with self.lock:
+            if key in self.data:
+                del self.data[key]
+                self.save()
+
+    def save(self):
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self.data, f)
+        os.replace(tmp_path, self.path)
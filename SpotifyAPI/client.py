@@ -4,13 +4,45 @@ __all__ = ["SpotifyClient"]
 import base64
 import datetime
 import requests
+import time
 from urllib.parse import urlencode
+from .concurrency import get_deadline, get_remaining, get_retry_delay, is_retryable
+from .crawler import crawl_related_artists
+from .discography import fetch_discography
+from .endpoints import ENDPOINTS, add_endpoint_methods
+from .ids import is_numpy_array, to_id_list
+from .markets import fetch_market_variants
+from .negative import expand, get_negative_kind
+from .search import search_stream
 
 class SpotifyClient(object):
     access_token = None
     access_token_expires = None
     client_id = None
     client_secret = None
+    # requests.Session (or anything with the same get/post/put/delete methods) shared
+    # between clients, the requests module is used when not set
+    session = None
+    # ResponseCache for the endpoints marked cacheable, nothing is cached when not set
+    cache = None
+    # InterningDecoder shared between responses, plain json decoding when not set
+    decoder = None
+    # NegativeCache of ids that came back null or 404, every id is requested when not set
+    negative_cache = None
+    # AdaptiveConcurrencyLimiter shared by every request the client sends, no limit when not set
+    concurrency_limiter = None
+    # LibraryMembership updated after every save and remove, set by LibraryMembership itself
+    membership = None
+    # seconds each attempt may take to connect and to get each part of the response
+    timeout = 30.0
+    # seconds each call has to finish in, retries included, no deadline when not set
+    deadline = None
+    # times a 429 (or a 5xx of a GET, PUT or DELETE) is sent again
+    max_retries = 0
+    # seconds before the first retry when the response has no Retry-After, doubled after each
+    retry_backoff = 0.5
+    # HedgePolicy for GETs, sent once when not set
+    hedge = None
     token_url = "https://accounts.spotify.com/api/token"
     base_url = "https://api.spotify.com"
     default_limit = 20
@@ -58,7 +90,7 @@ class SpotifyClient(object):
         token_url = self.token_url
         token_headers = self.get_token_headers()
         
-        response = requests.post(token_url, data=token_data, headers=token_headers)
+        response = self.get_session().post(token_url, data=token_data, headers=token_headers)
         data = response.json()
         if response.status_code not in range(200, 299):
             raise Exception(f"Could not authenticate client. Error: {data}")
@@ -74,6 +106,11 @@ class SpotifyClient(object):
             return data
         return True
     
+    def get_session(self):
+        if self.session != None:
+            return self.session
+        return requests
+    
     def get_access_headers(self):
         access_token = self.get_access_token()
         headers = {
@@ -107,6 +144,8 @@ class SpotifyClient(object):
     def convert_list_to_str(self, separator, list_items, max_length=50):
         if len(list_items) > max_length:
             raise Exception("Maximum number of ids exceeded")
+        if is_numpy_array(list_items):
+            return separator.join(to_id_list(list_items))
         return separator.join([f"{item}" for item in list_items])
 
     def convert_list_to_dict(self, key, list_items, max_length=50):
@@ -129,7 +168,9 @@ class SpotifyClient(object):
                 offset = self.max_offset
         return offset
     
-    def create_query(self, params={}, **kwargs):
+    def create_query(self, params=None, **kwargs):
+        # copy, so the params passed in (or a shared default) are never changed
+        params = {} if params == None else dict(params)
         for key, value in kwargs.items():
             if key == "additional_types":
                 value = self.check_additional_types(additional_types=value)
@@ -179,10 +220,172 @@ class SpotifyClient(object):
          
     def get_response(self, id, resource_type="albums", version="v1", query=None):
         endpoint = self.build_endpoint(id, resource_type, version, query)
+        return self.send_request("GET", endpoint)
+    
+    def get_page(self, url:str):
+        '''
+            Gets a full url returned by the API, ex. the "next" url of a paging object
+        '''
+        return self.send_request("GET", url)
+    
+    def send_request(self, method:str, url:str, data=None):
+        '''
+            Returns the decoded body of a GET. Any other request returns True when it succeeds,
+            and the error ({"error": {"status": ..., "message": ...}}) when it does not.
+        '''
         headers = self.get_access_headers()
-        response = requests.get(endpoint, headers=headers) 
+        session = self.get_session()
+        if method == "GET":
+            return self.decode_response(self.send_with_retries(session.get, method, url, headers=headers))
+        response = self.send_with_retries(getattr(session, method.lower()), method, url, headers=headers, data=data)
+        return self.get_send_result(response)
+
+    def get_send_result(self, response):
+        status = getattr(response, "status_code", None)
+        if not isinstance(status, int) or status < 400:
+            return True
+        try:
+            body = self.decode_response(response)
+        except ValueError:
+            body = None
+        if isinstance(body, dict) and "error" in body:
+            return body
+        return {"error": {"status": status, "message": f"Request failed with status {status}"}}
+
+    def send_with_retries(self, send, method:str, url:str, **kwargs):
+        '''
+            Calls send (session.get etc.) until it gets a response that is not worth retrying or
+            max_retries is used up. Each attempt gets timeout, or the time left before the
+            deadline if that is shorter. TimeoutError is raised when an attempt times out or the
+            deadline passes before one starts.
+        '''
+        deadline = get_deadline(self.deadline)
+        attempt = 0
+        while True:
+            remaining = get_remaining(deadline)
+            timeout = self.timeout if remaining == None else min(remaining, self.timeout or remaining)
+            if timeout != None:
+                kwargs["timeout"] = timeout
+            try:
+                if self.hedge != None and method == "GET":
+                    response = self.hedge.send(lambda: self.send_limited(send, url, deadline=deadline, **kwargs))
+                else:
+                    response = self.send_limited(send, url, deadline=deadline, **kwargs)
+            except requests.Timeout as e:
+                raise TimeoutError(f"Request timed out after {timeout} seconds: {url}") from e
+            if attempt >= self.max_retries or not is_retryable(method, getattr(response, "status_code", None)):
+                return response
+            delay = get_retry_delay(response, attempt, self.retry_backoff)
+            if deadline != None and time.monotonic() + delay >= deadline:
+                return response
+            # a streamed body (ex. a cover image) has been read, it is sent again only if it can start over
+            data = kwargs.get("data")
+            if hasattr(data, "read") and not (hasattr(data, "rewind") and data.rewind()):
+                return response
+            time.sleep(delay)
+            attempt += 1
+
+    def send_limited(self, send, *args, deadline:float|None=None, **kwargs):
+        '''
+            Calls send (session.get etc.) under the concurrency limiter, when one is set. The wait
+            for a slot and the timeout of the request both come out of the time left before deadline.
+        '''
+        limiter = self.concurrency_limiter
+        if limiter == None:
+            return send(*args, **kwargs)
+        limiter.acquire(get_remaining(deadline))
+        if deadline != None and kwargs.get("timeout") != None:
+            try:
+                kwargs["timeout"] = min(kwargs["timeout"], get_remaining(deadline))
+            except TimeoutError:
+                limiter.cancel()
+                raise
+        start = time.monotonic()
+        status = None
+        try:
+            response = send(*args, **kwargs)
+            status = getattr(response, "status_code", None)
+            return response
+        finally:
+            limiter.release(time.monotonic() - start, status)
+
+    def decode_response(self, response):
+        '''
+            Endpoints like /me/player answer 204 with no body when there is nothing to return,
+            which is returned as an empty dictionary
+        '''
+        if response.status_code == 204 or not response.content:
+            return {}
+        if self.decoder != None:
+            return response.json(object_hook=self.decoder.object_hook)
         return response.json()
     
+    def has_required_scopes(self, required_scopes):
+        # client credentials can not be granted any scopes
+        return not required_scopes
+    
+    def call_endpoint(self, name:str, _id:str|None=None, data=None, **params):
+        '''
+            Calls one of the endpoints in ENDPOINTS, parameters set to None are left out.
+            Returns {} when the endpoint needs scopes the client does not have.
+        '''
+        endpoint = ENDPOINTS[name]
+        if endpoint.scopes and not self.has_required_scopes(endpoint.scopes):
+            return {}
+        kind = get_negative_kind(endpoint) if self.negative_cache != None else None
+        if kind != None:
+            return self.call_skipping_unknown(endpoint, kind, _id, data, params)
+        response = self.send_endpoint(endpoint, _id, data, params)
+        if self.membership != None and endpoint.method in ["PUT", "DELETE"]:
+            self.membership.record(name, params, response)
+        return response
+
+    def send_endpoint(self, endpoint, _id, data, params):
+        url = endpoint.url(self.base_url, _id, **params)
+        cache = self.cache if endpoint.cacheable else None
+        if cache != None:
+            response = cache.get(url)
+            if response != None:
+                return response
+        response = self.send_request(endpoint.method, url, data)
+        if cache != None and not (isinstance(response, dict) and "error" in response):
+            cache.set(url, response)
+        return response
+
+    def call_skipping_unknown(self, endpoint, kind, _id, data, params):
+        '''
+            Leaves out the ids the negative cache remembers, and remembers the ones that come
+            back null or 404
+        '''
+        negative_cache = self.negative_cache
+        market = params.get("market")
+        if _id != None:
+            if negative_cache.contains(kind, _id, market):
+                negative_cache.split(kind, [_id], market)
+                negative_cache.count_saved()
+                return {"error": {"status": 404, "message": "Non existing id (negative cache)"}}
+            response = self.send_endpoint(endpoint, _id, data, params)
+            error = response.get("error") if isinstance(response, dict) else None
+            if isinstance(error, dict) and error.get("status") == 404:
+                negative_cache.add(kind, _id, market)
+            return response
+
+        ids = params.get("ids")
+        if ids == None:
+            return self.send_endpoint(endpoint, _id, data, params)
+        ids = ids.split(",") if isinstance(ids, str) else to_id_list(ids)
+        remaining, skipped = negative_cache.split(kind, ids, market)
+        if not remaining:
+            negative_cache.count_saved()
+            return {kind: [None] * len(ids)}
+        response = self.send_endpoint(endpoint, _id, data, dict(params, ids=remaining))
+        if not isinstance(response, dict) or not isinstance(response.get(kind), list):
+            return response
+        negative_cache.record(kind, remaining, response[kind], market)
+        if len(remaining) == len(ids):
+            return response
+        return dict(response, **{kind: expand(response[kind], skipped)})
+    
     def check_additional_types(self, additional_types):
         if additional_types != None:
             # Valid types are track and episode, check if additional_types is not equal or a subset
@@ -219,8 +422,14 @@ class SpotifyClient(object):
 
         if include_external != "audio":
             include_external = None
-        query_params = self.create_query(q=query, type=search_type.lower(), include_external=include_external, market=market, limit=limit, offset=offset)
-        return self.get_response(-1, resource_type="search", query=query_params)
+        return self.call_endpoint("search", q=query, type=search_type.lower(), include_external=include_external, market=market, limit=limit, offset=offset)
+
+    def search_stream(self, query:str|dict, types:list|None=None, **kwargs):
+        '''
+            Searches every type in types concurrently, following the pages of each up to the
+            1000 result ceiling. Yields (search_type, item). See search.search_stream for the parameters.
+        '''
+        return search_stream(self, query, types=types, **kwargs)
 
     '''
     GET /albums
@@ -228,22 +437,17 @@ class SpotifyClient(object):
         id(s) (str|list)
     '''
     def get_album(self, _id:str, market:str|None=None):
-        query_params = self.create_query(market=market)
-        return self.get_response(_id, resource_type="albums", query=query_params)
+        return self.call_endpoint("get_album", _id, market=market)
     
     def get_albums(self, _ids:list, market:str|None=None):
-        query_params = self.convert_list_to_dict("ids", _ids, length=20)
-        query_params = self.create_query(query_params, market=market)   
-        return self.get_response(-1, resource_type="albums", query=query_params)
+        return self.call_endpoint("get_albums", ids=_ids, market=market)
     
     def get_album_tracks(self, _id:str, market:str|None=None, limit:int|None=None, offset:int|None=None):
-        query_params = self.create_query(market=market, limit=limit, offset=offset)
-        return self.get_response(f"{_id}/tracks", resource_type="albums", query=query_params)
+        return self.call_endpoint("get_album_tracks", _id, market=market, limit=limit, offset=offset)
     
     # uses country string instead of market string
     def get_new_releases(self, country:str=None, limit:int|None=None, offset:int|None=None):
-        query_params = self.create_query(country=country, limit=limit, offset=offset)
-        return self.get_response(-1, resource_type="browse/new-releases", query=query_params)
+        return self.call_endpoint("get_new_releases", country=country, limit=limit, offset=offset)
 
     '''
     GET /Artists
@@ -251,28 +455,38 @@ class SpotifyClient(object):
         id(s) (str|list)
     '''
     def get_artist(self, _id:int):
-        return self.get_response(_id, resource_type="artists")
+        return self.call_endpoint("get_artist", _id)
     
     def get_artists(self, _ids:list):
-        query_params = self.convert_list_to_dict("ids", _ids)
-        query_params = urlencode(query_params)
-
-        return self.get_response(-1, resource_type="artists", query=query_params)
+        return self.call_endpoint("get_artists", ids=_ids)
     
     def get_artist_albums(self, _id:str, include_groups:list|None=None, market:str|None=None, limit:int|None=None, offset:int|None=None):
-        query_params = self.create_query(include_groups=include_groups, market=market, limit=limit, offset=offset)
-        return self.get_response(f"{_id}/albums", resource_type="artists", query=query_params)
+        return self.call_endpoint("get_artist_albums", _id, include_groups=include_groups, market=market, limit=limit, offset=offset)
+
+    def fetch_discography(self, _id:str, include_groups:list|None=None, market:str|None=None, **kwargs):
+        '''
+            Yields every album of the artist with all of its tracks, fetching the album pages, the
+            albums and any extra track pages concurrently. See discography.fetch_discography.
+        '''
+        return fetch_discography(self, _id, include_groups=include_groups, market=market, **kwargs)
 
     # The documentation does not say the market string is required, and the example provided actually excludes it.
     # However, excluding the market string here returns a 400 error, so default is set to 'US'
     #
     # Reference: https://developer.spotify.com/documentation/web-api/reference/get-an-artists-top-tracks
     def get_artist_top_tracks(self, _id:int, market:str="US"):
-        query_params = self.create_query(market=market)
-        return self.get_response(f"{_id}/top-tracks", resource_type="artists", query=query_params)
+        return self.call_endpoint("get_artist_top_tracks", _id, market=market)
     
     def get_artist_related_artists(self, _id:int):
-        return self.get_response(f"{_id}/related-artists", resource_type="artists")
+        return self.call_endpoint("get_artist_related_artists", _id)
+
+    def crawl_related_artists(self, seeds:list, **kwargs):
+        '''
+            Breadth-first crawl of the related artists graph from the seed artist ids. Yields
+            ("artist", artist) and ("edge", (artist_id, related_id)). See crawler.crawl_related_artists
+            for the parameters.
+        '''
+        return crawl_related_artists(self, seeds, **kwargs)
 
     '''
     GET /audiobooks
@@ -280,17 +494,13 @@ class SpotifyClient(object):
         id(s) (str|list)
     '''
     def get_audiobook(self, _id:str, market:str|None=None):
-        query_params = self.create_query(market=market)
-        return self.get_response(_id, resource_type="audiobooks", query=query_params)
+        return self.call_endpoint("get_audiobook", _id, market=market)
     
     def get_audiobooks(self, _ids:list, market:str|None=None):
-        query_params = self.convert_list_to_dict("ids", _ids)
-        query_params = self.create_query(query_params, market=market)
-        return self.get_response(-1, resource_type="audiobooks", query=query_params)
+        return self.call_endpoint("get_audiobooks", ids=_ids, market=market)
     
     def get_audiobook_chapters(self, _id:str, market:str|None=None, limit:int|None=None, offset:int|None=None):
-        query_params = self.create_query(market=market, limit=limit, offset=offset)
-        return self.get_response(f"{_id}/chapters", resource_type="audiobooks", query=query_params)
+        return self.call_endpoint("get_audiobook_chapters", _id, market=market, limit=limit, offset=offset)
     
     '''
     GET /browse/categories
@@ -302,12 +512,10 @@ class SpotifyClient(object):
     Reference: https://developer.spotify.com/documentation/web-api/reference/get-categories
     '''
     def get_browse_categories(self, country:str|None=None, locale:str|None=None, limit:int=default_limit, offset:int=default_offset):
-        query_params = self.create_query(country=country, locale=locale, limit=limit, offset=offset)
-        return self.get_response(-1, resource_type="browse/categories", query=query_params)
+        return self.call_endpoint("get_browse_categories", country=country, locale=locale, limit=limit, offset=offset)
     
     def get_browse_category(self, category:str, country:str|None=None, locale:str|None=None):
-        query_params = self.create_query(country=country, locale=locale)
-        return self.get_response(-1, resource_type=f"browse/categories/{category}", query=query_params)
+        return self.call_endpoint("get_browse_category", category, country=country, locale=locale)
     
     '''
     GET /chapters
@@ -323,13 +531,10 @@ class SpotifyClient(object):
     Reference: https://developer.spotify.com/documentation/web-api/reference/get-a-chapter
     '''
     def get_chapter(self, _id:str, market:str="US"):
-        query_params = self.create_query(market=market)
-        return self.get_response(_id, resource_type="chapters", query=query_params)
+        return self.call_endpoint("get_chapter", _id, market=market)
     
     def get_chapters(self, _ids:list, market:str="US"):
-        query_params = self.convert_list_to_dict("ids", _ids)
-        query_params = self.create_query(query_params, market=market)
-        return self.get_response(-1, resource_type="chapters", query=query_params)
+        return self.call_endpoint("get_chapters", ids=_ids, market=market)
     
     '''
     GET /episodes
@@ -341,43 +546,45 @@ class SpotifyClient(object):
     GET /recommendations/available-genre-seeds
     '''
     def get_genre_seeds(self):
-        return self.get_response(-1, resource_type="recommendations/available-genre-seeds")
+        return self.call_endpoint("get_genre_seeds")
     
     '''
     GET /markets
     '''
     def get_available_markets(self):
-        return self.get_response(-1, resource_type="markets")
+        return self.call_endpoint("get_available_markets")
+
+    def fetch_market_variants(self, method:str, *args, markets:list|None=None, **kwargs):
+        '''
+            Calls the method once per market concurrently, identical responses are stored once.
+            Returns a MarketVariants, see markets.fetch_market_variants.
+        '''
+        return fetch_market_variants(self, method, *args, markets=markets, **kwargs)
 
     '''
     GET /playlists
     '''
     def get_playlist(self, _playlist_id:str, market:str|None=None, fields:str|None=None, additional_types:list|None=None):
-        query_params = self.create_query(market=market, fields=fields, additional_types=additional_types)
-        return self.get_response(_playlist_id, resource_type="playlists", query=query_params)
+        additional_types = self.check_additional_types(additional_types=additional_types)
+        return self.call_endpoint("get_playlist", _playlist_id, market=market, fields=fields, additional_types=additional_types)
     
     def get_featured_playlists(self, country:str|None=None, locale:str|None=None, timestamp:str|None=None, limit:str|None=None, offset:str|None=None):
-        query_params = self.create_query(country=country, locale=locale, timestamp=timestamp, limit=limit, offset=offset)
-        return self.get_response(-1, resource_type="browse/featured-playlists", query=query_params)
+        return self.call_endpoint("get_featured_playlists", country=country, locale=locale, timestamp=timestamp, limit=limit, offset=offset)
     
     def get_categorys_playlists(self, _category_id:str, country:str|None=None, limit:str|None=None, offset:str|None=None):
-        query_params = self.create_query(country=country, limit=limit, offset=offset)
-        return self.get_response(f"{_category_id}/playlists", resource_type="browse/categories", query=query_params)
+        return self.call_endpoint("get_categorys_playlists", _category_id, country=country, limit=limit, offset=offset)
     
     def get_playlist_cover(self, _playlist_id:str):
-        return self.get_response(f"{_playlist_id}/images", resource_type="playlists")
+        return self.call_endpoint("get_playlist_cover", _playlist_id)
     
     '''
     GET /tracks
     '''
     def get_track(self, _track_id:str, market:str|None=None):
-        query_params = self.create_query(market=market)
-        return self.get_response(_track_id, resource_type="tracks", query=query_params)
+        return self.call_endpoint("get_track", _track_id, market=market)
     
     def get_tracks(self, _track_ids:list, market:str|None=None):
-        ids = self.convert_list_to_str(",", _track_ids)
-        query_params = self.create_query(ids=ids, market=market)
-        return self.get_response(-1, resource_type="tracks", query=query_params)
+        return self.call_endpoint("get_tracks", ids=_track_ids, market=market)
     
     def get_tracks_audio_features(self, _track_ids:list|str):
         '''
@@ -387,15 +594,13 @@ class SpotifyClient(object):
                     If only one track, submit as a string
         '''
         if isinstance(_track_ids, str) and not ("," in _track_ids or "%2C" in _track_ids):
-            return self.get_response(_track_ids, resource_type="audio-features")
+            return self.call_endpoint("get_track_audio_features", _track_ids)
         elif isinstance(_track_ids, str):
             raise Exception("Pass as a list when using more than one track id.")
-        ids = self.convert_list_to_str(",", _track_ids, 100)
-        query_params = self.create_query(ids=ids)
-        return self.get_response(-1, resource_type="audio-features", query=query_params)
+        return self.call_endpoint("get_tracks_audio_features", ids=_track_ids)
     
     def get_tracks_audio_analysis(self, _track_id:str):
-        return self.get_response(_track_id, resource_type="audio-analysis")
+        return self.call_endpoint("get_tracks_audio_analysis", _track_id)
     
     def get_recommendations(self, seed_artists:list|None=None, seed_genres:list|None=None, seed_tracks:list|None=None, market:str|None=None, limit:int|None=None, **kwargs):
         '''
@@ -437,9 +642,9 @@ class SpotifyClient(object):
     GET /users
     '''
     def get_users_profile(self, _user_id:str):
-        return self.get_response(_user_id, resource_type="users")
+        return self.call_endpoint("get_users_profile", _user_id)
     
     def do_users_follow_playlist(self, _playlist_id:str, _user_ids:list):
-        ids = self.convert_list_to_str(",", _user_ids)
-        query_params = self.create_query(ids=ids)
-        return self.get_response(f"{_playlist_id}/followers/contains", resource_type="playlists", query=query_params)
+        return self.call_endpoint("do_users_follow_playlist", _playlist_id, ids=_user_ids)
+
+add_endpoint_methods(SpotifyClient)
@@ -0,0 +1,336 @@
+
+__all__ = ["RateLimiter", "AdaptiveConcurrencyLimiter", "RequestPool", "call_deadline", "HedgePolicy"]
+
+import contextvars
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+'''
+Shared execution layer for the bulk helpers (library export, syncing, crawling, etc.)
+
+Every request made by these helpers goes through a RequestPool, so the rate limiter
+applies to all of them at once instead of each helper having its own.
+'''
+class RateLimiter(object):
+    '''
+    Token bucket that can be shared between threads.
+
+    rate: requests per second that are let through on average
+    burst: how many requests can go out back to back after being idle
+    '''
+    def __init__(self, rate:float=10, burst:int|None=None):
+        if rate <= 0:
+            raise Exception("rate must be greater than 0")
+        self.rate = rate
+        self.burst = burst if burst != None else max(1, int(rate))
+        self.tokens = float(self.burst)
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self):
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
+
+class AdaptiveConcurrencyLimiter(object):
+    '''
+    Limits the requests in flight, adjusting the limit as responses come back (AIMD).
+
+    Every healthy response adds increase / limit to the limit, so it grows by about increase
+    per round of requests. A 429, a 5xx, a request that raised, or a smoothed latency above
+    latency_tolerance times the lowest latency seen multiplies the limit by decrease, at most
+    once per smoothed latency so one burst of errors only cuts it once.
+
+    Set on a client it applies to every request the client sends, and one limiter can be
+    shared by many clients:
+
+        client.concurrency_limiter = AdaptiveConcurrencyLimiter(max_limit=32)
+
+    NOTE: a RequestPool never runs more requests than its max_workers, give pools at least
+        max_limit workers to let the limiter decide.
+    '''
+    def __init__(self, initial_limit:int=4, min_limit:int=1, max_limit:int=64, increase:float=1.0,
+                 decrease:float=0.5, latency_tolerance:float=2.0, smoothing:float=0.2):
+        if not 1 <= min_limit <= initial_limit <= max_limit:
+            raise Exception("Limits must satisfy 1 <= min_limit <= initial_limit <= max_limit")
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.increase = increase
+        self.decrease = decrease
+        self.latency_tolerance = latency_tolerance
+        self.smoothing = smoothing
+        self.limit = float(initial_limit)
+        self.in_flight = 0
+        self.latency = None
+        self.baseline = None
+        self.decreased = 0.0
+        self.successes = 0
+        self.failures = 0
+        self.decreases = 0
+        self.condition = threading.Condition()
+
+    @property
+    def current_limit(self):
+        return int(self.limit)
+
+    def acquire(self, timeout:float|None=None):
+        '''
+            Waits for a free slot, at most timeout seconds, then raises TimeoutError
+        '''
+        with self.condition:
+            if not self.condition.wait_for(lambda: self.in_flight < int(self.limit), timeout):
+                raise TimeoutError("Deadline exceeded while waiting for the concurrency limiter")
+            self.in_flight += 1
+
+    def cancel(self):
+        '''
+            Gives back a slot that was acquired but not used, without changing the limit
+        '''
+        with self.condition:
+            self.in_flight -= 1
+            self.condition.notify_all()
+
+    def release(self, latency:float, status:int|None=None):
+        '''
+            latency: seconds the request took
+            status: HTTP status of the response, None if the request raised
+        '''
+        failed = status == None or (isinstance(status, int) and (status == 429 or status >= 500))
+        with self.condition:
+            self.in_flight -= 1
+            if failed:
+                self.failures += 1
+            else:
+                self.successes += 1
+                self.latency = latency if self.latency == None else self.latency + (latency - self.latency) * self.smoothing
+                # the lowest latency seen, drifting up slowly so it follows a slower network
+                self.baseline = latency if self.baseline == None else min(latency, self.baseline + (latency - self.baseline) * 0.01)
+
+            congested = failed or self.latency > self.baseline * self.latency_tolerance
+            now = time.monotonic()
+            if congested:
+                if now - self.decreased >= (self.latency or 0):
+                    self.limit = max(self.min_limit, self.limit * self.decrease)
+                    self.decreased = now
+                    self.decreases += 1
+            else:
+                self.limit = min(self.max_limit, self.limit + self.increase / self.limit)
+            self.condition.notify_all()
+
+    def get_stats(self):
+        with self.condition:
+            return {"limit": int(self.limit), "in_flight": self.in_flight, "latency": self.latency,
+                    "baseline": self.baseline, "successes": self.successes, "failures": self.failures,
+                    "decreases": self.decreases}
+
+class RequestPool(object):
+    '''
+    Thread pool that runs client calls under an optional RateLimiter.
+
+    The pool can be used as a context manager, the threads are shut down on exit.
+    '''
+    def __init__(self, max_workers:int=8, rate_limiter:RateLimiter|None=None):
+        self.max_workers = max_workers
+        self.rate_limiter = rate_limiter
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="spotify-api")
+
+    def call(self, fn, *args, **kwargs):
+        '''
+        Runs fn in the current thread, waiting on the rate limiter first.
+        '''
+        if self.rate_limiter != None:
+            self.rate_limiter.acquire()
+        return fn(*args, **kwargs)
+
+    def submit(self, fn, *args, **kwargs):
+        '''
+        Runs fn on the pool, in a copy of the caller's context so a call_deadline still applies.
+        '''
+        context = contextvars.copy_context()
+        return self.executor.submit(context.run, self.call, fn, *args, **kwargs)
+
+    def shutdown(self, wait:bool=True):
+        self.executor.shutdown(wait=wait)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.shutdown()
+
+'''
+Deadlines, retries and hedging
+
+A deadline covers a whole call: every attempt gets the time that is left as its timeout, and
+a retry that would only start after the deadline is not made. Running out of time raises
+TimeoutError, whether it happens before an attempt, while waiting for the concurrency limiter
+or during one. Deadlines come from the client (client.deadline, seconds per call) and from
+call_deadline, whichever ends first. call_deadline is kept in a context variable, so it follows
+the call into RequestPool threads and asyncio.to_thread.
+'''
+# statuses worth another attempt, 5xx only for methods that can be repeated safely
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+IDEMPOTENT_METHODS = {"GET", "PUT", "DELETE"}
+current_deadline = contextvars.ContextVar("spotify_api_deadline", default=None)
+
+@contextmanager
+def call_deadline(seconds:float):
+    '''
+        Every request made inside the block has to finish within seconds, including the ones
+        it hands to a RequestPool or asyncio.to_thread.
+        Nested blocks keep the earlier deadline.
+
+        with call_deadline(0.5):
+            track = client.get_track(track_id)
+    '''
+    previous = current_deadline.get()
+    deadline = time.monotonic() + seconds
+    token = current_deadline.set(deadline if previous == None else min(previous, deadline))
+    try:
+        yield
+    finally:
+        current_deadline.reset(token)
+
+def get_deadline(seconds:float|None=None):
+    '''
+        Returns the time.monotonic() the current call has to finish by, None for no deadline
+    '''
+    deadline = current_deadline.get()
+    if seconds != None:
+        own = time.monotonic() + seconds
+        deadline = own if deadline == None else min(deadline, own)
+    return deadline
+
+def get_remaining(deadline:float|None):
+    if deadline == None:
+        return None
+    remaining = deadline - time.monotonic()
+    if remaining <= 0:
+        raise TimeoutError("Deadline exceeded before the request could be sent")
+    return remaining
+
+def is_retryable(method:str, status):
+    if not isinstance(status, int) or status not in RETRY_STATUSES:
+        return False
+    return status == 429 or method in IDEMPOTENT_METHODS
+
+def get_retry_delay(response, attempt:int, backoff:float):
+    headers = getattr(response, "headers", None) or {}
+    retry_after = headers.get("Retry-After")
+    if retry_after != None:
+        try:
+            return max(float(retry_after), 0.0)
+        except ValueError:
+            pass
+    return backoff * 2 ** attempt
+
+class HedgePolicy(object):
+    '''
+    Sends a second copy of a GET when the first has taken longer than most requests do, and
+    uses whichever response comes back first.
+
+    Parameters:
+        percentile: the delay before the copy is sent is this percentile of recent latencies
+        min_delay, max_delay: bounds of that delay, max_delay is used until enough latencies are known
+        window: latencies kept
+        max_ratio: at most this share of requests are hedged, so a slow API does not get
+            twice the load
+        max_workers: threads that send the requests
+
+        client.hedge = HedgePolicy()
+
+    Only GETs are hedged. The slower copy is not cancelled, its response is dropped.
+    '''
+    def __init__(self, percentile:float=0.95, min_delay:float=0.01, max_delay:float=1.0, window:int=200,
+                 max_ratio:float=0.1, max_workers:int=32):
+        self.percentile = percentile
+        self.min_delay = min_delay
+        self.max_delay = max_delay
+        self.max_ratio = max_ratio
+        self.max_workers = max_workers
+        self.latencies = deque(maxlen=window)
+        self.lock = threading.Lock()
+        self.executor = None
+        self.requests = 0
+        self.hedges = 0
+        self.hedge_wins = 0
+
+    def get_delay(self):
+        with self.lock:
+            if len(self.latencies) < 20:
+                return self.max_delay
+            ordered = sorted(self.latencies)
+        value = ordered[int(self.percentile * (len(ordered) - 1))]
+        return min(max(value, self.min_delay), self.max_delay)
+
+    def get_executor(self):
+        with self.lock:
+            if self.executor == None:
+                self.executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="spotify-api-hedge")
+            return self.executor
+
+    def can_hedge(self):
+        with self.lock:
+            if self.hedges + 1 > self.max_ratio * self.requests:
+                return False
+            self.hedges += 1
+            return True
+
+    def send(self, send):
+        '''
+            Calls send(), and calls it again if the first call takes longer than get_delay()
+        '''
+        delay = self.get_delay()
+        executor = self.get_executor()
+        start = time.monotonic()
+        with self.lock:
+            self.requests += 1
+        # each copy runs in its own copy of the context, a context can only be entered by one thread
+        first = executor.submit(contextvars.copy_context().run, send)
+        done, _ = wait([first], timeout=delay)
+        if done or not self.can_hedge():
+            response = first.result()
+            self.record(time.monotonic() - start)
+            return response
+
+        second = executor.submit(contextvars.copy_context().run, send)
+        pending = {first, second}
+        error = None
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                try:
+                    response = future.result()
+                except Exception as e:
+                    error = error or e
+                    continue
+                self.record(time.monotonic() - start)
+                if future is second:
+                    with self.lock:
+                        self.hedge_wins += 1
+                return response
+        raise error
+
+    def record(self, latency:float):
+        with self.lock:
+            self.latencies.append(latency)
+
+    def get_stats(self):
+        with self.lock:
+            return {"requests": self.requests, "hedges": self.hedges, "hedge_wins": self.hedge_wins}
+
+    def shutdown(self, wait:bool=True):
+        with self.lock:
+            executor, self.executor = self.executor, None
+        if executor != None:
+            executor.shutdown(wait=wait)
@@ -0,0 +1,121 @@
+
+__all__ = ["crawl_related_artists"]
+
+import base64
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, wait
+from .checkpoint import JSONCheckpoint
+from .concurrency import RateLimiter, RequestPool
+from .ids import IdSet
+
+'''
+Breadth-first crawl of the related artists graph
+
+Every artist is marked as visited when it is first seen, so it is queued and yielded once.
+The visited set is an IdSet and the frontier holds (id, depth) pairs, which keeps a crawl
+of millions of artists within a few hundred MB.
+'''
+def get_related_artists(client, artist_id):
+    response = client.get_artist_related_artists(artist_id)
+    if "error" in response:
+        raise Exception(f"Could not get the related artists of {artist_id}: {response['error']}")
+    return response.get("artists") or []
+
+def get_artists(client, artist_ids):
+    response = client.get_artists(artist_ids)
+    if "error" in response:
+        raise Exception(f"Could not get artists: {response['error']}")
+    return [artist for artist in response.get("artists") or [] if artist != None]
+
+def crawl_related_artists(client, seeds:list, max_depth:int|None=None, max_artists:int|None=None,
+                          checkpoint:str|JSONCheckpoint|None=None, checkpoint_every:int=1000, pool:RequestPool|None=None,
+                          max_workers:int=4, rate_limit:float|None=None, max_pending:int|None=None):
+    '''
+        Yields ("artist", artist) for every artist reached and ("edge", (artist_id, related_id))
+        for every related artist of every artist that is expanded.
+
+        Parameters:
+            client: SpotifyClient or SpotifyOAuth
+            seeds: artist ids to start from, at depth 0. Ignored when resuming from a checkpoint
+            max_depth: artists at this depth are yielded but not expanded
+            max_artists: stop adding artists once this many have been reached
+            checkpoint: path or JSONCheckpoint. The frontier and the visited set are saved
+                every checkpoint_every expanded artists and when the crawl stops, and a
+                crawl given the same checkpoint resumes from there.
+            pool: RequestPool to run the requests in, one is created if not given
+            max_workers, rate_limit: used to create the pool when pool is not given
+            max_pending: artists being expanded at once, defaults to twice the pool's workers
+
+        NOTE: artists expanded after the last save are expanded again on resume, so their
+            edges and the artists they reached can be yielded twice.
+    '''
+    if isinstance(checkpoint, str):
+        checkpoint = JSONCheckpoint(checkpoint)
+
+    state = checkpoint.get("related_artists") if checkpoint != None else None
+    if state != None:
+        visited = IdSet.from_bytes(base64.b64decode(state["visited"]))
+        frontier = deque((artist_id, depth) for artist_id, depth in state["frontier"])
+        expanded = state["expanded"]
+        new_seeds = []
+    else:
+        visited = IdSet()
+        frontier = deque()
+        expanded = 0
+        new_seeds = [artist_id for artist_id in dict.fromkeys(seeds) if visited.add(artist_id)]
+
+    owns_pool = pool == None
+    if owns_pool:
+        rate_limiter = RateLimiter(rate_limit) if rate_limit != None else None
+        pool = RequestPool(max_workers=max_workers, rate_limiter=rate_limiter)
+    max_pending = max_pending if max_pending != None else pool.max_workers * 2
+
+    # future: (artist_id, depth)
+    pending = {}
+
+    def save():
+        if checkpoint != None:
+            # artists being expanded go back at the front of the frontier
+            nodes = sorted(pending.values(), key=lambda node: node[1]) + list(frontier)
+            checkpoint.set("related_artists", {"frontier": nodes, "expanded": expanded,
+                                               "visited": base64.b64encode(visited.to_bytes()).decode("ascii")})
+
+    def can_add():
+        return max_artists == None or len(visited) < max_artists
+
+    try:
+        # seeds are looked up in batches so their records can be yielded too
+        for i in range(0, len(new_seeds), 50):
+            batch = new_seeds[i:i + 50]
+            frontier.extend((artist_id, 0) for artist_id in batch)
+            for artist in pool.call(get_artists, client, batch):
+                yield "artist", artist
+
+        while frontier or pending:
+            while frontier and len(pending) < max_pending:
+                artist_id, depth = frontier.popleft()
+                if max_depth != None and depth >= max_depth:
+                    continue
+                pending[pool.submit(get_related_artists, client, artist_id)] = (artist_id, depth)
+            if not pending:
+                break
+
+            done, _ = wait(list(pending), return_when=FIRST_COMPLETED)
+            for future in done:
+                artist_id, depth = pending[future]
+                for artist in future.result():
+                    yield "edge", (artist_id, artist["id"])
+                    if can_add() and visited.add(artist["id"]):
+                        frontier.append((artist["id"], depth + 1))
+                        yield "artist", artist
+                # kept in pending until here, so a crawl stopped part way through saves it to be expanded again
+                del pending[future]
+                expanded += 1
+                if expanded % checkpoint_every == 0:
+                    save()
+    finally:
+        for future in pending:
+            future.cancel()
+        save()
+        if owns_pool:
+            pool.shutdown(wait=False)
@@ -0,0 +1,111 @@
+
+__all__ = ["fetch_discography"]
+
+from concurrent.futures import FIRST_COMPLETED, wait
+from .concurrency import RateLimiter, RequestPool
+from .pagination import get_paging_object
+
+'''
+An artist's full discography in three overlapping stages
+
+    1. pages of /artists/{id}/albums, the first page gives the total and the rest are requested at once
+    2. /albums with 20 ids per request, sent as soon as 20 album ids have arrived
+    3. /albums/{id}/tracks, only for albums whose embedded tracks have a "next" page
+
+Requests from all three stages share the pool, so an album's tracks can be fetched while
+later pages of albums are still arriving.
+'''
+ALBUM_PAGE_SIZE = 50
+TRACK_PAGE_SIZE = 50
+MAX_ALBUM_IDS = 20
+
+def get_albums(client, album_ids, market):
+    response = client.get_albums(album_ids, market=market)
+    if "error" in response:
+        raise Exception(f"Could not get albums. Error: {response['error']}")
+    return [album for album in response.get("albums") or [] if album != None]
+
+def fetch_discography(client, artist_id:str, include_groups:list|str|None=None, market:str|None=None,
+                      pool:RequestPool|None=None, max_workers:int=4, rate_limit:float|None=None):
+    '''
+        Yields every album of the artist as returned by get_albums, with all of its tracks in
+        album["tracks"]["items"] (and "next" set to None), in the order they are completed.
+
+        Parameters:
+            client: SpotifyClient or SpotifyOAuth
+            include_groups: album groups to include, ex. ["album", "single"]. Defaults to all of them
+            market: passed to every request
+            pool: RequestPool to run the requests in, one is created if not given
+            max_workers, rate_limit: used to create the pool when pool is not given
+    '''
+    owns_pool = pool == None
+    if owns_pool:
+        rate_limiter = RateLimiter(rate_limit) if rate_limit != None else None
+        pool = RequestPool(max_workers=max_workers, rate_limiter=rate_limiter)
+
+    # future: (stage, album id or offset)
+    pending = {}
+    seen = set()
+    album_ids = []
+    # album id: [album, track pages by offset, pages still missing]
+    partial = {}
+
+    def request_album_page(offset):
+        future = pool.submit(client.get_artist_albums, artist_id, include_groups=include_groups, market=market,
+                             limit=ALBUM_PAGE_SIZE, offset=offset)
+        pending[future] = ("albums_page", offset)
+
+    def request_albums():
+        while len(album_ids) >= MAX_ALBUM_IDS or (album_ids and not any(s == "albums_page" for s, _ in pending.values())):
+            batch = album_ids[:MAX_ALBUM_IDS]
+            del album_ids[:MAX_ALBUM_IDS]
+            pending[pool.submit(get_albums, client, batch, market)] = ("albums", None)
+
+    try:
+        request_album_page(0)
+        while pending:
+            done, _ = wait(list(pending), return_when=FIRST_COMPLETED)
+            for future in done:
+                stage, key = pending.pop(future)
+                if stage == "albums_page":
+                    page = get_paging_object(future.result())
+                    if key == 0:
+                        for offset in range(ALBUM_PAGE_SIZE, page.get("total") or 0, ALBUM_PAGE_SIZE):
+                            request_album_page(offset)
+                    for album in page.get("items") or []:
+                        if album != None and album["id"] not in seen:
+                            seen.add(album["id"])
+                            album_ids.append(album["id"])
+                    request_albums()
+
+                elif stage == "albums":
+                    for album in future.result():
+                        tracks = album.get("tracks") or {}
+                        # the embedded page is truncated, request the rest of the tracks at once
+                        offsets = range(len(tracks.get("items") or []), tracks.get("total") or 0, TRACK_PAGE_SIZE)
+                        if not tracks.get("next") or not offsets:
+                            yield album
+                            continue
+                        partial[album["id"]] = [album, {}, len(offsets)]
+                        for offset in offsets:
+                            track_future = pool.submit(client.get_album_tracks, album["id"], market=market,
+                                                       limit=TRACK_PAGE_SIZE, offset=offset)
+                            pending[track_future] = ("tracks", (album["id"], offset))
+
+                else:
+                    album_id, offset = key
+                    entry = partial[album_id]
+                    entry[1][offset] = get_paging_object(future.result()).get("items") or []
+                    entry[2] -= 1
+                    if entry[2] == 0:
+                        album, pages, _ = partial.pop(album_id)
+                        items = list(album["tracks"].get("items") or [])
+                        for offset in sorted(pages):
+                            items.extend(pages[offset])
+                        # copied rather than changed in place, the response can be shared with a ResponseCache
+                        yield dict(album, tracks=dict(album["tracks"], items=items, next=None, limit=len(items)))
+    finally:
+        for future in pending:
+            future.cancel()
+        if owns_pool:
+            pool.shutdown(wait=False)
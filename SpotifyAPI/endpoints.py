@@ -0,0 +1,309 @@
+
+__all__ = ["EndpointTemplate", "ENDPOINTS", "add_endpoint_methods"]
+
+import re
+from urllib.parse import quote_plus
+from .concurrency import RequestPool
+from .ids import is_numpy_array, to_id_list
+from .negative import expand, get_negative_kind
+from .pagination import iterate_items
+
+# characters quote_plus leaves as they are, most ids and market codes only have these
+is_safe = re.compile(r"[A-Za-z0-9_.~-]*").fullmatch
+
+class EndpointTemplate(object):
+    '''
+    An endpoint's path, allowed query parameters and limits, declared once.
+
+    The path is split around "{id}" ahead of time, so building a url is a few string
+    concatenations plus encoding the parameters that were passed. Nothing is shared or
+    changed between calls.
+
+        template = EndpointTemplate("albums/{id}/tracks", ("market", "limit", "offset"))
+        template.url("https://api.spotify.com", "4aawyAB9vmqN3uQ7FjRGTy", limit=10)
+        # https://api.spotify.com/v1/albums/4aawyAB9vmqN3uQ7FjRGTy/tracks?limit=10
+
+    The rest describes how the endpoint is called:
+        method: GET, PUT, POST or DELETE
+        max_ids: most ids the "ids" parameter takes in one request
+        pagination: "offset" or "cursor" if the response is (or holds) a paging object
+        page_key: key the paging object is nested under, ex. "albums" for new releases
+        result_key: key the list of objects is under in a response to several ids
+        scopes: scopes the user has to grant, endpoints with scopes need SpotifyOAuth
+        cacheable: the response is catalog data that is the same for every user
+    '''
+    __slots__ = ["path", "params", "prefix", "suffix", "has_id", "max_ids", "max_limit", "max_offset",
+                 "method", "pagination", "page_key", "result_key", "scopes", "cacheable"]
+
+    def __init__(self, path:str, params:tuple=(), max_ids:int|None=None, max_limit:int=50, max_offset:int=100000, version:str="v1",
+                 method:str="GET", pagination:str|None=None, page_key:str|None=None, result_key:str|None=None,
+                 scopes:tuple=(), cacheable:bool=False):
+        self.path = path
+        self.params = frozenset(params)
+        self.has_id = "{id}" in path
+        prefix, _, suffix = path.partition("{id}")
+        self.prefix = f"/{version}/{prefix}"
+        self.suffix = suffix
+        self.max_ids = max_ids
+        self.max_limit = max_limit
+        self.max_offset = max_offset
+        self.method = method
+        self.pagination = pagination
+        self.page_key = page_key
+        self.result_key = result_key
+        self.scopes = tuple(scopes)
+        self.cacheable = cacheable
+
+    def __repr__(self):
+        return f"EndpointTemplate({self.method} {self.path!r})"
+
+    def url(self, base_url:str, _id:str|None=None, **params):
+        if self.has_id:
+            if _id == None:
+                raise Exception(f"An id is required for {self.path}")
+            url = base_url + self.prefix + _id + self.suffix
+        else:
+            url = base_url + self.prefix
+        query = self.encode(params)
+        if query:
+            return url + "?" + query
+        return url
+
+    def encode(self, params:dict):
+        '''
+            Encodes the parameters the same way urlencode does, skipping the ones set to None.
+            Lists are joined with commas, limit and offset are clamped to the endpoint's range.
+        '''
+        parts = []
+        for key, value in params.items():
+            if value is None:
+                continue
+            if key not in self.params:
+                raise Exception(f"Unsupported parameter '{key}' for {self.path}")
+            if key == "limit":
+                parts.append(f"limit={min(max(int(value), 1), self.max_limit)}")
+                continue
+            elif key == "offset":
+                parts.append(f"offset={min(max(int(value), 0), self.max_offset)}")
+                continue
+            elif key == "ids":
+                if not isinstance(value, str):
+                    if is_numpy_array(value):
+                        value = to_id_list(value)
+                    if self.max_ids != None and len(value) > self.max_ids:
+                        raise Exception("Maximum number of ids exceeded")
+                    value = ",".join(value)
+            elif isinstance(value, (list, tuple)):
+                value = ",".join(map(str, value))
+            if value.__class__ is not str:
+                value = str(value)
+            parts.append(key + "=" + (value if is_safe(value) else quote_plus(value)))
+        return "&".join(parts)
+
+PAGE = ("limit", "offset")
+LIBRARY_READ = ("user-library-read",)
+LIBRARY_MODIFY = ("user-library-modify",)
+PLAYBACK_READ = ("user-read-playback-state",)
+PLAYBACK_MODIFY = ("user-modify-playback-state",)
+PLAYLIST_MODIFY = ("playlist-modify-public", "playlist-modify-private")
+FOLLOW_READ = ("user-follow-read",)
+FOLLOW_MODIFY = ("user-follow-modify",)
+
+'''
+Every endpoint the clients call, by the name of the method that calls it.
+
+SpotifyClient gets the endpoints without scopes, SpotifyOAuth the ones with scopes (and
+inherits the rest). NOTE: search stops at offset 1000, and its paging objects are nested
+under the searched type, so it has no page_key.
+
+Reference: https://developer.spotify.com/documentation/web-api/reference
+'''
+ENDPOINTS = {
+    # catalog
+    "search": EndpointTemplate("search", ("q", "type", "market", "include_external") + PAGE, max_offset=1000, cacheable=True),
+    "get_album": EndpointTemplate("albums/{id}", ("market",), cacheable=True),
+    "get_albums": EndpointTemplate("albums", ("ids", "market"), max_ids=20, result_key="albums", cacheable=True),
+    "get_album_tracks": EndpointTemplate("albums/{id}/tracks", ("market",) + PAGE, pagination="offset", cacheable=True),
+    "get_new_releases": EndpointTemplate("browse/new-releases", ("country",) + PAGE, pagination="offset", page_key="albums"),
+    "get_artist": EndpointTemplate("artists/{id}", cacheable=True),
+    "get_artists": EndpointTemplate("artists", ("ids",), max_ids=50, result_key="artists", cacheable=True),
+    "get_artist_albums": EndpointTemplate("artists/{id}/albums", ("include_groups", "market") + PAGE, pagination="offset", cacheable=True),
+    "get_artist_top_tracks": EndpointTemplate("artists/{id}/top-tracks", ("market",), cacheable=True),
+    "get_artist_related_artists": EndpointTemplate("artists/{id}/related-artists", cacheable=True),
+    "get_audiobook": EndpointTemplate("audiobooks/{id}", ("market",), cacheable=True),
+    "get_audiobooks": EndpointTemplate("audiobooks", ("ids", "market"), max_ids=50, result_key="audiobooks", cacheable=True),
+    "get_audiobook_chapters": EndpointTemplate("audiobooks/{id}/chapters", ("market",) + PAGE, pagination="offset", cacheable=True),
+    "get_browse_categories": EndpointTemplate("browse/categories", ("country", "locale") + PAGE, pagination="offset", page_key="categories", cacheable=True),
+    "get_browse_category": EndpointTemplate("browse/categories/{id}", ("country", "locale"), cacheable=True),
+    "get_chapter": EndpointTemplate("chapters/{id}", ("market",), cacheable=True),
+    "get_chapters": EndpointTemplate("chapters", ("ids", "market"), max_ids=50, result_key="chapters", cacheable=True),
+    "get_genre_seeds": EndpointTemplate("recommendations/available-genre-seeds", cacheable=True),
+    "get_available_markets": EndpointTemplate("markets", cacheable=True),
+    "get_playlist": EndpointTemplate("playlists/{id}", ("market", "fields", "additional_types")),
+    "get_featured_playlists": EndpointTemplate("browse/featured-playlists", ("country", "locale", "timestamp") + PAGE, pagination="offset", page_key="playlists"),
+    "get_categorys_playlists": EndpointTemplate("browse/categories/{id}/playlists", ("country",) + PAGE, pagination="offset", page_key="playlists"),
+    "get_playlist_cover": EndpointTemplate("playlists/{id}/images"),
+    "get_track": EndpointTemplate("tracks/{id}", ("market",), cacheable=True),
+    "get_tracks": EndpointTemplate("tracks", ("ids", "market"), max_ids=50, result_key="tracks", cacheable=True),
+    "get_track_audio_features": EndpointTemplate("audio-features/{id}", cacheable=True),
+    "get_tracks_audio_features": EndpointTemplate("audio-features", ("ids",), max_ids=100, result_key="audio_features", cacheable=True),
+    "get_tracks_audio_analysis": EndpointTemplate("audio-analysis/{id}", cacheable=True),
+    "get_users_profile": EndpointTemplate("users/{id}"),
+    "do_users_follow_playlist": EndpointTemplate("playlists/{id}/followers/contains", ("ids",), max_ids=5),
+
+    # user's library
+    "get_saved_albums": EndpointTemplate("me/albums", ("market",) + PAGE, pagination="offset", scopes=LIBRARY_READ),
+    "save_albums": EndpointTemplate("me/albums", ("ids",), max_ids=20, method="PUT", scopes=LIBRARY_MODIFY),
+    "remove_saved_albums": EndpointTemplate("me/albums", ("ids",), max_ids=20, method="DELETE", scopes=LIBRARY_MODIFY),
+    "check_saved_albums": EndpointTemplate("me/albums/contains", ("ids",), max_ids=20, scopes=LIBRARY_READ),
+    "get_saved_audiobooks": EndpointTemplate("me/audiobooks", PAGE, pagination="offset", scopes=LIBRARY_READ),
+    "save_audiobooks": EndpointTemplate("me/audiobooks", ("ids",), max_ids=50, method="PUT", scopes=LIBRARY_MODIFY),
+    "remove_saved_audiobooks": EndpointTemplate("me/audiobooks", ("ids",), max_ids=50, method="DELETE", scopes=LIBRARY_MODIFY),
+    "check_saved_audiobooks": EndpointTemplate("me/audiobooks/contains", ("ids",), max_ids=50, scopes=LIBRARY_READ),
+    "get_episode": EndpointTemplate("episodes/{id}", ("market",), scopes=("user-read-playback-position",)),
+    "get_episodes": EndpointTemplate("episodes", ("ids", "market"), max_ids=50, result_key="episodes", scopes=("user-read-playback-position",)),
+    "get_saved_episodes": EndpointTemplate("me/episodes", ("market",) + PAGE, pagination="offset", scopes=LIBRARY_READ + ("user-read-playback-position",)),
+    "save_episodes": EndpointTemplate("me/episodes", ("ids",), max_ids=50, method="PUT", scopes=LIBRARY_MODIFY),
+    "remove_saved_episodes": EndpointTemplate("me/episodes", ("ids",), max_ids=50, method="DELETE", scopes=LIBRARY_MODIFY),
+    "check_saved_episodes": EndpointTemplate("me/episodes/contains", ("ids",), max_ids=50, scopes=LIBRARY_READ),
+    "get_show": EndpointTemplate("shows/{id}", ("market",), scopes=("user-read-playback-position",)),
+    "get_shows": EndpointTemplate("shows", ("ids", "market"), max_ids=50, result_key="shows", scopes=("user-read-playback-position",)),
+    "get_saved_shows": EndpointTemplate("me/shows", PAGE, pagination="offset", scopes=LIBRARY_READ),
+    "save_shows": EndpointTemplate("me/shows", ("ids",), max_ids=50, method="PUT", scopes=LIBRARY_MODIFY),
+    "remove_saved_shows": EndpointTemplate("me/shows", ("ids", "market"), max_ids=50, method="DELETE", scopes=LIBRARY_MODIFY),
+    "check_saved_shows": EndpointTemplate("me/shows/contains", ("ids",), max_ids=50, scopes=("user-read-playback-position",)),
+    "get_saved_tracks": EndpointTemplate("me/tracks", ("market",) + PAGE, pagination="offset", scopes=LIBRARY_READ),
+    "save_tracks": EndpointTemplate("me/tracks", ("ids",), max_ids=50, method="PUT", scopes=LIBRARY_MODIFY),
+    "remove_saved_tracks": EndpointTemplate("me/tracks", ("ids",), max_ids=50, method="DELETE", scopes=LIBRARY_MODIFY),
+    "check_saved_tracks": EndpointTemplate("me/tracks/contains", ("ids",), max_ids=50, scopes=LIBRARY_READ),
+
+    # player
+    "get_playback": EndpointTemplate("me/player", ("market", "additional_types"), scopes=PLAYBACK_READ),
+    "transfer_playback": EndpointTemplate("me/player", method="PUT", scopes=PLAYBACK_MODIFY),
+    "get_available_devices": EndpointTemplate("me/player/devices", scopes=PLAYBACK_READ),
+    "get_currently_playing_track": EndpointTemplate("me/player/currently-playing", ("market", "additional_types"), scopes=("user-read-currently-playing",)),
+    "start_playback": EndpointTemplate("me/player/play", ("device_id",), method="PUT", scopes=PLAYBACK_MODIFY),
+    "stop_playback": EndpointTemplate("me/player/pause", ("device_id",), method="PUT", scopes=PLAYBACK_MODIFY),
+    "skip_to_next": EndpointTemplate("me/player/next", ("device_id",), method="POST", scopes=PLAYBACK_MODIFY),
+    "skip_to_previous": EndpointTemplate("me/player/previous", ("device_id",), method="POST", scopes=PLAYBACK_MODIFY),
+    "seek_position": EndpointTemplate("me/player/seek", ("position_ms", "device_id"), method="PUT", scopes=PLAYBACK_MODIFY),
+    "set_repeat_mode": EndpointTemplate("me/player/repeat", ("state", "device_id"), method="PUT", scopes=PLAYBACK_MODIFY),
+    "set_volume": EndpointTemplate("me/player/volume", ("volume_percent", "device_id"), method="PUT", scopes=PLAYBACK_MODIFY),
+    "toggle_shuffle": EndpointTemplate("me/player/shuffle", ("state", "device_id"), method="PUT", scopes=PLAYBACK_MODIFY),
+    "get_recently_played_tracks": EndpointTemplate("me/player/recently-played", ("limit", "after", "before"), pagination="cursor", scopes=("user-read-recently-played",)),
+    "get_queue": EndpointTemplate("me/player/queue", scopes=PLAYBACK_READ),
+    "add_item_to_queue": EndpointTemplate("me/player/queue", ("uri", "device_id"), method="POST", scopes=PLAYBACK_MODIFY),
+
+    # playlists
+    "change_playlist_details": EndpointTemplate("playlists/{id}", method="PUT", scopes=PLAYLIST_MODIFY),
+    "get_platlist_items": EndpointTemplate("playlists/{id}/tracks", ("market", "fields", "additional_types") + PAGE, pagination="offset", scopes=("playlist-read-private",)),
+    "update_playlist_items": EndpointTemplate("playlists/{id}/tracks", method="PUT", scopes=PLAYLIST_MODIFY),
+    "add_items_to_playlist": EndpointTemplate("playlists/{id}/tracks", method="POST", scopes=PLAYLIST_MODIFY),
+    "remove_items_to_playlist": EndpointTemplate("playlists/{id}/tracks", method="DELETE", scopes=PLAYLIST_MODIFY),
+    "get_current_users_playlists": EndpointTemplate("me/playlists", PAGE, pagination="offset", scopes=("playlist-read-private",)),
+    "get_users_playlists": EndpointTemplate("users/{id}/playlists", PAGE, pagination="offset", scopes=("playlist-read-private",)),
+    "create_playlist": EndpointTemplate("users/{id}/playlists", method="POST", scopes=PLAYLIST_MODIFY),
+    "add_cover_image": EndpointTemplate("playlists/{id}/images", method="PUT", scopes=("ugc-image-upload",) + PLAYLIST_MODIFY),
+    "follow_playlist": EndpointTemplate("playlists/{id}/followers", method="PUT", scopes=PLAYLIST_MODIFY),
+    "unfollow_playlist": EndpointTemplate("playlists/{id}/followers", method="DELETE", scopes=PLAYLIST_MODIFY),
+
+    # user
+    "get_current_users_profile": EndpointTemplate("me", scopes=("user-read-private", "user-read-email")),
+    "get_top_items": EndpointTemplate("me/top/{id}", ("time_range",) + PAGE, pagination="offset", scopes=("user-top-read",)),
+    "get_followed_artists": EndpointTemplate("me/following", ("type", "after", "limit"), pagination="cursor", page_key="artists", scopes=FOLLOW_READ),
+    "follow_artists_or_users": EndpointTemplate("me/following", ("type", "ids"), max_ids=50, method="PUT", scopes=FOLLOW_MODIFY),
+    "unfollow_artists_or_users": EndpointTemplate("me/following", ("type", "ids"), max_ids=50, method="DELETE", scopes=FOLLOW_MODIFY),
+    "check_artists_or_users": EndpointTemplate("me/following/contains", ("type", "ids"), max_ids=50, scopes=FOLLOW_READ),
+}
+
+'''
+Generated variants
+
+For every endpoint a class gets, add_endpoint_methods adds:
+    <name>_async: the method run in a worker thread, for asyncio code
+    <name>_batched: (endpoints with max_ids) takes any number of ids, splits them into
+        requests of max_ids run on a RequestPool and merges the responses
+    <name>_items: (paginated endpoints) iterates the items of every page
+
+    albums = client.get_albums_batched(album_ids, market="US")["albums"]
+    for item in auth.get_saved_tracks_items(limit=50):
+        ...
+
+Cached responses need nothing generated, call_endpoint uses client.cache for every
+endpoint marked cacheable.
+'''
+def merge_responses(endpoint:EndpointTemplate, responses:list):
+    for response in responses:
+        if isinstance(response, dict) and "error" in response:
+            raise Exception(f"Could not get {endpoint.path}. Error: {response['error']}")
+    if endpoint.method != "GET":
+        return all(responses)
+    items = []
+    for response in responses:
+        if endpoint.result_key != None:
+            items.extend(response.get(endpoint.result_key) or [])
+        else:
+            items.extend(response)
+    if endpoint.result_key != None:
+        return {endpoint.result_key: items}
+    return items
+
+def make_async_method(name:str):
+    async def method(self, *args, **kwargs):
+        # only imported here, asyncio is slow to import and most callers never need it
+        import asyncio
+        return await asyncio.to_thread(getattr(self, name), *args, **kwargs)
+    return method
+
+def get_request_count(ids:list, max_ids:int):
+    return -(-len(ids) // max_ids)
+
+def make_batched_method(name:str, endpoint:EndpointTemplate):
+    def method(self, ids:list, _id:str|None=None, pool:RequestPool|None=None, max_workers:int=4, **params):
+        ids = to_id_list(ids)
+        skipped = None
+        kind = get_negative_kind(endpoint) if self.negative_cache != None else None
+        if kind != None:
+            # remembered ids are left out before the ids are split into requests
+            all_ids = ids
+            ids, skipped = self.negative_cache.split(kind, ids, params.get("market"))
+            self.negative_cache.count_saved(get_request_count(all_ids, endpoint.max_ids) - get_request_count(ids, endpoint.max_ids))
+        chunks = [ids[i:i + endpoint.max_ids] for i in range(0, len(ids), endpoint.max_ids)]
+        own_pool = pool == None
+        if own_pool:
+            pool = RequestPool(max_workers=max_workers)
+        try:
+            futures = [pool.submit(self.call_endpoint, name, _id, ids=chunk, **params) for chunk in chunks]
+            response = merge_responses(endpoint, [future.result() for future in futures])
+            if skipped != None and any(skipped) and isinstance(response, dict) and isinstance(response.get(kind), list):
+                response[kind] = expand(response[kind], skipped)
+            return response
+        finally:
+            if own_pool:
+                pool.shutdown()
+    return method
+
+def make_items_method(name:str, endpoint:EndpointTemplate):
+    def method(self, *args, **kwargs):
+        return iterate_items(self, getattr(self, name), *args, page_key=endpoint.page_key, **kwargs)
+    return method
+
+def add_endpoint_methods(cls, user_endpoints:bool=False):
+    '''
+        Adds the generated variants of the endpoints with scopes (user_endpoints=True)
+        or without scopes to cls
+    '''
+    for name, endpoint in ENDPOINTS.items():
+        if bool(endpoint.scopes) != user_endpoints:
+            continue
+        variants = {f"{name}_async": make_async_method(name)}
+        if endpoint.max_ids != None:
+            variants[f"{name}_batched"] = make_batched_method(name, endpoint)
+        if endpoint.pagination != None:
+            variants[f"{name}_items"] = make_items_method(name, endpoint)
+        for variant_name, method in variants.items():
+            method.__name__ = variant_name
+            method.__qualname__ = f"{cls.__name__}.{variant_name}"
+            method.__doc__ = f"Generated from ENDPOINTS[{name!r}], see {cls.__name__}.{name}"
+            setattr(cls, variant_name, method)
+    return cls
@@ -0,0 +1,291 @@
+
+__all__ = ["BASE62", "URI_TYPES", "base62_to_int", "int_to_base62", "IdSet", "encode_ids", "decode_ids",
+           "validate_ids", "encode_uris", "decode_uris", "validate_uris", "to_id_list"]
+
+'''
+Spotify ids are 22 base62 characters encoding a 128 bit number. Kept as integers or
+packed bytes they take a fraction of the memory of the strings.
+
+For large tables of ids, encode_ids packs them into a NumPy array of (hi, lo) 64 bit pairs,
+16 bytes per id, and encode_uris adds a one byte type code. Converting, validating and
+decoding work on the whole array at once. NumPy is only imported by these functions.
+'''
+BASE62 = "0123456789abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ"
+BASE62_VALUES = {c: i for i, c in enumerate(BASE62)}
+ID_LENGTH = 22
+# 62 ** 22 is slightly more than 2 ** 128, so any 22 character string fits in 17 bytes
+ID_BYTES = 17
+
+def base62_to_int(_id:str):
+    n = 0
+    try:
+        for c in _id:
+            n = n * 62 + BASE62_VALUES[c]
+    except KeyError:
+        raise Exception(f"Invalid id: {_id}")
+    return n
+
+def int_to_base62(n:int, length:int=ID_LENGTH):
+    chars = []
+    while n:
+        n, r = divmod(n, 62)
+        chars.append(BASE62[r])
+    return "".join(reversed(chars)).rjust(length, BASE62[0])
+
+class IdSet(object):
+    '''
+    Set of Spotify ids in one bytearray, an open addressing hash table with ID_BYTES per slot.
+
+    A million ids take about 25 MB, compared to well over 100 MB for a set of strings. An
+    all zero slot is empty, so ids are stored as their number plus one.
+    '''
+    __slots__ = ["table", "capacity", "size"]
+
+    def __init__(self, ids=None, capacity:int=1024):
+        self.capacity = 1 << max(capacity - 1, 1).bit_length()
+        self.table = bytearray(self.capacity * ID_BYTES)
+        self.size = 0
+        if ids != None:
+            for _id in ids:
+                self.add(_id)
+
+    def __len__(self):
+        return self.size
+
+    def __contains__(self, _id:str):
+        key = (base62_to_int(_id) + 1).to_bytes(ID_BYTES, "big")
+        return self.find(key)[1]
+
+    def __iter__(self):
+        empty = bytes(ID_BYTES)
+        for i in range(0, len(self.table), ID_BYTES):
+            key = self.table[i:i + ID_BYTES]
+            if key != empty:
+                yield int_to_base62(int.from_bytes(key, "big") - 1)
+
+    def find(self, key:bytes):
+        '''
+            Returns (offset of the slot, whether the slot holds key)
+        '''
+        empty = bytes(ID_BYTES)
+        mask = self.capacity - 1
+        # the low bits of an id are already uniformly distributed
+        slot = int.from_bytes(key[-8:], "big") & mask
+        while True:
+            offset = slot * ID_BYTES
+            current = self.table[offset:offset + ID_BYTES]
+            if current == key:
+                return offset, True
+            if current == empty:
+                return offset, False
+            slot = (slot + 1) & mask
+
+    def add(self, _id:str):
+        '''
+            Adds the id, returns False if it was already in the set
+        '''
+        key = (base62_to_int(_id) + 1).to_bytes(ID_BYTES, "big")
+        offset, found = self.find(key)
+        if found:
+            return False
+        self.table[offset:offset + ID_BYTES] = key
+        self.size += 1
+        # grow at 2/3 full to keep the probes short
+        if self.size * 3 >= self.capacity * 2:
+            self.resize(self.capacity * 2)
+        return True
+
+    def resize(self, capacity:int):
+        old_table = self.table
+        self.capacity = capacity
+        self.table = bytearray(capacity * ID_BYTES)
+        empty = bytes(ID_BYTES)
+        for i in range(0, len(old_table), ID_BYTES):
+            key = bytes(old_table[i:i + ID_BYTES])
+            if key != empty:
+                offset = self.find(key)[0]
+                self.table[offset:offset + ID_BYTES] = key
+
+    def to_bytes(self):
+        '''
+            The ids packed back to back, ID_BYTES each
+        '''
+        empty = bytes(ID_BYTES)
+        table = self.table
+        return b"".join(table[i:i + ID_BYTES] for i in range(0, len(table), ID_BYTES) if table[i:i + ID_BYTES] != empty)
+
+    @classmethod
+    def from_bytes(cls, data:bytes):
+        count = len(data) // ID_BYTES
+        id_set = cls(capacity=count * 2)
+        for i in range(0, len(data), ID_BYTES):
+            key = bytes(data[i:i + ID_BYTES])
+            offset, found = id_set.find(key)
+            if not found:
+                id_set.table[offset:offset + ID_BYTES] = key
+                id_set.size += 1
+        return id_set
+
+# types that can appear in a spotify:<type>:<id> uri with a base62 id, the index is the type code
+URI_TYPES = ("track", "episode", "album", "artist", "playlist", "show", "audiobook", "chapter")
+INVALID_DIGIT = 255
+MASK_32 = 0xFFFFFFFF
+
+def get_numpy():
+    try:
+        import numpy
+    except ImportError:
+        raise Exception("NumPy is required to encode ids into arrays. Install it with: pip install numpy")
+    return numpy
+
+def get_dtypes(np):
+    id_dtype = np.dtype([("hi", "<u8"), ("lo", "<u8")])
+    uri_dtype = np.dtype([("type", "u1"), ("hi", "<u8"), ("lo", "<u8")])
+    return id_dtype, uri_dtype
+
+def is_numpy_array(value):
+    # checked without importing numpy
+    return type(value).__module__ == "numpy" and hasattr(value, "dtype")
+
+def to_bytes_array(np, values, width:int|None=None):
+    if is_numpy_array(values) and values.dtype.kind == "S":
+        return values
+    values = values.tolist() if is_numpy_array(values) else list(values)
+    try:
+        return np.array(values, dtype=f"S{width}" if width != None else "S")
+    except UnicodeEncodeError:
+        # anything that is not ascii can not be a valid id, "?" makes it fail validation
+        return np.array([v.encode("ascii", "replace") for v in values], dtype=f"S{width}" if width != None else "S")
+
+def parse_ids(np, ids):
+    '''
+        Returns (hi, lo, valid) for an array of ids as bytes
+    '''
+    count = len(ids)
+    # one byte more than an id, so longer strings are not cut to 22 characters
+    chars = np.zeros((count, ID_LENGTH + 1), dtype=np.uint8)
+    raw = ids.view(np.uint8).reshape(count, ids.dtype.itemsize) if count else np.zeros((0, 0), dtype=np.uint8)
+    width = min(raw.shape[1], ID_LENGTH + 1)
+    chars[:, :width] = raw[:, :width]
+    lookup = np.full(256, INVALID_DIGIT, dtype=np.uint8)
+    lookup[np.frombuffer(BASE62.encode("ascii"), dtype=np.uint8)] = np.arange(62, dtype=np.uint8)
+    digits = lookup[chars[:, :ID_LENGTH]]
+    valid = (digits != INVALID_DIGIT).all(axis=1) & (chars[:, ID_LENGTH] == 0)
+    if raw.shape[1] > ID_LENGTH + 1:
+        valid &= (raw[:, ID_LENGTH + 1:] == 0).all(axis=1)
+    digits = np.where(valid[:, None], digits, 0).astype(np.uint64)
+
+    # four 32 bit limbs in uint64 so limb * 62 + carry can not overflow, least significant first
+    limbs = [np.zeros(count, dtype=np.uint64) for _ in range(4)]
+    base, shift, mask = np.uint64(62), np.uint64(32), np.uint64(MASK_32)
+    for column in range(ID_LENGTH):
+        carry = digits[:, column]
+        for i in range(4):
+            value = limbs[i] * base + carry
+            limbs[i] = value & mask
+            carry = value >> shift
+        # more than 128 bits
+        valid &= carry == 0
+    hi = (limbs[3] << shift) | limbs[2]
+    lo = (limbs[1] << shift) | limbs[0]
+    return hi, lo, valid
+
+def format_ids(np, hi, lo):
+    '''
+        Returns a list of id strings for arrays of hi and lo
+    '''
+    count = len(hi)
+    base, shift, mask = np.uint64(62), np.uint64(32), np.uint64(MASK_32)
+    limbs = [(hi >> shift) & mask, hi & mask, (lo >> shift) & mask, lo & mask]
+    digits = np.zeros((count, ID_LENGTH), dtype=np.uint8)
+    for column in range(ID_LENGTH - 1, -1, -1):
+        remainder = np.zeros(count, dtype=np.uint64)
+        for i in range(4):
+            value = (remainder << shift) | limbs[i]
+            limbs[i] = value // base
+            remainder = value % base
+        digits[:, column] = remainder
+    chars = np.frombuffer(BASE62.encode("ascii"), dtype=np.uint8)[digits]
+    return np.ascontiguousarray(chars).view(f"S{ID_LENGTH}").ravel().astype(f"U{ID_LENGTH}").tolist()
+
+def validate_ids(ids):
+    '''
+        Returns a NumPy array of bools, True for each valid id
+    '''
+    np = get_numpy()
+    return parse_ids(np, to_bytes_array(np, ids, ID_LENGTH + 1))[2]
+
+def encode_ids(ids):
+    '''
+        Packs a sequence of ids into a NumPy array with fields hi and lo. Raises an Exception
+        naming the first invalid id.
+    '''
+    np = get_numpy()
+    id_dtype, _ = get_dtypes(np)
+    ids = to_bytes_array(np, ids, ID_LENGTH + 1)
+    hi, lo, valid = parse_ids(np, ids)
+    if not valid.all():
+        raise Exception(f"Invalid id: {ids[np.argmin(valid)].decode('ascii', 'replace')}")
+    encoded = np.empty(len(ids), dtype=id_dtype)
+    encoded["hi"], encoded["lo"] = hi, lo
+    return encoded
+
+def decode_ids(encoded):
+    np = get_numpy()
+    return format_ids(np, np.asarray(encoded["hi"], dtype=np.uint64), np.asarray(encoded["lo"], dtype=np.uint64))
+
+def parse_uris(np, uris, types):
+    uris = to_bytes_array(np, uris)
+    parts = np.char.rpartition(uris, b":")
+    codes = np.full(len(uris), INVALID_DIGIT, dtype=np.uint8)
+    for code, uri_type in enumerate(URI_TYPES):
+        if types == None or uri_type in types:
+            codes[parts[:, 0] == f"spotify:{uri_type}".encode("ascii")] = code
+    hi, lo, valid = parse_ids(np, parts[:, 2].astype(f"S{ID_LENGTH + 1}"))
+    # ids longer than 22 characters were cut to 23, so they still fail the length check
+    valid &= codes != INVALID_DIGIT
+    return codes, hi, lo, valid, uris
+
+def validate_uris(uris, types:list|None=None):
+    '''
+        Returns a NumPy array of bools, True for each valid uri of one of types (default URI_TYPES)
+    '''
+    np = get_numpy()
+    _, uri_dtype = get_dtypes(np)
+    if is_numpy_array(uris) and uris.dtype == uri_dtype:
+        allowed = [code for code, uri_type in enumerate(URI_TYPES) if types == None or uri_type in types]
+        return np.isin(uris["type"], allowed)
+    return parse_uris(np, uris, types)[3]
+
+def encode_uris(uris, types:list|None=None):
+    '''
+        Packs a sequence of spotify:<type>:<id> uris into a NumPy array with fields type (index
+        in URI_TYPES), hi and lo. Raises an Exception naming the first invalid uri.
+    '''
+    np = get_numpy()
+    _, uri_dtype = get_dtypes(np)
+    codes, hi, lo, valid, uris = parse_uris(np, uris, types)
+    if not valid.all():
+        raise Exception(f"Invalid uri: {uris[np.argmin(valid)].decode('ascii', 'replace')}")
+    encoded = np.empty(len(uris), dtype=uri_dtype)
+    encoded["type"], encoded["hi"], encoded["lo"] = codes, hi, lo
+    return encoded
+
+def decode_uris(encoded):
+    np = get_numpy()
+    ids = format_ids(np, np.asarray(encoded["hi"], dtype=np.uint64), np.asarray(encoded["lo"], dtype=np.uint64))
+    return [f"spotify:{URI_TYPES[code]}:{_id}" for code, _id in zip(encoded["type"].tolist(), ids)]
+
+def to_id_list(values):
+    '''
+        Returns ids (or uris) as a list of strings. Arrays from encode_ids and encode_uris are
+        decoded, NumPy arrays of strings converted, anything else is passed to list().
+    '''
+    if not is_numpy_array(values):
+        return list(values)
+    names = values.dtype.names
+    if names == ("hi", "lo"):
+        return decode_ids(values)
+    if names == ("type", "hi", "lo"):
+        return decode_uris(values)
+    return [v.decode("ascii") if isinstance(v, bytes) else v for v in values.tolist()]
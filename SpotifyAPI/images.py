@@ -0,0 +1,405 @@
+
+__all__ = ["JPEG_SIGNATURE", "MAX_COVER_SIZE", "CoverImage", "Base64Stream", "prepare_cover_image",
+           "CoverUploadResult", "CoverUploadReport", "upload_cover_images"]
+
+import base64
+import io
+import os
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from .concurrency import RateLimiter, RequestPool
+
+'''
+Playlist cover images
+
+Spotify takes the cover as the base64 encoded JPEG in the request body, up to 256 KB after
+encoding. prepare_cover_image reads the image from a path, bytes or a binary stream, checks
+the JPEG signature in the first bytes and only decodes the image (with Pillow) when it has
+to be converted or made smaller. The body is then encoded while it is sent, a few KB at a
+time, so uploading covers in bulk never holds more than one image in memory per upload.
+
+Reference: https://developer.spotify.com/documentation/web-api/reference/upload-custom-playlist-cover
+'''
+JPEG_SIGNATURE = b"\xff\xd8\xff"
+# base64 encoded size limit
+MAX_COVER_SIZE = 256 * 1024
+# read size while encoding, a multiple of 3 so every chunk encodes without padding
+CHUNK_SIZE = 3 * 16384
+
+def get_max_raw_size(max_size:int):
+    # every 3 bytes encode to 4
+    return max_size // 4 * 3
+
+def get_base64_length(size:int):
+    return (size + 2) // 3 * 4
+
+class Base64Stream(object):
+    '''
+    Read-only file object that base64 encodes stream while it is read.
+
+    It has a length, so requests sends it with a Content-Length header and reads it in
+    blocks instead of loading it. rewind() starts it over, so a request can be retried.
+    '''
+    def __init__(self, stream, size:int):
+        self.stream = stream
+        self.size = size
+        self.buffer = b""
+        try:
+            self.start = stream.tell() if stream.seekable() else None
+        except (AttributeError, OSError):
+            self.start = None
+
+    def rewind(self):
+        '''
+            Returns False if the stream can not seek back to where it started
+        '''
+        if self.start == None:
+            return False
+        self.stream.seek(self.start)
+        self.buffer = b""
+        return True
+
+    def __len__(self):
+        return get_base64_length(self.size)
+
+    def read(self, size:int=-1):
+        if size == None or size < 0:
+            data = self.buffer + b"".join(self)
+            self.buffer = b""
+            return data
+        while len(self.buffer) < size:
+            chunk = self.stream.read(max(CHUNK_SIZE, size // 4 * 3))
+            if not chunk:
+                break
+            self.buffer += self.encode(chunk)
+        data, self.buffer = self.buffer[:size], self.buffer[size:]
+        return data
+
+    def encode(self, chunk:bytes):
+        # stream.read can return less than asked for, keep the encoded chunks aligned to 3 bytes
+        while len(chunk) % 3:
+            more = self.stream.read(3 - len(chunk) % 3)
+            if not more:
+                break
+            chunk += more
+        return base64.b64encode(chunk)
+
+    def __iter__(self):
+        while True:
+            chunk = self.stream.read(CHUNK_SIZE)
+            if not chunk:
+                return
+            yield self.encode(chunk)
+
+class CoverImage(object):
+    '''
+    A JPEG ready to upload: stream holds size bytes starting at the current position.
+    recompressed is True when the image was converted or resized to fit.
+    '''
+    __slots__ = ["stream", "size", "recompressed", "owns_stream"]
+
+    def __init__(self, stream, size:int, recompressed:bool=False, owns_stream:bool=False):
+        self.stream = stream
+        self.size = size
+        self.recompressed = recompressed
+        self.owns_stream = owns_stream
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def get_body(self):
+        '''
+            Returns the base64 request body as a file object that encodes while it is read
+        '''
+        return Base64Stream(self.stream, self.size)
+
+    def encoded_chunks(self):
+        return iter(self.get_body())
+
+    def close(self):
+        if self.owns_stream:
+            self.stream.close()
+
+def open_image_source(source):
+    '''
+        Returns (binary stream, whether it was opened here)
+    '''
+    if isinstance(source, (str, os.PathLike)):
+        return open(source, "rb"), True
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        return io.BytesIO(source), True
+    if hasattr(source, "read"):
+        return source, False
+    raise Exception("Unsupported image source, pass a file path, bytes or a binary stream")
+
+def read_up_to(stream, size:int):
+    # a single read of a pipe or socket can return less than asked for
+    chunks = []
+    while size > 0:
+        chunk = stream.read(size)
+        if not chunk:
+            break
+        chunks.append(chunk)
+        size -= len(chunk)
+    return b"".join(chunks)
+
+def get_remaining_size(stream):
+    '''
+        Returns the number of bytes left in a seekable stream, or None
+    '''
+    try:
+        if not stream.seekable():
+            return None
+        position = stream.tell()
+        size = stream.seek(0, os.SEEK_END) - position
+        stream.seek(position)
+        return size
+    except (AttributeError, OSError):
+        return None
+
+def recompress(stream, max_raw_size:int, max_dimension:int, quality:int, min_quality:int):
+    '''
+        Decodes the image from the current position of stream with Pillow and saves it as a
+        JPEG that fits in max_raw_size, lowering the quality and then the dimensions until it
+        does. Returns (stream, size)
+    '''
+    try:
+        from PIL import Image
+    except ImportError:
+        raise Exception("Pillow is needed to convert or resize cover images: pip install Pillow")
+
+    if stream.tell() > 0:
+        # Image.open reads from the start of the stream, not from where it is
+        stream = io.BytesIO(stream.read())
+
+    with Image.open(stream) as image:
+        # lets JPEGs decode at a reduced scale instead of at full size
+        image.draft("RGB", (max_dimension, max_dimension))
+        image = image.convert("RGB")
+    dimension = max_dimension
+    while True:
+        resized = image.copy()
+        resized.thumbnail((dimension, dimension))
+        for current_quality in range(quality, min_quality - 1, -10):
+            output = io.BytesIO()
+            resized.save(output, "JPEG", quality=current_quality, optimize=True)
+            size = output.tell()
+            if size <= max_raw_size:
+                output.seek(0)
+                return output, size
+        if dimension <= 64:
+            raise Exception("Could not make the cover image small enough")
+        dimension = dimension * 3 // 4
+
+def prepare_cover_image(source, max_size:int=MAX_COVER_SIZE, max_dimension:int=640, quality:int=90, min_quality:int=40):
+    '''
+        Parameters:
+            source: file path, bytes or binary stream (read from its current position)
+            max_size: limit of the base64 encoded body
+            max_dimension: longest side of a recompressed image, in pixels
+            quality, min_quality: JPEG quality to start and stop recompressing at
+
+        Returns a CoverImage. A JPEG that already fits is streamed as it is, anything
+        else is converted with Pillow.
+    '''
+    stream, opened = open_image_source(source)
+    max_raw_size = get_max_raw_size(max_size)
+    try:
+        size = get_remaining_size(stream)
+        if size == None:
+            # can not seek, read up to the limit to find out whether it fits
+            head = read_up_to(stream, max_raw_size + 1)
+            if len(head) <= max_raw_size:
+                size = len(head)
+                stream = io.BytesIO(head)
+            else:
+                stream = io.BytesIO(head + stream.read())
+                size = max_raw_size + 1
+            opened = True
+
+        position = stream.tell()
+        header = stream.read(len(JPEG_SIGNATURE))
+        stream.seek(position)
+        if header == JPEG_SIGNATURE and size <= max_raw_size:
+            return CoverImage(stream, size, owns_stream=opened)
+
+        output, size = recompress(stream, max_raw_size, max_dimension, quality, min_quality)
+        if opened:
+            stream.close()
+        return CoverImage(output, size, recompressed=True, owns_stream=True)
+    except Exception:
+        if opened:
+            stream.close()
+        raise
+
+def fits_as_is(source, max_size:int=MAX_COVER_SIZE):
+    '''
+        True if source (a path or bytes) is a JPEG under the limit, checked from the file size
+        and the first bytes only. Streams return None, they are checked when uploaded.
+    '''
+    max_raw_size = get_max_raw_size(max_size)
+    if isinstance(source, (str, os.PathLike)):
+        if os.path.getsize(source) > max_raw_size:
+            return False
+        with open(source, "rb") as f:
+            return f.read(len(JPEG_SIGNATURE)) == JPEG_SIGNATURE
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        return len(source) <= max_raw_size and bytes(source[:len(JPEG_SIGNATURE)]) == JPEG_SIGNATURE
+    return None
+
+def recompress_cover(source, options:dict):
+    '''
+        Runs in a worker process, returns the JPEG bytes prepare_cover_image made from source
+    '''
+    with prepare_cover_image(source, **options) as cover:
+        return cover.stream.read()
+
+class CoverUploadResult(object):
+    __slots__ = ["playlist_id", "ok", "recompressed", "size", "seconds", "error"]
+
+    def __init__(self, playlist_id:str, ok:bool, recompressed:bool=False, size:int=0, seconds:float=0.0, error:str|None=None):
+        self.playlist_id = playlist_id
+        self.ok = ok
+        self.recompressed = recompressed
+        # bytes of JPEG uploaded, before base64
+        self.size = size
+        self.seconds = seconds
+        self.error = error
+
+    def __repr__(self):
+        status = "ok" if self.ok else f"failed: {self.error}"
+        return f"CoverUploadResult({self.playlist_id!r}, {status})"
+
+class CoverUploadReport(object):
+    '''
+    Results of upload_cover_images, in the order the uploads finished, and throughput stats
+    '''
+    def __init__(self):
+        self.results = []
+        self.uploaded = 0
+        self.failed = 0
+        self.recompressed = 0
+        self.bytes_sent = 0
+        self.started = time.monotonic()
+        self.seconds = 0.0
+
+    def add(self, result:CoverUploadResult):
+        self.results.append(result)
+        if result.ok:
+            self.uploaded += 1
+            self.bytes_sent += get_base64_length(result.size)
+        else:
+            self.failed += 1
+        if result.recompressed:
+            self.recompressed += 1
+        self.seconds = time.monotonic() - self.started
+
+    @property
+    def images_per_second(self):
+        return len(self.results) / self.seconds if self.seconds else 0.0
+
+    def get_stats(self):
+        return {"uploaded": self.uploaded, "failed": self.failed, "recompressed": self.recompressed,
+                "bytes_sent": self.bytes_sent, "seconds": self.seconds, "images_per_second": self.images_per_second}
+
+def upload_cover(auth, playlist_id:str, source, recompressed:bool, options:dict):
+    start = time.monotonic()
+    try:
+        with prepare_cover_image(source, **options) as cover:
+            response = auth.call_endpoint("add_cover_image", playlist_id, data=cover.get_body())
+            size = cover.size
+            recompressed = recompressed or cover.recompressed
+        if response == {}:
+            raise Exception("the client is missing the ugc-image-upload or playlist-modify scopes")
+        if response != True:
+            raise Exception(f"upload failed. Error: {response.get('error') if isinstance(response, dict) else response}")
+        return CoverUploadResult(playlist_id, True, recompressed, size, time.monotonic() - start)
+    except Exception as e:
+        return CoverUploadResult(playlist_id, False, recompressed, 0, time.monotonic() - start, str(e))
+
+def upload_cover_images(auth, items, callback=None, pool:RequestPool|None=None, max_workers:int=4, rate_limit:float|None=None,
+                        processes:int|None=None, max_pending:int|None=None, **options):
+    '''
+        Uploads a cover for each (playlist_id, image) pair in items, where image is a file
+        path, bytes or a binary stream.
+
+        Images that have to be converted or resized go to a process pool, since Pillow
+        holds the GIL while it works. JPEGs that already fit skip it, and every upload goes
+        through the RequestPool. Items are read lazily and at most max_pending are in flight,
+        so items can be a generator over thousands of playlists.
+
+        Parameters:
+            auth: SpotifyOAuth with the ugc-image-upload and playlist-modify scopes
+            callback: function called with each CoverUploadResult as it finishes
+            pool: RequestPool to upload on, one is created if not given
+            max_workers, rate_limit: used to create the pool when pool is not given
+            processes: worker processes for resizing, defaults to the number of CPUs
+            max_pending: items being resized or uploaded at once, defaults to
+                2 * (processes + max_workers)
+            options: passed to prepare_cover_image, ex. max_dimension
+
+        NOTE: streams can not be sent to another process, they are prepared in the upload thread.
+
+        Returns a CoverUploadReport
+    '''
+    owns_pool = pool == None
+    if owns_pool:
+        rate_limiter = RateLimiter(rate_limit) if rate_limit != None else None
+        pool = RequestPool(max_workers=max_workers, rate_limiter=rate_limiter)
+    if processes == None:
+        processes = os.cpu_count() or 1
+    if max_pending == None:
+        max_pending = 2 * (processes + pool.max_workers)
+    process_pool = ProcessPoolExecutor(max_workers=processes)
+
+    report = CoverUploadReport()
+    def finish(result):
+        report.add(result)
+        if callback != None:
+            callback(result)
+
+    resizing = {}
+    uploading = {}
+    items = iter(items)
+    exhausted = False
+    try:
+        while True:
+            while not exhausted and len(resizing) + len(uploading) < max_pending:
+                try:
+                    playlist_id, source = next(items)
+                except StopIteration:
+                    exhausted = True
+                    break
+                try:
+                    fits = fits_as_is(source, options.get("max_size", MAX_COVER_SIZE))
+                except Exception as e:
+                    finish(CoverUploadResult(playlist_id, False, error=str(e)))
+                    continue
+                if fits == False:
+                    resizing[process_pool.submit(recompress_cover, source, options)] = playlist_id
+                else:
+                    uploading[pool.submit(upload_cover, auth, playlist_id, source, False, options)] = playlist_id
+            if not resizing and not uploading:
+                break
+
+            done, _ = wait(list(resizing) + list(uploading), return_when=FIRST_COMPLETED)
+            for future in done:
+                if future in resizing:
+                    playlist_id = resizing.pop(future)
+                    try:
+                        data = future.result()
+                    except Exception as e:
+                        finish(CoverUploadResult(playlist_id, False, error=str(e)))
+                        continue
+                    uploading[pool.submit(upload_cover, auth, playlist_id, data, True, options)] = playlist_id
+                else:
+                    uploading.pop(future)
+                    finish(future.result())
+        return report
+    finally:
+        process_pool.shutdown(cancel_futures=True)
+        if owns_pool:
+            pool.shutdown()
@@ -0,0 +1,97 @@
+
+__all__ = ["InterningDecoder"]
+
+import threading
+from collections import OrderedDict
+
+'''
+Shared objects for repeated parts of responses
+
+Pages of tracks repeat the same artists, albums, images and lists of markets in every item.
+json.loads is given an object_hook that replaces each object with an identical one it has
+already seen, so a few hundred thousand tracks share a few thousand artist and album
+objects. Objects are decoded innermost first, so by the time an object is looked up its
+nested objects are already the shared ones, and it can be keyed by their identities.
+
+    client.decoder = InterningDecoder()
+'''
+class InterningDecoder(object):
+    '''
+    Parameters:
+        max_objects: objects and lists kept to share, the least recently used is dropped past it
+        max_strings: strings kept to share, same as above
+        max_string_length: longer strings (descriptions etc.) are not shared
+
+    NOTE: responses decoded with it share objects, do not modify them.
+    '''
+    def __init__(self, max_objects:int=100000, max_strings:int=100000, max_string_length:int=128):
+        self.max_objects = max_objects
+        self.max_strings = max_strings
+        self.max_string_length = max_string_length
+        # key: shared object. Keys hold the ids of nested objects, which stay valid because
+        # the shared object keeps its nested objects alive
+        self.objects = OrderedDict()
+        self.strings = OrderedDict()
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        return len(self.objects)
+
+    def get_stats(self):
+        with self.lock:
+            return {"objects": len(self.objects), "strings": len(self.strings), "hits": self.hits, "misses": self.misses}
+
+    def clear(self):
+        with self.lock:
+            self.objects.clear()
+            self.strings.clear()
+
+    def object_hook(self, obj:dict):
+        with self.lock:
+            items = [(self.intern_string(k), self.intern_value(v)) for k, v in obj.items()]
+            key = ("object",) + tuple((k, self.get_identity(v)) for k, v in items)
+            return self.intern(key, dict(items))
+
+    def intern(self, key, value):
+        shared = self.objects.get(key)
+        if shared is not None:
+            self.objects.move_to_end(key)
+            self.hits += 1
+            return shared
+        self.misses += 1
+        self.objects[key] = value
+        if len(self.objects) > self.max_objects:
+            self.objects.popitem(last=False)
+        return value
+
+    def intern_value(self, value):
+        if isinstance(value, str):
+            return self.intern_string(value)
+        if isinstance(value, list):
+            values = [self.intern_value(v) for v in value]
+            key = ("list",) + tuple(self.get_identity(v) for v in values)
+            return self.intern(key, values)
+        # dictionaries went through object_hook already, numbers and None are kept as they are
+        return value
+
+    def intern_string(self, value:str):
+        if len(value) > self.max_string_length:
+            return value
+        shared = self.strings.get(value)
+        if shared is not None:
+            self.strings.move_to_end(value)
+            return shared
+        self.strings[value] = value
+        if len(self.strings) > self.max_strings:
+            self.strings.popitem(last=False)
+        return value
+
+    def get_identity(self, value):
+        if isinstance(value, str):
+            return value
+        if isinstance(value, (dict, list)):
+            return (type(value), id(value))
+        # 1, 1.0 and True are equal as keys, the type keeps them apart
+        return (type(value), value)
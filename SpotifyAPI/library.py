@@ -0,0 +1,144 @@
+
+__all__ = ["LIBRARY_COLLECTIONS", "SAVED_ITEM_METHODS", "export_library"]
+
+import json
+import threading
+from .checkpoint import JSONCheckpoint
+from .concurrency import RateLimiter, RequestPool
+from .endpoints import ENDPOINTS
+from .pagination import iterate_pages
+
+'''
+Collections in a user's library
+
+    name: (method that returns the first page, key the paging object is nested under)
+
+NOTE: get_followed_artists is cursor based and nests its paging object under "artists",
+    every other collection is offset based.
+'''
+LIBRARY_COLLECTIONS = {
+    "tracks": ("get_saved_tracks", None),
+    "albums": ("get_saved_albums", None),
+    "shows": ("get_saved_shows", None),
+    "episodes": ("get_saved_episodes", None),
+    "audiobooks": ("get_saved_audiobooks", None),
+    "artists": ("get_followed_artists", "artists"),
+    "playlists": ("get_current_users_playlists", None)
+}
+
+'''
+Methods to check, save and remove items in a user's library
+
+    name: (check method, save method, remove method, max number of ids per request)
+
+NOTE: artists and users both use the /me/following endpoints, which take the type as
+    the first argument.
+'''
+SAVED_ITEM_METHODS = {
+    "tracks": ("check_saved_tracks", "save_tracks", "remove_saved_tracks", 50),
+    "albums": ("check_saved_albums", "save_albums", "remove_saved_albums", 20),
+    "episodes": ("check_saved_episodes", "save_episodes", "remove_saved_episodes", 50),
+    "shows": ("check_saved_shows", "save_shows", "remove_saved_shows", 50),
+    "audiobooks": ("check_saved_audiobooks", "save_audiobooks", "remove_saved_audiobooks", 50),
+    "artists": ("check_artists_or_users", "follow_artists_or_users", "unfollow_artists_or_users", 50),
+    "users": ("check_artists_or_users", "follow_artists_or_users", "unfollow_artists_or_users", 50)
+}
+
+def get_saved_item_method(auth, collection:str, action:str):
+    '''
+        Returns a function that takes a list of ids for the action ("check", "save" or "remove")
+    '''
+    if collection not in SAVED_ITEM_METHODS:
+        raise Exception(f"Invalid collection. Valid values are {', '.join(SAVED_ITEM_METHODS)}")
+    actions = ["check", "save", "remove"]
+    method = getattr(auth, SAVED_ITEM_METHODS[collection][actions.index(action)])
+    if collection in ["artists", "users"]:
+        follow_type = collection[:-1]
+        return lambda ids: method(follow_type, ids)
+    return method
+
+def chunk_list(list_items, size):
+    return [list_items[i:i + size] for i in range(0, len(list_items), size)]
+
+def export_library(auth, output=None, callback=None, collections:list|None=None, checkpoint:str|JSONCheckpoint|None=None,
+                   pool:RequestPool|None=None, max_workers:int=4, rate_limit:float|None=None, limit:int=50):
+    '''
+        Pages every collection in the user's library concurrently and streams the items out
+        as they arrive. Only one page per collection is held in memory at a time.
+
+        Parameters:
+            auth: SpotifyOAuth or SpotifyPKCE with the user-library-read, user-follow-read and
+                playlist-read-private scopes
+            output: file-like object, each item is written as one line of JSON:
+                {"collection": "tracks", "item": {...}}
+            callback: function called with (collection, item) for each item
+            collections: names from LIBRARY_COLLECTIONS, defaults to all of them
+            checkpoint: path or JSONCheckpoint. After each page is written the url of the next
+                page is saved, so running the export again resumes each collection where it
+                stopped. Open output in append mode when resuming.
+            pool: RequestPool to run the requests in, one is created if not given
+            max_workers, rate_limit: used to create the pool when pool is not given
+
+        NOTE: a page is written before the checkpoint is saved, so if the process is killed in
+            between, that page is written again on resume.
+        NOTE: a collection auth does not have the scopes for raises an exception instead of
+            being exported (and checkpointed) as empty.
+
+        Returns: Dictionary with the number of items exported per collection
+    '''
+    if output == None and callback == None:
+        raise Exception("Please pass in an output file, a callback, or both.")
+    if collections == None:
+        collections = list(LIBRARY_COLLECTIONS)
+    if not all(c in LIBRARY_COLLECTIONS for c in collections):
+        raise Exception(f"Invalid collection. Valid values are {', '.join(LIBRARY_COLLECTIONS)}")
+    if isinstance(checkpoint, str):
+        checkpoint = JSONCheckpoint(checkpoint)
+
+    owns_pool = pool == None
+    if owns_pool:
+        rate_limiter = RateLimiter(rate_limit) if rate_limit != None else None
+        pool = RequestPool(max_workers=max_workers, rate_limiter=rate_limiter)
+
+    write_lock = threading.Lock()
+    def emit(collection, items):
+        with write_lock:
+            for item in items:
+                if output != None:
+                    output.write(json.dumps({"collection": collection, "item": item}) + "\n")
+                if callback != None:
+                    callback(collection, item)
+            if output != None:
+                output.flush()
+
+    try:
+        futures = {c: pool.executor.submit(export_collection, auth, c, emit, checkpoint, pool, limit) for c in collections}
+        return {c: future.result() for c, future in futures.items()}
+    finally:
+        if owns_pool:
+            pool.shutdown()
+
+def export_collection(auth, collection, emit, checkpoint, pool, limit):
+    state = {"next": None, "count": 0, "done": False}
+    if checkpoint != None:
+        state = checkpoint.get(collection, state)
+    if state["done"]:
+        return state["count"]
+
+    method_name, page_key = LIBRARY_COLLECTIONS[collection]
+    scopes = ENDPOINTS[method_name].scopes
+    if not auth.has_required_scopes(scopes):
+        raise Exception(f"Could not export {collection}, the user has not granted the scopes: {', '.join(scopes)}")
+    method = getattr(auth, method_name)
+    pages = iterate_pages(auth, method, page_key=page_key, call=pool.call, next_url=state["next"], limit=limit)
+    for page in pages:
+        items = page.get("items") or []
+        emit(collection, items)
+        state = {"next": page.get("next"), "count": state["count"] + len(items), "done": not page.get("next")}
+        if checkpoint != None:
+            checkpoint.set(collection, state)
+
+    if checkpoint != None and not state["done"]:
+        # the last page had no items, nothing left to resume
+        checkpoint.set(collection, dict(state, done=True))
+    return state["count"]
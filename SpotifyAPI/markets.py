@@ -0,0 +1,107 @@
+
+__all__ = ["MarketVariants", "fetch_market_variants"]
+
+import hashlib
+import json
+from concurrent.futures import as_completed
+from .concurrency import RateLimiter, RequestPool
+
+'''
+The same album, track, playlist etc. in many markets
+
+Most markets get exactly the same response, so each distinct response is kept once and
+every market points to the one it got. Responses are compared by a hash of their JSON with
+the keys sorted.
+'''
+def get_content_hash(response):
+    content = json.dumps(response, sort_keys=True, separators=(",", ":"), ensure_ascii=False)
+    return hashlib.blake2b(content.encode("utf-8"), digest_size=16).hexdigest()
+
+class MarketVariants(object):
+    '''
+    Distinct responses of one request across markets.
+
+    variants: the distinct responses, in the order they were first seen
+    markets: market -> index of its response in variants
+    errors: market -> exception, for the markets whose request failed
+    '''
+    def __init__(self):
+        self.variants = []
+        self.markets = {}
+        self.errors = {}
+        # content hash: index in variants
+        self.hashes = {}
+
+    def add(self, market:str, response):
+        content_hash = get_content_hash(response)
+        index = self.hashes.get(content_hash)
+        if index == None:
+            index = len(self.variants)
+            self.hashes[content_hash] = index
+            self.variants.append(response)
+        self.markets[market] = index
+        return index
+
+    def __len__(self):
+        return len(self.variants)
+
+    def get(self, market:str, default=None):
+        index = self.markets.get(market)
+        return self.variants[index] if index != None else default
+
+    def get_groups(self):
+        '''
+            Returns the markets that got each variant, in the order of variants
+        '''
+        groups = [[] for _ in self.variants]
+        for market, index in sorted(self.markets.items()):
+            groups[index].append(market)
+        return groups
+
+    def to_dict(self):
+        return {"variants": self.variants, "markets": dict(sorted(self.markets.items()))}
+
+def fetch_market_variants(client, method:str, *args, markets:list|None=None, pool:RequestPool|None=None,
+                          max_workers:int=8, rate_limit:float|None=None, **kwargs):
+    '''
+        Calls a client method once per market, concurrently, and returns a MarketVariants.
+
+        Parameters:
+            client: SpotifyClient or SpotifyOAuth
+            method: name of a method that takes market, ex. "get_album"
+            args, kwargs: passed to the method along with market
+            markets: defaults to every market from get_available_markets
+            pool: RequestPool to run the requests in, one is created if not given
+            max_workers, rate_limit: used to create the pool when pool is not given
+
+        fetch_market_variants(client, "get_album", album_id).get("JP")
+    '''
+    method = getattr(client, method)
+    if markets == None:
+        response = client.get_available_markets()
+        if "error" in response:
+            raise Exception(f"Could not get the available markets. Error: {response['error']}")
+        markets = response.get("markets") or []
+
+    owns_pool = pool == None
+    if owns_pool:
+        rate_limiter = RateLimiter(rate_limit) if rate_limit != None else None
+        pool = RequestPool(max_workers=max_workers, rate_limiter=rate_limiter)
+
+    result = MarketVariants()
+    try:
+        futures = {pool.submit(method, *args, market=market, **kwargs): market for market in dict.fromkeys(markets)}
+        for future in as_completed(futures):
+            market = futures[future]
+            try:
+                response = future.result()
+                if isinstance(response, dict) and "error" in response:
+                    raise Exception(f"Request for market {market} failed. Error: {response['error']}")
+            except Exception as e:
+                result.errors[market] = e
+                continue
+            result.add(market, response)
+    finally:
+        if owns_pool:
+            pool.shutdown()
+    return result
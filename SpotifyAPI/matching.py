@@ -0,0 +1,249 @@
+
+__all__ = ["MatchIndex", "CatalogMatcher", "get_match_key"]
+
+import time
+from concurrent.futures import FIRST_COMPLETED, wait
+from .concurrency import RateLimiter, RequestPool
+from .pagination import get_paging_object
+
+'''
+Catalog matching (ISRC/UPC/title and artist -> Spotify id)
+
+A record is a dictionary with one of:
+    {"isrc": "USUM71703861"}                    -> track id
+    {"upc": "00602567890123"}                   -> album id
+    {"title": "Doxy", "artist": "Miles Davis"}  -> track id
+
+Other keys are kept, so records can carry the caller's own ids. Every result, found or not,
+is written to a MatchIndex, so each key is only searched for once across runs. Keys with no
+match are searched for again once they are older than unmatched_ttl, since the catalog grows.
+'''
+def get_match_key(record:dict):
+    '''
+        Returns (kind, key) used in the index and to dedupe searches
+    '''
+    if record.get("isrc"):
+        return "isrc", record["isrc"].strip().upper()
+    if record.get("upc"):
+        return "upc", record["upc"].strip()
+    if record.get("title") and record.get("artist"):
+        return "track", f"{record['title'].strip().lower()}\t{record['artist'].strip().lower()}"
+    raise Exception("A record needs an isrc, a upc, or a title and an artist")
+
+def quote_filter(value:str):
+    # without quotes a field filter only covers the first word, ex. artist:Miles Davis
+    value = value.strip().replace('"', " ")
+    return f'"{value}"' if " " in value else value
+
+class MatchIndex(object):
+    '''
+    Persistent index of matched keys in SQLite. Keys with no match are stored with a null id.
+
+    Only use it from the thread that created it, CatalogMatcher does all its reads and
+    writes from the thread iterating over the matches.
+    '''
+    def __init__(self, path:str=":memory:"):
+        # sqlite3 is only needed here
+        import sqlite3
+        self.connection = sqlite3.connect(path)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute("PRAGMA synchronous=NORMAL")
+        self.connection.execute("CREATE TABLE IF NOT EXISTS matches (kind TEXT NOT NULL, key TEXT NOT NULL, "
+                                "spotify_id TEXT, updated REAL NOT NULL, PRIMARY KEY (kind, key)) WITHOUT ROWID")
+        self.connection.commit()
+
+    def __len__(self):
+        return self.connection.execute("SELECT COUNT(*) FROM matches").fetchone()[0]
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def get(self, kind:str, key:str, unmatched_ttl:float|None=None):
+        '''
+            Returns (found, spotify_id), spotify_id is None for a key that had no match.
+            A key with no match older than unmatched_ttl seconds is returned as not found.
+        '''
+        row = self.connection.execute("SELECT spotify_id, updated FROM matches WHERE kind = ? AND key = ?", (kind, key)).fetchone()
+        if row == None:
+            return False, None
+        spotify_id, updated = row
+        if spotify_id == None and unmatched_ttl != None and updated < time.time() - unmatched_ttl:
+            return False, None
+        return True, spotify_id
+
+    def set_many(self, rows:list):
+        '''
+            rows: list of (kind, key, spotify_id or None)
+        '''
+        now = time.time()
+        self.connection.executemany("INSERT OR REPLACE INTO matches (kind, key, spotify_id, updated) VALUES (?, ?, ?, ?)",
+                                    [(kind, key, spotify_id, now) for kind, key, spotify_id in rows])
+        self.connection.commit()
+
+    def close(self):
+        self.connection.close()
+
+class CatalogMatcher(object):
+    '''
+    Parameters:
+        client: SpotifyClient or SpotifyOAuth used to search
+        index: MatchIndex or a path to one, defaults to an in-memory index
+        pool: RequestPool to search on, one is created if not given
+        max_workers, rate_limit: used to create the pool when pool is not given
+        max_pending: searches in flight at once, records are read lazily past it
+        market: passed to every search
+        batch_size: new matches written to the index per transaction
+        unmatched_ttl: seconds a key with no match is trusted for before it is searched again,
+            None to never search again
+
+        matcher = CatalogMatcher(client, "matches.db", rate_limit=20)
+        for record, spotify_id, source in matcher.match(records):
+            ...
+        print(matcher.get_stats())
+    '''
+    def __init__(self, client, index:MatchIndex|str|None=None, pool:RequestPool|None=None, max_workers:int=8,
+                 rate_limit:float|None=None, max_pending:int|None=None, market:str|None=None, batch_size:int=500,
+                 unmatched_ttl:float|None=30 * 86400):
+        self.client = client
+        if index == None:
+            index = MatchIndex()
+        elif isinstance(index, str):
+            index = MatchIndex(index)
+        self.index = index
+        self.owns_pool = pool == None
+        if self.owns_pool:
+            rate_limiter = RateLimiter(rate_limit) if rate_limit != None else None
+            pool = RequestPool(max_workers=max_workers, rate_limiter=rate_limiter)
+        self.pool = pool
+        self.max_pending = max_pending if max_pending != None else pool.max_workers * 4
+        self.market = market
+        self.batch_size = batch_size
+        self.unmatched_ttl = unmatched_ttl
+        self.reset_stats()
+
+    def reset_stats(self):
+        self.records = 0
+        self.index_hits = 0
+        self.searches = 0
+        self.matched = 0
+        self.unmatched = 0
+        self.errors = 0
+        self.seconds = 0.0
+
+    @property
+    def hit_ratio(self):
+        '''
+            Share of records answered without a search of their own (index or a search in flight)
+        '''
+        return 1 - self.searches / self.records if self.records else 0.0
+
+    @property
+    def records_per_second(self):
+        return self.records / self.seconds if self.seconds else 0.0
+
+    def get_stats(self):
+        return {"records": self.records, "index_hits": self.index_hits, "searches": self.searches,
+                "matched": self.matched, "unmatched": self.unmatched, "errors": self.errors,
+                "hit_ratio": self.hit_ratio, "seconds": self.seconds, "records_per_second": self.records_per_second}
+
+    def search(self, kind:str, record:dict):
+        if kind == "isrc":
+            query, search_type = {"isrc": record["isrc"].strip()}, "track"
+        elif kind == "upc":
+            query, search_type = {"upc": record["upc"].strip()}, "album"
+        else:
+            query, search_type = f"track:{quote_filter(record['title'])} artist:{quote_filter(record['artist'])}", "track"
+        response = self.client.search(query, search_type=search_type, market=self.market, limit=1)
+        items = get_paging_object(response, f"{search_type}s").get("items") or []
+        return items[0]["id"] if items and items[0] else None
+
+    def match(self, records):
+        '''
+            Yields (record, spotify_id or None, source) for every record, where source is
+            "index", "search" or "error". Records found in the index come out right away,
+            the rest when their search finishes, so the order is not kept.
+        '''
+        start = time.monotonic() - self.seconds
+        # key: (future, records waiting on it)
+        in_flight = {}
+        futures = {}
+        # (kind, key): spotify_id, found this run and not written to the index yet
+        new_rows = {}
+        records = iter(records)
+        exhausted = False
+        try:
+            while True:
+                while not exhausted and len(in_flight) < self.max_pending:
+                    try:
+                        record = next(records)
+                    except StopIteration:
+                        exhausted = True
+                        break
+                    self.records += 1
+                    kind, key = get_match_key(record)
+                    if (kind, key) in new_rows:
+                        found, spotify_id = True, new_rows[(kind, key)]
+                    else:
+                        found, spotify_id = self.index.get(kind, key, self.unmatched_ttl)
+                    if found:
+                        self.index_hits += 1
+                        self.count(spotify_id)
+                        yield record, spotify_id, "index"
+                    elif (kind, key) in in_flight:
+                        in_flight[(kind, key)][1].append(record)
+                    else:
+                        self.searches += 1
+                        future = self.pool.submit(self.search, kind, record)
+                        in_flight[(kind, key)] = (future, [record])
+                        futures[future] = (kind, key)
+                if not futures:
+                    break
+
+                done, _ = wait(list(futures), return_when=FIRST_COMPLETED)
+                for future in done:
+                    kind, key = futures.pop(future)
+                    waiting = in_flight.pop((kind, key))[1]
+                    try:
+                        spotify_id = future.result()
+                    except Exception:
+                        self.errors += len(waiting)
+                        for record in waiting:
+                            yield record, None, "error"
+                        continue
+                    new_rows[(kind, key)] = spotify_id
+                    if len(new_rows) >= self.batch_size:
+                        self.flush(new_rows)
+                    for record in waiting:
+                        self.count(spotify_id)
+                        yield record, spotify_id, "search"
+                self.seconds = time.monotonic() - start
+        finally:
+            for future in futures:
+                future.cancel()
+            self.flush(new_rows)
+            self.seconds = time.monotonic() - start
+
+    def flush(self, new_rows:dict):
+        if new_rows:
+            self.index.set_many([(kind, key, spotify_id) for (kind, key), spotify_id in new_rows.items()])
+            new_rows.clear()
+
+    def count(self, spotify_id):
+        if spotify_id != None:
+            self.matched += 1
+        else:
+            self.unmatched += 1
+
+    def close(self):
+        if self.owns_pool:
+            self.pool.shutdown()
+        self.index.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
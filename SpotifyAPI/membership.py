@@ -0,0 +1,194 @@
+
+__all__ = ["MembershipBitmap", "LibraryMembership"]
+
+import threading
+from .concurrency import RateLimiter, RequestPool
+from .ids import to_id_list
+from .library import SAVED_ITEM_METHODS, chunk_list, get_saved_item_method
+
+class MembershipBitmap(object):
+    '''
+    Remembers whether ids are saved, two bits per id.
+
+    Each id gets a slot the first time it is seen, "known" says the slot has an answer
+    and "saved" holds the answer. Both are bytearrays, so a cached id costs one dict
+    entry plus a quarter of a byte.
+    '''
+    __slots__ = ["slots", "known", "saved"]
+
+    def __init__(self):
+        self.slots = {}
+        self.known = bytearray()
+        self.saved = bytearray()
+
+    def __len__(self):
+        return len(self.slots)
+
+    def get(self, _id:str):
+        '''
+            Returns True/False if the id is cached, None if it is not
+        '''
+        slot = self.slots.get(_id)
+        if slot == None:
+            return None
+        byte, bit = divmod(slot, 8)
+        if not self.known[byte] & (1 << bit):
+            return None
+        return bool(self.saved[byte] & (1 << bit))
+
+    def set(self, _id:str, saved:bool):
+        slot = self.slots.get(_id)
+        if slot == None:
+            slot = len(self.slots)
+            self.slots[_id] = slot
+            if slot // 8 >= len(self.known):
+                self.known.append(0)
+                self.saved.append(0)
+        byte, bit = divmod(slot, 8)
+        self.known[byte] |= 1 << bit
+        if saved:
+            self.saved[byte] |= 1 << bit
+        else:
+            self.saved[byte] &= ~(1 << bit)
+
+    def discard(self, _id:str):
+        slot = self.slots.get(_id)
+        if slot != None:
+            byte, bit = divmod(slot, 8)
+            self.known[byte] &= ~(1 << bit)
+
+class LibraryMembership(object):
+    '''
+    Bulk "is this saved?" checks for one user, backed by a MembershipBitmap per collection.
+
+    Ids that are not cached are split into requests of the maximum size for the collection
+    and checked concurrently. The membership sets itself as auth.membership, so save(),
+    remove() and the client's own save_*, remove_saved_*, follow_* and unfollow_* methods
+    all update the cache, and repeated checks are answered without a request.
+
+    Parameters:
+        auth: SpotifyOAuth or SpotifyPKCE
+        pool: RequestPool to run the requests in, one is created if not given
+        max_workers, rate_limit: used to create the pool when pool is not given
+
+    Collections: tracks, albums, episodes, shows, audiobooks, artists, users
+    '''
+    def __init__(self, auth, pool:RequestPool|None=None, max_workers:int=4, rate_limit:float|None=None):
+        self.auth = auth
+        self.owns_pool = pool == None
+        if self.owns_pool:
+            rate_limiter = RateLimiter(rate_limit) if rate_limit != None else None
+            pool = RequestPool(max_workers=max_workers, rate_limiter=rate_limiter)
+        self.pool = pool
+        self.lock = threading.Lock()
+        self.bitmaps = {collection: MembershipBitmap() for collection in SAVED_ITEM_METHODS}
+        # endpoint name: (collection, saved), follow endpoints take the collection from "type"
+        self.endpoints = {}
+        for collection, (_, save, remove, _) in SAVED_ITEM_METHODS.items():
+            self.endpoints[save] = (None if collection in ["artists", "users"] else collection, True)
+            self.endpoints[remove] = (None if collection in ["artists", "users"] else collection, False)
+        auth.membership = self
+
+    def get_bitmap(self, collection:str):
+        if collection not in self.bitmaps:
+            raise Exception(f"Invalid collection. Valid values are {', '.join(SAVED_ITEM_METHODS)}")
+        return self.bitmaps[collection]
+
+    def check(self, collection:str, _ids:list, refresh:bool=False):
+        '''
+            Parameters:
+                collection: name from SAVED_ITEM_METHODS
+                _ids: any number of ids
+                refresh: ignore the cache and request every id again
+
+            Returns: Dictionary of id: bool
+        '''
+        bitmap = self.get_bitmap(collection)
+        result = {}
+        missing = []
+        with self.lock:
+            for _id in to_id_list(_ids):
+                saved = None if refresh else bitmap.get(_id)
+                if saved == None:
+                    missing.append(_id)
+                else:
+                    result[_id] = saved
+        if not missing:
+            return result
+
+        # dict.fromkeys removes duplicates and keeps the order
+        missing = list(dict.fromkeys(missing))
+        check = get_saved_item_method(self.auth, collection, "check")
+        max_ids = SAVED_ITEM_METHODS[collection][3]
+        chunks = chunk_list(missing, max_ids)
+        futures = [self.pool.submit(check, chunk) for chunk in chunks]
+        for chunk, future in zip(chunks, futures):
+            response = future.result()
+            if not isinstance(response, list) or len(response) != len(chunk):
+                raise Exception(f"Could not check saved {collection}. Error: {response}")
+            with self.lock:
+                for _id, saved in zip(chunk, response):
+                    bitmap.set(_id, saved)
+                    result[_id] = saved
+        return result
+
+    def is_saved(self, collection:str, _id:str):
+        return self.check(collection, [_id])[_id]
+
+    def save(self, collection:str, _ids:list):
+        return self.mutate(collection, _ids, "save")
+
+    def remove(self, collection:str, _ids:list):
+        return self.mutate(collection, _ids, "remove")
+
+    def mutate(self, collection:str, _ids:list, action:str):
+        bitmap = self.get_bitmap(collection)
+        method = get_saved_item_method(self.auth, collection, action)
+        max_ids = SAVED_ITEM_METHODS[collection][3]
+        for chunk in chunk_list(to_id_list(_ids), max_ids):
+            response = self.pool.call(method, chunk)
+            if response != True:
+                # {} when the client is missing the scopes, the error of a failed request otherwise
+                error = response.get("error") if isinstance(response, dict) and "error" in response else "missing scopes"
+                raise Exception(f"Could not {action} {collection}. Error: {error}")
+            self.update(collection, chunk, action == "save", bitmap=bitmap)
+        return True
+
+    def update(self, collection:str, _ids:list, saved:bool, bitmap:MembershipBitmap|None=None):
+        '''
+            Updates the cache without making a request, ex. after a save made somewhere else
+        '''
+        if bitmap == None:
+            bitmap = self.get_bitmap(collection)
+        with self.lock:
+            for _id in _ids:
+                bitmap.set(_id, saved)
+
+    def record(self, name:str, params:dict, response):
+        '''
+            Called by the client after each PUT or DELETE endpoint, updates the cache when
+            the endpoint saves or removes items and the request succeeded
+        '''
+        if name not in self.endpoints or response != True:
+            return
+        collection, saved = self.endpoints[name]
+        if collection == None:
+            collection = f"{params.get('type')}s"
+        ids = params.get("ids")
+        if collection not in self.bitmaps or ids == None:
+            return
+        self.update(collection, ids.split(",") if isinstance(ids, str) else to_id_list(ids), saved)
+
+    def invalidate(self, collection:str|None=None):
+        with self.lock:
+            if collection == None:
+                self.bitmaps = {c: MembershipBitmap() for c in SAVED_ITEM_METHODS}
+            else:
+                self.get_bitmap(collection)
+                self.bitmaps[collection] = MembershipBitmap()
+
+    def close(self):
+        if getattr(self.auth, "membership", None) is self:
+            self.auth.membership = None
+        if self.owns_pool:
+            self.pool.shutdown()
@@ -0,0 +1,866 @@
+
+__all__ = ["MARKETS", "SyntheticCatalog", "MockSpotifyServer"]
+
+import asyncio
+import json
+import random
+import re
+import threading
+import time
+from urllib.parse import urlparse, parse_qs, urlencode
+
+'''
+Local stand-in for api.spotify.com and accounts.spotify.com, for load testing
+
+The server answers the token endpoint, the authorize redirect and the endpoints used by
+SpotifyClient and SpotifyOAuth from a SyntheticCatalog, with configurable latency and
+rate limiting. The player endpoints drive one simulated device that plays the saved tracks
+in order. Point a client at it with configure():
+
+    server = MockSpotifyServer(latency=0.02, rate_limit=500).start_in_thread()
+    client = SpotifyClient("clid", "clst")
+    server.configure(client)
+    client.get_album(server.catalog.album_ids[0])
+    server.stop_thread()
+
+Or run it on its own: python -m SpotifyAPI.mockserver --port 8888
+
+NOTE: the catalog has no shows, episodes, audiobooks or chapters, and there are no routes for
+    /shows, /episodes, /audiobooks, /chapters, /browse, /recommendations, /audio-features,
+    /audio-analysis, playlist changes or cover images. Those answer 404.
+'''
+
+# the markets returned by GET /markets
+MARKETS = ("AD AE AG AL AM AO AR AT AU AZ BA BB BD BE BF BG BH BI BJ BN BO BR BS BT BW BY BZ CA CD CG "
+           "CH CI CL CM CO CR CV CW CY CZ DE DJ DK DM DO DZ EC EE EG ES ET FI FJ FM FR GA GB GD GE GH "
+           "GM GN GQ GR GT GW GY HK HN HR HT HU ID IE IL IN IQ IS IT JM JO JP KE KG KH KI KM KN KR KW "
+           "KZ LA LB LC LI LK LR LS LT LU LV LY MA MC MD ME MG MH MK ML MN MO MR MT MU MV MW MX MY MZ "
+           "NA NE NG NI NL NO NP NR NZ OM PA PE PG PH PK PL PR PS PT PW PY QA RO RS RW SA SB SC SE SG "
+           "SI SK SL SM SN SR ST SV SZ TD TG TH TJ TL TN TO TR TT TV TW TZ UA UG US UY UZ VC VE VN VU "
+           "WS XK ZA ZM ZW").split()
+
+BASE62 = "0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz"
+WORDS = ("blue night river gold echo fire glass city rain summer ghost paper velvet neon wild "
+         "silver ocean dream stone light heart shadow storm honey moon").split()
+
+class SyntheticCatalog(object):
+    '''
+    Deterministic catalog of artists, albums, tracks and playlists, plus one user's library.
+
+    The same seed always gives the same ids, so runs can be compared.
+    '''
+    def __init__(self, seed:int=0, artists:int=100, albums_per_artist:int=5, tracks_per_album:int=12,
+                 playlists:int=20, tracks_per_playlist:int=100, saved_tracks:int=500, saved_albums:int=50,
+                 followed_artists:int=60, recently_played:int=50):
+        self.random = random.Random(seed)
+        self.artists = {}
+        self.albums = {}
+        self.tracks = {}
+        self.playlists = {}
+        self.isrcs = {}
+        self.upcs = {}
+
+        for i in range(artists):
+            artist_id = self.new_id()
+            self.artists[artist_id] = {"name": self.new_name(), "genres": [self.random.choice(WORDS)],
+                                       "popularity": self.random.randint(0, 100), "albums": [], "related": []}
+            for j in range(albums_per_artist):
+                album_id = self.new_id()
+                upc = str(self.random.randint(10**11, 10**12 - 1))
+                album = {"name": self.new_name(), "artist": artist_id, "tracks": [], "upc": upc,
+                         "album_type": self.random.choice(["album", "album", "single", "compilation"]),
+                         "release_date": f"{self.random.randint(1960, 2023)}-{self.random.randint(1, 12):02d}-01"}
+                self.albums[album_id] = album
+                self.upcs[upc] = album_id
+                self.artists[artist_id]["albums"].append(album_id)
+                for k in range(tracks_per_album):
+                    track_id = self.new_id()
+                    isrc = f"US{self.random.choice(WORDS)[:3].upper()}{self.random.randint(10**6, 10**7 - 1)}"
+                    self.tracks[track_id] = {"name": self.new_name(), "album": album_id, "track_number": k + 1,
+                                             "duration_ms": self.random.randint(120000, 420000), "isrc": isrc,
+                                             "popularity": self.random.randint(0, 100)}
+                    self.isrcs[isrc] = track_id
+                    album["tracks"].append(track_id)
+
+        self.artist_ids = list(self.artists)
+        self.album_ids = list(self.albums)
+        self.track_ids = list(self.tracks)
+        for artist_id, artist in self.artists.items():
+            artist["related"] = self.random.sample(self.artist_ids, min(20, len(self.artist_ids)))
+
+        self.user_id = "mock-user"
+        for i in range(playlists):
+            playlist_id = self.new_id()
+            self.playlists[playlist_id] = {"name": self.new_name(), "owner": self.user_id,
+                                           "tracks": self.sample(self.track_ids, tracks_per_playlist)}
+        self.playlist_ids = list(self.playlists)
+
+        self.saved = {
+            "tracks": self.sample(self.track_ids, saved_tracks),
+            "albums": self.sample(self.album_ids, saved_albums),
+            "artists": sorted(self.sample(self.artist_ids, followed_artists)),
+            "shows": [], "episodes": [], "audiobooks": []
+        }
+        now = int(time.time() * 1000)
+        self.recently_played = [(track_id, now - i * 200000) for i, track_id in enumerate(self.sample(self.track_ids, recently_played))]
+
+    def new_id(self):
+        return "".join(self.random.choice(BASE62) for i in range(22))
+
+    def new_name(self):
+        return " ".join(self.random.choice(WORDS) for i in range(self.random.randint(1, 3))).title()
+
+    def sample(self, population, k):
+        return self.random.sample(population, min(k, len(population)))
+
+    '''
+    Rendering, base is the url of the server, ex. http://127.0.0.1:8888
+    '''
+    def links(self, base, object_type, _id):
+        return {"external_urls": {"spotify": f"https://open.spotify.com/{object_type}/{_id}"},
+                "href": f"{base}/v1/{object_type}s/{_id}", "id": _id, "type": object_type,
+                "uri": f"spotify:{object_type}:{_id}"}
+
+    def images(self, _id):
+        return [{"url": f"https://i.scdn.co/image/{_id}{size}", "height": size, "width": size} for size in (640, 300, 64)]
+
+    def simplified_artist(self, base, artist_id):
+        return dict(self.links(base, "artist", artist_id), name=self.artists[artist_id]["name"])
+
+    def artist(self, base, artist_id):
+        artist = self.artists[artist_id]
+        return dict(self.simplified_artist(base, artist_id), genres=artist["genres"], popularity=artist["popularity"],
+                    followers={"href": None, "total": artist["popularity"] * 1000}, images=self.images(artist_id))
+
+    def simplified_album(self, base, album_id):
+        album = self.albums[album_id]
+        return dict(self.links(base, "album", album_id), name=album["name"], album_type=album["album_type"],
+                    total_tracks=len(album["tracks"]), available_markets=MARKETS, images=self.images(album_id),
+                    release_date=album["release_date"], release_date_precision="day",
+                    artists=[self.simplified_artist(base, album["artist"])])
+
+    def album(self, base, album_id):
+        album = self.albums[album_id]
+        tracks = [self.simplified_track(base, track_id) for track_id in album["tracks"][:50]]
+        paging = self.paging(f"{base}/v1/albums/{album_id}/tracks", tracks, 0, 50, len(album["tracks"]))
+        return dict(self.simplified_album(base, album_id), tracks=paging, external_ids={"upc": album["upc"]},
+                    genres=[], label="Mock Records", popularity=50, copyrights=[{"text": "(C) Mock Records", "type": "C"}])
+
+    def simplified_track(self, base, track_id):
+        track = self.tracks[track_id]
+        artist_id = self.albums[track["album"]]["artist"]
+        return dict(self.links(base, "track", track_id), name=track["name"], duration_ms=track["duration_ms"],
+                    track_number=track["track_number"], disc_number=1, explicit=False, is_local=False,
+                    available_markets=MARKETS, preview_url=None, artists=[self.simplified_artist(base, artist_id)])
+
+    def track(self, base, track_id):
+        track = self.tracks[track_id]
+        return dict(self.simplified_track(base, track_id), album=self.simplified_album(base, track["album"]),
+                    external_ids={"isrc": track["isrc"]}, popularity=track["popularity"])
+
+    def simplified_playlist(self, base, playlist_id):
+        playlist = self.playlists[playlist_id]
+        return dict(self.links(base, "playlist", playlist_id), name=playlist["name"], collaborative=False,
+                    public=True, description="", images=self.images(playlist_id), snapshot_id="mock",
+                    owner=dict(self.links(base, "user", playlist["owner"]), display_name=playlist["owner"]),
+                    tracks={"href": f"{base}/v1/playlists/{playlist_id}/tracks", "total": len(playlist["tracks"])})
+
+    def playlist_item(self, base, track_id):
+        return {"added_at": "2023-06-25T10:00:00Z", "added_by": None, "is_local": False, "track": self.track(base, track_id)}
+
+    def paging(self, url, items, offset, limit, total, query=None):
+        query = dict(query or {})
+        def page_url(page_offset):
+            return f"{url}?{urlencode(dict(query, offset=page_offset, limit=limit))}"
+        return {"href": page_url(offset), "items": items, "limit": limit, "offset": offset, "total": total,
+                "next": page_url(offset + limit) if offset + limit < total else None,
+                "previous": page_url(max(0, offset - limit)) if offset > 0 else None}
+
+class HTTPError(Exception):
+    def __init__(self, status, message, headers=None):
+        super().__init__(message)
+        self.status = status
+        self.message = message
+        self.headers = headers or {}
+
+class MockSpotifyServer(object):
+    '''
+    Parameters:
+        catalog: SyntheticCatalog to serve, a default one is created if not given
+        host, port: where to listen, port 0 picks a free port
+        latency: seconds to wait before answering each request
+        rate_limit: requests per second over all clients before answering with 429
+        retry_after: Retry-After header sent with a 429
+        token_expires_in: expires_in of the tokens handed out
+        clock: function returning seconds, used for the rate limit and playback progress.
+            Defaults to time.monotonic, tests can pass their own to control time
+
+    stats has the number of requests, 429s and errors sent.
+    '''
+    statuses = {200: "OK", 201: "Created", 204: "No Content", 302: "Found", 400: "Bad Request", 401: "Unauthorized", 403: "Forbidden",
+                404: "Not Found", 405: "Method Not Allowed", 429: "Too Many Requests",
+                500: "Internal Server Error"}
+
+    def __init__(self, catalog:SyntheticCatalog|None=None, host:str="127.0.0.1", port:int=0, latency:float=0.0,
+                 rate_limit:float|None=None, retry_after:int=1, token_expires_in:int=3600, clock=time.monotonic):
+        self.catalog = catalog if catalog != None else SyntheticCatalog()
+        self.host = host
+        self.port = port
+        self.latency = latency
+        self.rate_limit = rate_limit
+        self.retry_after = retry_after
+        self.token_expires_in = token_expires_in
+        self.clock = clock
+        self.tokens = rate_limit or 0
+        self.tokens_updated = clock()
+        self.device = {"id": "mock-device", "is_active": False, "is_private_session": False, "is_restricted": False,
+                       "name": "Mock Device", "type": "Computer", "volume_percent": 50, "supports_volume": True}
+        # nothing plays until playback is started or transferred to the device
+        self.player = {"active": False, "is_playing": False, "index": 0, "progress_ms": 0, "updated": clock(),
+                       "shuffle": False, "repeat": "off", "queue": [], "queued": None}
+        self.stats = {"requests": 0, "rate_limited": 0, "errors": 0}
+        self.routes = [
+            ("POST", r"/api/token", self.post_token),
+            ("GET", r"/authorize", self.get_authorize),
+            ("GET", r"/v1/albums", self.get_albums),
+            ("GET", r"/v1/albums/(\w+)", self.get_album),
+            ("GET", r"/v1/albums/(\w+)/tracks", self.get_album_tracks),
+            ("GET", r"/v1/artists", self.get_artists),
+            ("GET", r"/v1/artists/(\w+)", self.get_artist),
+            ("GET", r"/v1/artists/(\w+)/albums", self.get_artist_albums),
+            ("GET", r"/v1/artists/(\w+)/top-tracks", self.get_artist_top_tracks),
+            ("GET", r"/v1/artists/(\w+)/related-artists", self.get_related_artists),
+            ("GET", r"/v1/tracks", self.get_tracks),
+            ("GET", r"/v1/tracks/(\w+)", self.get_track),
+            ("GET", r"/v1/search", self.get_search),
+            ("GET", r"/v1/markets", self.get_markets),
+            ("GET", r"/v1/playlists/(\w+)", self.get_playlist),
+            ("GET", r"/v1/playlists/(\w+)/tracks", self.get_playlist_items),
+            ("GET", r"/v1/me", self.get_me),
+            ("GET", r"/v1/me/playlists", self.get_my_playlists),
+            ("GET", r"/v1/me/following", self.get_following),
+            ("GET", r"/v1/me/following/contains", self.get_following_contains),
+            ("PUT", r"/v1/me/following", self.put_following),
+            ("DELETE", r"/v1/me/following", self.delete_following),
+            ("GET", r"/v1/me/player/recently-played", self.get_recently_played),
+            ("GET", r"/v1/me/player", self.get_player),
+            ("PUT", r"/v1/me/player", self.put_transfer),
+            ("GET", r"/v1/me/player/currently-playing", self.get_player),
+            ("GET", r"/v1/me/player/devices", self.get_devices),
+            ("PUT", r"/v1/me/player/play", self.put_play),
+            ("PUT", r"/v1/me/player/pause", self.put_pause),
+            ("POST", r"/v1/me/player/next", self.post_next),
+            ("POST", r"/v1/me/player/previous", self.post_previous),
+            ("PUT", r"/v1/me/player/seek", self.put_seek),
+            ("PUT", r"/v1/me/player/repeat", self.put_repeat),
+            ("PUT", r"/v1/me/player/volume", self.put_volume),
+            ("PUT", r"/v1/me/player/shuffle", self.put_shuffle),
+            ("GET", r"/v1/me/player/queue", self.get_queue),
+            ("POST", r"/v1/me/player/queue", self.post_queue),
+            ("GET", r"/v1/me/(tracks|albums|shows|episodes|audiobooks)", self.get_saved),
+            ("GET", r"/v1/me/(tracks|albums|shows|episodes|audiobooks)/contains", self.get_saved_contains),
+            ("PUT", r"/v1/me/(tracks|albums|shows|episodes|audiobooks)", self.put_saved),
+            ("DELETE", r"/v1/me/(tracks|albums|shows|episodes|audiobooks)", self.delete_saved),
+        ]
+        self.routes = [(method, re.compile(pattern + "$"), handler) for method, pattern, handler in self.routes]
+
+    @property
+    def url(self):
+        return f"http://{self.host}:{self.port}"
+
+    def configure(self, client):
+        '''
+            Points a SpotifyClient, SpotifyOAuth or SessionManager at this server
+        '''
+        client.base_url = self.url
+        client.token_url = f"{self.url}/api/token"
+        if hasattr(client, "authorize_url"):
+            client.authorize_url = f"{self.url}/authorize"
+        return client
+
+    '''
+    Running the server
+    '''
+    async def start(self):
+        self.connections = {}
+        self.server = await asyncio.start_server(self.handle_connection, self.host, self.port)
+        self.port = self.server.sockets[0].getsockname()[1]
+        return self
+
+    async def stop(self):
+        self.server.close()
+        # kept-alive connections would otherwise outlive the server, closing them ends
+        # the read their handler is waiting on
+        connections = dict(self.connections)
+        for writer in connections.values():
+            writer.close()
+        await asyncio.gather(*connections, return_exceptions=True)
+        await self.server.wait_closed()
+
+    def start_in_thread(self):
+        '''
+            Runs the server on its own event loop in a background thread
+        '''
+        self.loop = asyncio.new_event_loop()
+        started = threading.Event()
+        def run():
+            asyncio.set_event_loop(self.loop)
+            self.loop.run_until_complete(self.start())
+            started.set()
+            self.loop.run_forever()
+        self.thread = threading.Thread(target=run, name="spotify-api-mock-server", daemon=True)
+        self.thread.start()
+        started.wait()
+        return self
+
+    def stop_thread(self):
+        asyncio.run_coroutine_threadsafe(self.stop(), self.loop).result()
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self.thread.join()
+        self.loop.close()
+
+    async def handle_connection(self, reader, writer):
+        task = asyncio.current_task()
+        self.connections[task] = writer
+        try:
+            # keep-alive, so pooled connections from requests.Session are reused
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b"\r\n", b"\n", b""):
+                        break
+                    key, _, value = line.decode("latin-1").partition(":")
+                    headers[key.strip().lower()] = value.strip()
+                body = b""
+                if "content-length" in headers:
+                    body = await reader.readexactly(int(headers["content-length"]))
+
+                method, target = request_line.decode("latin-1").split()[:2]
+                status, response_headers, content = await self.handle_request(method, target, headers, body)
+                head = f"HTTP/1.1 {status} {self.statuses.get(status, 'OK')}\r\nContent-Length: {len(content)}\r\n"
+                for key, value in response_headers.items():
+                    head += f"{key}: {value}\r\n"
+                writer.write(head.encode("latin-1") + b"\r\n" + content)
+                await writer.drain()
+                if headers.get("connection", "").lower() == "close":
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            self.connections.pop(task, None)
+            writer.close()
+
+    def take_token(self):
+        if self.rate_limit == None:
+            return True
+        now = self.clock()
+        self.tokens = min(self.rate_limit, self.tokens + (now - self.tokens_updated) * self.rate_limit)
+        self.tokens_updated = now
+        if self.tokens < 1:
+            return False
+        self.tokens -= 1
+        return True
+
+    async def handle_request(self, method, target, headers, body):
+        self.stats["requests"] += 1
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        json_headers = {"Content-Type": "application/json; charset=utf-8"}
+        try:
+            if not self.take_token():
+                self.stats["rate_limited"] += 1
+                raise HTTPError(429, "API rate limit exceeded", {"Retry-After": str(self.retry_after)})
+            parsed_url = urlparse(target)
+            query = {key: values[0] for key, values in parse_qs(parsed_url.query).items()}
+            handler, args = self.route(method, parsed_url.path)
+            if parsed_url.path.startswith("/v1/") and not headers.get("authorization", "").startswith("Bearer "):
+                raise HTTPError(401, "No token provided")
+            try:
+                result = handler(*args, query=query, body=body)
+            except (ValueError, KeyError) as e:
+                # bad query values or bodies, ex. limit=abc
+                raise HTTPError(400, f"Invalid request: {e}")
+            except HTTPError:
+                raise
+            except Exception as e:
+                raise HTTPError(500, f"Server error: {e!r}")
+        except HTTPError as e:
+            if e.status != 429:
+                self.stats["errors"] += 1
+            content = json.dumps({"error": {"status": e.status, "message": e.message}}).encode("utf-8")
+            return e.status, dict(json_headers, **e.headers), content
+
+        if isinstance(result, tuple):
+            # (status, headers) for redirects and empty responses
+            return result[0], result[1], b""
+        return 200, json_headers, json.dumps(result).encode("utf-8")
+
+    def route(self, method, path):
+        path_matched = False
+        for route_method, pattern, handler in self.routes:
+            match = pattern.match(path)
+            if match:
+                path_matched = True
+                if route_method == method:
+                    return handler, match.groups()
+        if path_matched:
+            raise HTTPError(405, "Method not allowed")
+        raise HTTPError(404, "Service not found")
+
+    '''
+    Helpers for the handlers
+    '''
+    def get_ids(self, query, max_ids):
+        if "ids" not in query:
+            raise HTTPError(400, "Missing required parameter: ids")
+        ids = query["ids"].split(",")
+        if len(ids) > max_ids:
+            raise HTTPError(400, "Too many ids requested")
+        return ids
+
+    def get_page_args(self, query, default_limit=20, max_limit=50, max_offset=None):
+        try:
+            limit = int(query.get("limit", default_limit))
+            offset = int(query.get("offset", 0))
+        except ValueError:
+            raise HTTPError(400, "Invalid limit or offset")
+        if limit < 1 or limit > max_limit or offset < 0:
+            raise HTTPError(400, "Invalid limit or offset")
+        if max_offset != None and offset > max_offset:
+            raise HTTPError(400, "Invalid offset")
+        return offset, limit
+
+    def page(self, url, ids, render, query, **kwargs):
+        offset, limit = self.get_page_args(query, **kwargs)
+        items = [render(_id) for _id in ids[offset:offset + limit]]
+        extra_query = {key: value for key, value in query.items() if key not in ["offset", "limit"]}
+        return self.catalog.paging(url, items, offset, limit, len(ids), extra_query)
+
+    def lookup(self, table, _id):
+        if _id not in table:
+            raise HTTPError(404, "Non existing id")
+        return _id
+
+    '''
+    accounts.spotify.com
+    '''
+    def post_token(self, query, body):
+        data = {key: values[0] for key, values in parse_qs(body.decode("utf-8")).items()}
+        grant_type = data.get("grant_type")
+        if grant_type not in ["client_credentials", "authorization_code", "refresh_token"]:
+            raise HTTPError(400, "unsupported_grant_type")
+        token = {"access_token": f"mock-{self.catalog.random.getrandbits(64):016x}", "token_type": "Bearer",
+                 "expires_in": self.token_expires_in}
+        if grant_type != "client_credentials":
+            token["refresh_token"] = "mock-refresh-token"
+        return token
+
+    def get_authorize(self, query, body):
+        # the user always accepts
+        if "redirect_uri" not in query:
+            raise HTTPError(400, "Missing required parameter: redirect_uri")
+        redirect = {"code": "mock-code"}
+        if "state" in query:
+            redirect["state"] = query["state"]
+        return 302, {"Location": f"{query['redirect_uri']}?{urlencode(redirect)}"}
+
+    '''
+    Catalog
+    '''
+    def get_albums(self, query, body):
+        return {"albums": [self.catalog.album(self.url, _id) if _id in self.catalog.albums else None
+                           for _id in self.get_ids(query, 20)]}
+
+    def get_album(self, album_id, query, body):
+        return self.catalog.album(self.url, self.lookup(self.catalog.albums, album_id))
+
+    def get_album_tracks(self, album_id, query, body):
+        album = self.catalog.albums[self.lookup(self.catalog.albums, album_id)]
+        render = lambda _id: self.catalog.simplified_track(self.url, _id)
+        return self.page(f"{self.url}/v1/albums/{album_id}/tracks", album["tracks"], render, query)
+
+    def get_artists(self, query, body):
+        return {"artists": [self.catalog.artist(self.url, _id) if _id in self.catalog.artists else None
+                            for _id in self.get_ids(query, 50)]}
+
+    def get_artist(self, artist_id, query, body):
+        return self.catalog.artist(self.url, self.lookup(self.catalog.artists, artist_id))
+
+    def get_artist_albums(self, artist_id, query, body):
+        artist = self.catalog.artists[self.lookup(self.catalog.artists, artist_id)]
+        album_ids = artist["albums"]
+        if "include_groups" in query:
+            groups = query["include_groups"].split(",")
+            album_ids = [_id for _id in album_ids if self.catalog.albums[_id]["album_type"] in groups]
+        render = lambda _id: self.catalog.simplified_album(self.url, _id)
+        return self.page(f"{self.url}/v1/artists/{artist_id}/albums", album_ids, render, query)
+
+    def get_artist_top_tracks(self, artist_id, query, body):
+        artist = self.catalog.artists[self.lookup(self.catalog.artists, artist_id)]
+        track_ids = [t for album_id in artist["albums"] for t in self.catalog.albums[album_id]["tracks"]]
+        track_ids.sort(key=lambda _id: -self.catalog.tracks[_id]["popularity"])
+        return {"tracks": [self.catalog.track(self.url, _id) for _id in track_ids[:10]]}
+
+    def get_related_artists(self, artist_id, query, body):
+        artist = self.catalog.artists[self.lookup(self.catalog.artists, artist_id)]
+        return {"artists": [self.catalog.artist(self.url, _id) for _id in artist["related"]]}
+
+    def get_tracks(self, query, body):
+        return {"tracks": [self.catalog.track(self.url, _id) if _id in self.catalog.tracks else None
+                           for _id in self.get_ids(query, 50)]}
+
+    def get_track(self, track_id, query, body):
+        return self.catalog.track(self.url, self.lookup(self.catalog.tracks, track_id))
+
+    def get_markets(self, query, body):
+        return {"markets": MARKETS}
+
+    def get_search(self, query, body):
+        if "q" not in query or "type" not in query:
+            raise HTTPError(400, "Missing required parameter: q or type")
+        offset, limit = self.get_page_args(query, max_offset=1000)
+        if offset + limit > 1000:
+            raise HTTPError(400, "Invalid offset")
+
+        filters = {}
+        terms = []
+        # a quoted filter value can hold several words, ex. artist:"miles davis"
+        for key, quoted, value, term in re.findall(r'(\w+):(?:"([^"]*)"|(\S+))|(\S+)', query["q"]):
+            if key:
+                filters[key] = (quoted or value).lower()
+            else:
+                terms.append(term.lower())
+
+        catalog = self.catalog
+        types = {
+            "track": (catalog.tracks, lambda _id: catalog.track(self.url, _id)),
+            "album": (catalog.albums, lambda _id: catalog.simplified_album(self.url, _id)),
+            "artist": (catalog.artists, lambda _id: catalog.artist(self.url, _id)),
+            "playlist": (catalog.playlists, lambda _id: catalog.simplified_playlist(self.url, _id))
+        }
+        result = {}
+        for search_type in query["type"].split(","):
+            if search_type in ["show", "episode", "audiobook"]:
+                ids = []
+            elif search_type in types:
+                ids = self.search_ids(search_type, types[search_type][0], filters, terms)
+            else:
+                raise HTTPError(400, "Bad search type field")
+            render = types.get(search_type, (None, None))[1]
+            result[f"{search_type}s"] = self.page(f"{self.url}/v1/search", ids, render, query, max_offset=1000)
+        return result
+
+    def search_ids(self, search_type, table, filters, terms):
+        catalog = self.catalog
+        if "isrc" in filters:
+            track_id = catalog.isrcs.get(filters["isrc"].upper())
+            return [track_id] if search_type == "track" and track_id != None else []
+        if "upc" in filters:
+            album_id = catalog.upcs.get(filters["upc"])
+            return [album_id] if search_type == "album" and album_id != None else []
+
+        def names(_id):
+            # name of the item itself and of the album/artist it belongs to
+            item = table[_id]
+            values = {search_type: item["name"].lower()}
+            if search_type == "track":
+                album = catalog.albums[item["album"]]
+                values["album"] = album["name"].lower()
+                values["artist"] = catalog.artists[album["artist"]]["name"].lower()
+            elif search_type == "album":
+                values["artist"] = catalog.artists[item["artist"]]["name"].lower()
+            return values
+
+        ids = []
+        for _id in table:
+            values = names(_id)
+            if all(key not in values or value in values[key] for key, value in filters.items()) \
+                    and all(term in values[search_type] for term in terms):
+                ids.append(_id)
+        return ids
+
+    def get_playlist(self, playlist_id, query, body):
+        playlist = self.catalog.playlists[self.lookup(self.catalog.playlists, playlist_id)]
+        render = lambda _id: self.catalog.playlist_item(self.url, _id)
+        items = self.page(f"{self.url}/v1/playlists/{playlist_id}/tracks", playlist["tracks"], render, {"limit": 100}, max_limit=100)
+        return dict(self.catalog.simplified_playlist(self.url, playlist_id), tracks=items,
+                    followers={"href": None, "total": 10})
+
+    def get_playlist_items(self, playlist_id, query, body):
+        playlist = self.catalog.playlists[self.lookup(self.catalog.playlists, playlist_id)]
+        render = lambda _id: self.catalog.playlist_item(self.url, _id)
+        return self.page(f"{self.url}/v1/playlists/{playlist_id}/tracks", playlist["tracks"], render, query,
+                         default_limit=100, max_limit=100)
+
+    '''
+    The user's library
+    '''
+    def get_me(self, query, body):
+        user_id = self.catalog.user_id
+        return dict(self.catalog.links(self.url, "user", user_id), display_name=user_id, country="US",
+                    email=f"{user_id}@example.com", product="premium", followers={"href": None, "total": 0})
+
+    def get_my_playlists(self, query, body):
+        render = lambda _id: self.catalog.simplified_playlist(self.url, _id)
+        return self.page(f"{self.url}/v1/me/playlists", self.catalog.playlist_ids, render, query)
+
+    def get_saved(self, collection, query, body):
+        renders = {
+            "tracks": lambda _id: {"added_at": "2023-06-25T10:00:00Z", "track": self.catalog.track(self.url, _id)},
+            "albums": lambda _id: {"added_at": "2023-06-25T10:00:00Z", "album": self.catalog.album(self.url, _id)}
+        }
+        # shows, episodes and audiobooks are not in the catalog, they are always empty
+        render = renders.get(collection, lambda _id: None)
+        return self.page(f"{self.url}/v1/me/{collection}", self.catalog.saved[collection], render, query)
+
+    def get_saved_contains(self, collection, query, body):
+        saved = set(self.catalog.saved[collection])
+        return [_id in saved for _id in self.get_ids(query, 20 if collection == "albums" else 50)]
+
+    def put_saved(self, collection, query, body):
+        saved = self.catalog.saved[collection]
+        existing = set(saved)
+        saved[:0] = [_id for _id in self.get_ids(query, 50) if _id not in existing]
+        return 200, {}
+
+    def delete_saved(self, collection, query, body):
+        removed = set(self.get_ids(query, 50))
+        self.catalog.saved[collection] = [_id for _id in self.catalog.saved[collection] if _id not in removed]
+        return 200, {}
+
+    def get_following(self, query, body):
+        if query.get("type") != "artist":
+            raise HTTPError(400, "Only artist is supported for type")
+        limit = int(query.get("limit", 20))
+        followed = self.catalog.saved["artists"]
+        after = query.get("after")
+        start = 0
+        if after != None:
+            start = sum(1 for _id in followed if _id <= after)
+        items = [self.catalog.artist(self.url, _id) for _id in followed[start:start + limit]]
+        last = items[-1]["id"] if items else None
+        more = start + limit < len(followed)
+        next_url = f"{self.url}/v1/me/following?{urlencode({'type': 'artist', 'after': last, 'limit': limit})}" if more else None
+        return {"artists": {"href": f"{self.url}/v1/me/following", "items": items, "limit": limit, "next": next_url,
+                            "cursors": {"after": last if more else None}, "total": len(followed)}}
+
+    def get_following_contains(self, query, body):
+        followed = set(self.catalog.saved["artists"]) if query.get("type") == "artist" else set()
+        return [_id in followed for _id in self.get_ids(query, 50)]
+
+    def put_following(self, query, body):
+        followed = set(self.catalog.saved["artists"]) | set(self.get_ids(query, 50))
+        self.catalog.saved["artists"] = sorted(followed)
+        return 204, {}
+
+    def delete_following(self, query, body):
+        removed = set(self.get_ids(query, 50))
+        self.catalog.saved["artists"] = [_id for _id in self.catalog.saved["artists"] if _id not in removed]
+        return 204, {}
+
+    def get_recently_played(self, query, body):
+        limit = int(query.get("limit", 20))
+        plays = self.catalog.recently_played
+        if "after" in query:
+            # the oldest plays after the cursor, listed newest first like Spotify does
+            plays = [play for play in plays if play[1] > int(query["after"])][-limit:]
+        elif "before" in query:
+            plays = [play for play in plays if play[1] < int(query["before"])][:limit]
+        else:
+            plays = plays[:limit]
+        items = [{"track": self.catalog.track(self.url, track_id),
+                  "played_at": time.strftime("%Y-%m-%dT%H:%M:%S", time.gmtime(played_at / 1000)) + f".{played_at % 1000:03d}Z",
+                  "context": None} for track_id, played_at in plays]
+        cursors = {"after": str(plays[0][1]), "before": str(plays[-1][1])} if plays else None
+        next_url = f"{self.url}/v1/me/player/recently-played?{urlencode({'before': plays[-1][1], 'limit': limit})}" if plays else None
+        return {"href": f"{self.url}/v1/me/player/recently-played", "items": items, "limit": limit,
+                "next": next_url, "cursors": cursors}
+
+    '''
+    The player, one device playing the saved tracks (or the uris it was started with) in order
+    '''
+    def get_player_tracks(self):
+        return self.player.get("uris") or self.catalog.saved["tracks"] or self.catalog.track_ids
+
+    def update_progress(self):
+        # moves the playback forward to now, to the next track when the current one ends
+        player = self.player
+        now = self.clock()
+        if player["is_playing"]:
+            player["progress_ms"] += int((now - player["updated"]) * 1000)
+            while player["is_playing"]:
+                duration = self.catalog.tracks[self.get_current_track()]["duration_ms"]
+                if player["progress_ms"] < duration:
+                    break
+                player["progress_ms"] -= duration
+                self.advance()
+        player["updated"] = now
+
+    def get_current_track(self):
+        if self.player["queued"] != None:
+            return self.player["queued"]
+        tracks = self.get_player_tracks()
+        return tracks[self.player["index"] % len(tracks)]
+
+    def advance(self):
+        # queued tracks play first, then the track after the one that was playing
+        player = self.player
+        if player["queue"]:
+            player["queued"] = player["queue"].pop(0)
+            return
+        if player["repeat"] == "track" and player["queued"] == None:
+            return
+        player["queued"] = None
+        if player["index"] + 1 < len(self.get_player_tracks()) or player["repeat"] == "context":
+            player["index"] = (player["index"] + 1) % len(self.get_player_tracks())
+        else:
+            player["is_playing"] = False
+            player["progress_ms"] = 0
+
+    def get_active_player(self, query):
+        if query.get("device_id") not in [None, self.device["id"]]:
+            raise HTTPError(404, "Device not found")
+        if not self.player["active"]:
+            raise HTTPError(404, "Player command failed: No active device found")
+        self.update_progress()
+        return self.player
+
+    def get_player(self, query, body):
+        if not self.player["active"]:
+            return 204, {}
+        self.update_progress()
+        player = self.player
+        return {"device": self.device, "repeat_state": player["repeat"], "shuffle_state": player["shuffle"],
+                "context": None, "timestamp": int(time.time() * 1000), "progress_ms": player["progress_ms"],
+                "is_playing": player["is_playing"], "item": self.catalog.track(self.url, self.get_current_track()),
+                "currently_playing_type": "track", "actions": {"disallows": {}}}
+
+    def get_devices(self, query, body):
+        return {"devices": [self.device]}
+
+    def put_transfer(self, query, body):
+        data = json.loads(body or b"{}")
+        if data.get("device_ids") != [self.device["id"]]:
+            raise HTTPError(404, "Device not found")
+        self.update_progress()
+        self.player["active"] = self.device["is_active"] = True
+        self.player["is_playing"] = bool(data.get("play", self.player["is_playing"]))
+        return 204, {}
+
+    def put_play(self, query, body):
+        if query.get("device_id") not in [None, self.device["id"]]:
+            raise HTTPError(404, "Device not found")
+        self.update_progress()
+        player = self.player
+        data = json.loads(body or b"{}")
+        uris = [uri.split(":")[-1] for uri in data.get("uris") or []]
+        if uris:
+            if not all(_id in self.catalog.tracks for _id in uris):
+                raise HTTPError(400, "Invalid track uri")
+            player.update(uris=uris, index=0, progress_ms=0, queued=None)
+        player["active"] = self.device["is_active"] = True
+        player["is_playing"] = True
+        return 204, {}
+
+    def put_pause(self, query, body):
+        player = self.get_active_player(query)
+        if not player["is_playing"]:
+            raise HTTPError(403, "Player command failed: Restriction violated")
+        player["is_playing"] = False
+        return 204, {}
+
+    def post_next(self, query, body):
+        player = self.get_active_player(query)
+        repeat = player["repeat"]
+        player["repeat"] = "context" if repeat == "track" else repeat
+        self.advance()
+        player["repeat"] = repeat
+        player["progress_ms"] = 0
+        return 204, {}
+
+    def post_previous(self, query, body):
+        player = self.get_active_player(query)
+        if player["queued"] != None:
+            player["queued"] = None
+        else:
+            player["index"] = max(0, player["index"] - 1)
+        player["progress_ms"] = 0
+        return 204, {}
+
+    def put_seek(self, query, body):
+        player = self.get_active_player(query)
+        try:
+            position_ms = int(query["position_ms"])
+        except (KeyError, ValueError):
+            raise HTTPError(400, "Missing or invalid position_ms")
+        if position_ms < 0:
+            raise HTTPError(400, "Invalid position_ms")
+        duration = self.catalog.tracks[self.get_current_track()]["duration_ms"]
+        if position_ms >= duration:
+            self.advance()
+            position_ms = 0
+        player["progress_ms"] = position_ms
+        return 204, {}
+
+    def put_repeat(self, query, body):
+        player = self.get_active_player(query)
+        if query.get("state") not in ["track", "context", "off"]:
+            raise HTTPError(400, "Invalid repeat state")
+        player["repeat"] = query["state"]
+        return 204, {}
+
+    def put_volume(self, query, body):
+        self.get_active_player(query)
+        try:
+            volume = int(query["volume_percent"])
+        except (KeyError, ValueError):
+            raise HTTPError(400, "Missing or invalid volume_percent")
+        if volume < 0 or volume > 100:
+            raise HTTPError(400, "Invalid volume_percent")
+        self.device["volume_percent"] = volume
+        return 204, {}
+
+    def put_shuffle(self, query, body):
+        player = self.get_active_player(query)
+        if query.get("state") not in ["true", "false"]:
+            raise HTTPError(400, "Invalid shuffle state")
+        player["shuffle"] = query["state"] == "true"
+        return 204, {}
+
+    def get_queue(self, query, body):
+        if not self.player["active"]:
+            return {"currently_playing": None, "queue": []}
+        self.update_progress()
+        tracks = self.get_player_tracks()
+        upcoming = self.player["queue"] + tracks[self.player["index"] + 1:self.player["index"] + 20]
+        return {"currently_playing": self.catalog.track(self.url, self.get_current_track()),
+                "queue": [self.catalog.track(self.url, _id) for _id in upcoming[:20]]}
+
+    def post_queue(self, query, body):
+        player = self.get_active_player(query)
+        uri = query.get("uri", "")
+        if uri.split(":")[-1] not in self.catalog.tracks:
+            raise HTTPError(400, "Invalid track uri")
+        player["queue"].append(uri.split(":")[-1])
+        return 204, {}
+
+if __name__ == "__main__":
+    import argparse
+    parser = argparse.ArgumentParser(description="Local mock of the Spotify Web API")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8888)
+    parser.add_argument("--latency", type=float, default=0.0)
+    parser.add_argument("--rate-limit", type=float, default=None)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    async def main():
+        server = MockSpotifyServer(SyntheticCatalog(args.seed), args.host, args.port, args.latency, args.rate_limit)
+        await server.start()
+        print(f"Mock Spotify API running on {server.url}")
+        await server.server.serve_forever()
+    asyncio.run(main())
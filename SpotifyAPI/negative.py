@@ -0,0 +1,183 @@
+
+__all__ = ["BloomFilter", "NegativeCache"]
+
+import hashlib
+import math
+import threading
+import time
+from collections import OrderedDict
+
+'''
+Ids that resolve to nothing
+
+get_tracks, get_albums etc. return null for ids that were removed or are not available in
+the market, and get_track, get_album etc. return a 404. A NegativeCache remembers those ids
+per market, so the client leaves them out of the next requests:
+
+    client.negative_cache = NegativeCache(ttl=86400)
+
+Ids left out of a multiple id request come back as null in their place, a single id
+request for a remembered id returns the 404 error without a request.
+'''
+def get_negative_kind(endpoint):
+    '''
+        Returns the kind of object a catalog endpoint looks up by id ("tracks", "albums", ...),
+        None for every other endpoint
+    '''
+    if not endpoint.cacheable or endpoint.method != "GET":
+        return None
+    if endpoint.result_key != None and "ids" in endpoint.params:
+        return endpoint.result_key
+    kind, _, rest = endpoint.path.partition("/")
+    if rest == "{id}":
+        return kind
+    return None
+
+class BloomFilter(object):
+    '''
+    Set membership in m bits with k hashes, no false negatives and about error_rate false
+    positives once capacity keys are added. Keys can not be removed.
+    '''
+    __slots__ = ["bits", "size", "hashes", "count"]
+
+    def __init__(self, capacity:int=1000000, error_rate:float=0.001):
+        self.size = max(8, int(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hashes = max(1, round(self.size / capacity * math.log(2)))
+        self.bits = bytearray((self.size + 7) // 8)
+        self.count = 0
+
+    def get_positions(self, key:str):
+        digest = hashlib.blake2b(key.encode("utf-8"), digest_size=16).digest()
+        h1, h2 = int.from_bytes(digest[:8], "little"), int.from_bytes(digest[8:], "little") | 1
+        return [(h1 + i * h2) % self.size for i in range(self.hashes)]
+
+    def add(self, key:str):
+        '''
+            Returns True if the key was not in the filter yet, only those are counted
+        '''
+        added = False
+        for position in self.get_positions(key):
+            if not self.bits[position >> 3] & (1 << (position & 7)):
+                self.bits[position >> 3] |= 1 << (position & 7)
+                added = True
+        if added:
+            self.count += 1
+        return added
+
+    def __contains__(self, key:str):
+        return all(self.bits[position >> 3] & (1 << (position & 7)) for position in self.get_positions(key))
+
+class NegativeCache(object):
+    '''
+    Parameters:
+        ttl: seconds an id is remembered for
+        bloom: keep the ids in Bloom filters instead of a dictionary. Takes about 2 bytes per
+            id at the default error_rate, but error_rate of the ids that do exist are skipped
+            too, and ids are remembered for between ttl and twice ttl
+        capacity: ids expected per ttl with bloom, the most ids kept without it
+        error_rate: false positive rate of the Bloom filters
+
+    Counters:
+        skipped: ids left out of requests
+        requests_saved: requests not made because every id in them was left out
+    '''
+    def __init__(self, ttl:float=86400.0, bloom:bool=False, capacity:int=1000000, error_rate:float=0.001):
+        self.ttl = ttl
+        self.bloom = bloom
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.lock = threading.Lock()
+        self.skipped = 0
+        self.requests_saved = 0
+        # key: time it expires
+        self.entries = OrderedDict()
+        # the filter ids are added to and the one before it, the older is dropped every ttl
+        self.filters = [BloomFilter(capacity, error_rate), BloomFilter(capacity, error_rate)] if bloom else []
+        self.rotated = time.monotonic()
+
+    def get_key(self, kind:str, _id:str, market:str|None):
+        return f"{kind}:{market or ''}:{_id}"
+
+    def __len__(self):
+        with self.lock:
+            return sum(f.count for f in self.filters) if self.bloom else len(self.entries)
+
+    def add(self, kind:str, _id:str, market:str|None=None):
+        key = self.get_key(kind, _id, market)
+        with self.lock:
+            if self.bloom:
+                self.rotate()
+                if self.filters[0].add(key) and key in self.filters[1]:
+                    # counted in the newer filter now, so it is not counted twice
+                    self.filters[1].count -= 1
+                return
+            self.entries[key] = time.monotonic() + self.ttl
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.capacity:
+                self.entries.popitem(last=False)
+
+    def contains(self, kind:str, _id:str, market:str|None=None):
+        key = self.get_key(kind, _id, market)
+        with self.lock:
+            if self.bloom:
+                self.rotate()
+                return any(key in f for f in self.filters)
+            expires = self.entries.get(key)
+            if expires == None:
+                return False
+            if expires <= time.monotonic():
+                del self.entries[key]
+                return False
+            return True
+
+    def rotate(self):
+        # called with the lock held
+        now = time.monotonic()
+        rotations = int((now - self.rotated) // self.ttl)
+        if rotations == 1:
+            self.filters = [BloomFilter(self.capacity, self.error_rate), self.filters[0]]
+        elif rotations > 1:
+            # idle for longer than both filters cover, everything in them has expired
+            self.filters = [BloomFilter(self.capacity, self.error_rate), BloomFilter(self.capacity, self.error_rate)]
+        # keeps rotating on the same schedule, so an id is never kept for more than twice ttl
+        self.rotated += rotations * self.ttl
+
+    def split(self, kind:str, _ids:list, market:str|None=None):
+        '''
+            Returns (ids that are not remembered, list of True for each id that is remembered)
+        '''
+        skipped = [self.contains(kind, _id, market) for _id in _ids]
+        remaining = [_id for _id, skip in zip(_ids, skipped) if not skip]
+        with self.lock:
+            self.skipped += len(_ids) - len(remaining)
+        return remaining, skipped
+
+    def count_saved(self, requests:int=1):
+        with self.lock:
+            self.requests_saved += requests
+
+    def record(self, kind:str, _ids:list, items:list, market:str|None=None):
+        '''
+            Remembers the ids whose item came back null
+        '''
+        for _id, item in zip(_ids, items):
+            if item == None:
+                self.add(kind, _id, market)
+
+    def get_stats(self):
+        with self.lock:
+            return {"skipped": self.skipped, "requests_saved": self.requests_saved,
+                    "ids": sum(f.count for f in self.filters) if self.bloom else len(self.entries)}
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+            if self.bloom:
+                self.filters = [BloomFilter(self.capacity, self.error_rate), BloomFilter(self.capacity, self.error_rate)]
+
+def expand(items:list, skipped:list):
+    '''
+        Puts a None back in the place of every skipped id
+    '''
+    items = iter(items)
+    return [None if skip else next(items, None) for skip in skipped]
@@ -2,15 +2,17 @@
 __all__ = ["SpotifyOAuth", "SpotifyPKCE"]
 
 import base64
-import requests
-import json
 import io
+import json
 import math
 import random
 from hashlib import sha256
-from PIL import Image
 from urllib.parse import urlencode, urlparse, parse_qs
-from client import SpotifyClient
+from .client import SpotifyClient
+from .endpoints import ENDPOINTS, add_endpoint_methods
+from .ids import is_numpy_array, to_id_list, validate_uris
+from .images import MAX_COVER_SIZE, prepare_cover_image
+from .library import export_library
 
 '''
 Authentication Code Flow 
@@ -19,6 +21,7 @@ Reference: https://developer.spotify.com/documentation/web-api/tutorials/code-fl
 '''   
 class SpotifyOAuth(SpotifyClient):
     redirect_uri = None
+    authorize_url = "https://accounts.spotify.com/authorize"
     code = None
     state = None
     scopes = None
@@ -96,15 +99,16 @@ class SpotifyOAuth(SpotifyClient):
         redirected_url = input()
         return redirected_url
     
-    def request_user_auth(self, scopes:list=None, state:str=None, show_dialog:bool=False):
+    def get_authorize_url(self, scopes:list=None, state:str=None, show_dialog:bool=False):
+        '''
+            Returns the url the user has to visit to authorize the app, without requesting it
+        '''
         if self.validate_scopes(scopes=scopes):
             data = self.get_code_data(scopes, state, show_dialog)
-        data = urlencode(data)
-
-        response = requests.get("https://accounts.spotify.com/authorize?" + data)
-        if response.status_code not in range(200, 299):
-            raise Exception(f"Authorization failed, could not redirect.")
-        url = response.url
+        return f"{self.authorize_url}?{urlencode(data)}"
+    
+    def request_user_auth(self, scopes:list=None, state:str=None, show_dialog:bool=False):
+        url = self.get_authorize_url(scopes, state, show_dialog)
         redirected_url = self.get_redirect_url(url)
 
         parsed_query = self.parse_url_query(redirected_url)
@@ -114,12 +118,29 @@ class SpotifyOAuth(SpotifyClient):
         if "code" not in parsed_query:
             raise Exception("Authorization failed, the authorization code is missing")
         
-        # code is returned as a list, so access the first index to get the code string
-        self.code = parsed_query["code"][0]
-        if "state" in parsed_query:
-            self.state = parsed_query["state"]
+        # code and state are returned as lists, so access the first index to get the strings
+        state = parsed_query["state"][0] if "state" in parsed_query else None
+        return self.set_code(parsed_query["code"][0], state)
+    
+    def set_code(self, code:str, state:str|None=None):
+        '''
+            Sets the authorization code from the redirect, the tokens are requested with it the
+            next time an access token is needed
+        '''
+        self.code = code
+        self.access_token = None
+        if state != None:
+            self.state = state
         return True
     
+    def exchange_code(self):
+        '''
+            Requests the access and refresh tokens with the authorization code right away
+        '''
+        if self.code == None:
+            raise Exception("Authorization failed, the authorization code is missing")
+        return self.request_access_token(token_data=self.get_token_data())
+    
     def get_token_data(self):
         return {"grant_type": "authorization_code",
                 "code": self.code,
@@ -143,29 +164,24 @@ class SpotifyOAuth(SpotifyClient):
         if not self.has_required_scopes(required_scopes=required_scopes):
             return {}
         endpoint = self.build_endpoint(id, resource_type, version, query)
-
-        headers = self.get_access_headers()
-        if request_type == "PUT":
-            response = requests.put(endpoint, headers=headers, data=data)
-            return True
-        elif request_type == "DELETE":
-            response = requests.delete(endpoint, headers=headers, data=data)
-            return True
-        elif request_type == "POST":
-            response = requests.post(endpoint, headers=headers, data=data)
-            return True
-        else:
-            response = requests.get(endpoint, headers=headers, data=data)
- 
-        return response.json()
+        return self.send_request(request_type, endpoint, data)
     
     def check_uris(self, uris):
+        '''
+            Returns the uris as a list of strings, arrays from ids.encode_uris (or NumPy arrays
+            of strings) are validated all at once and decoded
+        '''
         if len(uris) > 100:
             raise Exception("Maximum number of URIs exceeded. Please limit to 100 URIs per request.")
-        if not all("spotify:track:" in uri or "spotify:episode:" in uri for uri in uris):
+        if is_numpy_array(uris):
+            valid = validate_uris(uris, types=["track", "episode"]).all()
+            uris = to_id_list(uris)
+        else:
+            valid = all("spotify:track:" in uri or "spotify:episode:" in uri for uri in uris)
+        if not valid:
             raise Exception("One or more URI is invalid, only submit a track or episode URI. "
                             "Examples: spotify:track:1301WleyT98MSxVHPZCA6M, spotify:episode:512ojhOuo1ktJprKbVcKyQ")
-        return
+        return list(uris)
     
     def create_json_body(self, **kwargs):
         data = {}
@@ -212,53 +228,31 @@ class SpotifyOAuth(SpotifyClient):
     GET /me/albums
     '''   
     def get_saved_albums(self, market:str|None=None, limit:int|None=None, offset:int|None=None):
-        required_scopes = ["user-library-read"]
-        query_params = self.create_query(market=market, limit=limit, offset=offset)
-        return self.get_response(-1, resource_type="me/albums", query=query_params, required_scopes=required_scopes)
+        return self.call_endpoint("get_saved_albums", market=market, limit=limit, offset=offset)
     
     def save_albums(self, _ids:list):
-        required_scopes = ["user-library-modify"]
-        query_params = self.convert_list_to_dict("ids", _ids)
-        query_params = urlencode(query_params)
-        return self.get_response(-1, resource_type="me/albums", query=query_params, request_type="PUT", required_scopes=required_scopes)
+        return self.call_endpoint("save_albums", ids=_ids)
 
     def remove_saved_albums(self, _ids:list):
-        required_scopes = ["user-library-modify"]
-        query_params = self.convert_list_to_dict("ids", _ids)
-        query_params = urlencode(query_params)
-        return self.get_response(-1, resource_type="me/albums", query=query_params, request_type="DELETE", required_scopes=required_scopes)   
+        return self.call_endpoint("remove_saved_albums", ids=_ids)
 
     def check_saved_albums(self, _ids:list):
-        required_scopes = ["user-library-read"]
-        query_params = self.convert_list_to_dict("ids", _ids)
-        query_params = urlencode(query_params)
-        return self.get_response(-1, resource_type="me/albums/contains", query=query_params, required_scopes=required_scopes)
+        return self.call_endpoint("check_saved_albums", ids=_ids)
 
     '''
     GET /me/audiobooks
     '''
     def get_saved_audiobooks(self, limit:int=default_limit, offset:int=default_offset):
-        required_scopes = ["user-library-read"]
-        query_params = self.create_query(limit=limit, offset=offset)
-        return self.get_response(-1, resource_type="me/audiobooks", query=query_params, required_scopes=required_scopes)
+        return self.call_endpoint("get_saved_audiobooks", limit=limit, offset=offset)
     
     def save_audiobooks(self, _ids:list):
-        required_scopes = ["user-library-modify"]
-        query_params = self.convert_list_to_dict("ids", _ids)
-        query_params = urlencode(query_params)
-        return self.get_response(-1, resource_type="me/audiobooks", query=query_params, request_type="PUT", required_scopes=required_scopes)
+        return self.call_endpoint("save_audiobooks", ids=_ids)
 
     def remove_saved_audiobooks(self, _ids:list):
-        required_scopes = ["user-library-modify"]
-        query_params = self.convert_list_to_dict("ids", _ids)
-        query_params = urlencode(query_params)
-        return self.get_response(-1, resource_type="me/audiobooks", query=query_params, request_type="DELETE", required_scopes=required_scopes)   
+        return self.call_endpoint("remove_saved_audiobooks", ids=_ids)
 
     def check_saved_audiobooks(self, _ids:list):
-        required_scopes = ["user-library-read"]
-        query_params = self.convert_list_to_dict("ids", _ids)
-        query_params = urlencode(query_params)
-        return self.get_response(-1, resource_type="me/audiobooks/contains", query=query_params, required_scopes=required_scopes)
+        return self.call_endpoint("check_saved_audiobooks", ids=_ids)
 
     '''
     GET /episodes
@@ -268,318 +262,256 @@ class SpotifyOAuth(SpotifyClient):
 
     # Required Scopes: user-read-playback-position
     def get_episode(self, _id:str, market:str|None=None):
-        required_scopes = ["user-read-playback-position"]
-        query_params = self.create_query(market=market)
-        return self.get_response(_id, resource_type="episodes", query=query_params, required_scopes=required_scopes)
+        return self.call_endpoint("get_episode", _id, market=market)
 
     # Required Scopes: user-read-playback-position
     def get_episodes(self, _ids:list, market:str|None=None):
-        required_scopes = ["user-read-playback-position"]
-        query_params = self.convert_list_to_dict("ids", _ids)
-        query_params = self.create_query(query_params, market=market)
-        return self.get_response(-1, resource_type="episodes", query=query_params, required_scopes=required_scopes)
+        return self.call_endpoint("get_episodes", ids=_ids, market=market)
     
     '''
     GET /me/episodes
     '''   
     def get_saved_episodes(self, market:str|None=None, limit:int|None=None, offset:int|None=None):
-        required_scopes = ["user-library-read", "user-read-playback-position"]
-        query_params = self.create_query(market=market, limit=limit, offset=offset)
-        return self.get_response(-1, resource_type="me/episodes", query=query_params, required_scopes=required_scopes)
+        return self.call_endpoint("get_saved_episodes", market=market, limit=limit, offset=offset)
     
     def save_episodes(self, _ids:list):
-        required_scopes = ["user-library-modify"]
-        query_params = self.convert_list_to_dict("ids", _ids)
-        query_params = urlencode(query_params)
-        return self.get_response(-1, resource_type="me/episodes", query=query_params, request_type="PUT", required_scopes=required_scopes)
+        return self.call_endpoint("save_episodes", ids=_ids)
     
     def remove_saved_episodes(self, _ids:list):
-        required_scopes = ["user-library-modify"]
-        query_params = self.convert_list_to_dict("ids", _ids)
-        query_params = urlencode(query_params)
-        return self.get_response(-1, resource_type="me/episodes", query=query_params, request_type="DELETE", required_scopes=required_scopes)
+        return self.call_endpoint("remove_saved_episodes", ids=_ids)
     
     def check_saved_episodes(self, _ids:list):
-        required_scopes = ["user-library-read"]
-        query_params = self.convert_list_to_dict("ids", _ids)
-        query_params = urlencode(query_params)
-        return self.get_response(-1, resource_type="me/episodes/contains", query=query_params, required_scopes=required_scopes)
+        return self.call_endpoint("check_saved_episodes", ids=_ids)
 
     '''
     GET /me/player
     '''
     def get_playback(self, market:str|None=None, additional_types:list=None):
-        required_scopes = ["user-read-playback-state"]
-        query_params = self.create_query(market=market, additional_types=additional_types)
-        return self.get_response(-1, resource_type="me/player", query=query_params, required_scopes=required_scopes)
+        additional_types = self.check_additional_types(additional_types=additional_types)
+        return self.call_endpoint("get_playback", market=market, additional_types=additional_types)
     
     def transfer_playback(self, device_id:list|str, play:bool=True):
-        required_scopes = ["user-modify-playback-state"]
         # only accepts 1 device id, any more results in a 400 error
         if isinstance(device_id, list) and len(device_id) != 1:
              raise Exception("More than one device id was submitted. Please submit only 1 device id.")
         if not isinstance(device_id, list):
             device_id = [device_id]
         data = self.create_json_body(device_ids=device_id, play=play)
-        return self.get_response(-1, resource_type="me/player", request_type="PUT", required_scopes=required_scopes, data=data)
+        return self.call_endpoint("transfer_playback", data=data)
 
     def get_available_devices(self):
-        required_scopes = ["user-read-playback-state"]
-        return self.get_response(-1, resource_type="me/player/devices", required_scopes=required_scopes)
+        return self.call_endpoint("get_available_devices")
     
     def get_currently_playing_track(self, market:str|None=None, additional_types:list=None):
-        required_scopes = ["user-read-currently-playing"]
-        query_params = self.create_query(market=market, additional_types=additional_types)
-        return self.get_response(-1, resource_type="me/player/currently-playing", query=query_params, required_scopes=required_scopes)
+        additional_types = self.check_additional_types(additional_types=additional_types)
+        return self.call_endpoint("get_currently_playing_track", market=market, additional_types=additional_types)
     
     def start_playback(self, device_id=None):
-        required_scopes = ["user-modify-playback-state"]
-        query_params = self.create_query(device_id=device_id)
-        return self.get_response(-1, resource_type="me/player/play", query=query_params, request_type="PUT", required_scopes=required_scopes)
+        return self.call_endpoint("start_playback", device_id=device_id)
     
     def stop_playback(self, device_id=None):
-        required_scopes = ["user-modify-playback-state"]
-        query_params = self.create_query(device_id=device_id)
-        return self.get_response(-1, resource_type="me/player/pause", query=query_params, request_type="PUT", required_scopes=required_scopes)
+        return self.call_endpoint("stop_playback", device_id=device_id)
     
     def skip_to_next(self, device_id=None):
-        required_scopes = ["user-modify-playback-state"]
-        query_params = self.create_query(device_id=device_id)
-        return self.get_response(-1, resource_type="me/player/next", query=query_params, request_type="POST", required_scopes=required_scopes)
+        return self.call_endpoint("skip_to_next", device_id=device_id)
     
     def skip_to_previous(self, device_id=None):
-        required_scopes = ["user-modify-playback-state"]
-        query_params = self.create_query(device_id=device_id)
-        return self.get_response(-1, resource_type="me/player/previous", query=query_params, request_type="POST", required_scopes=required_scopes)
+        return self.call_endpoint("skip_to_previous", device_id=device_id)
 
     def seek_position(self, position_ms:int, device_id=None):
-        required_scopes = ["user-modify-playback-state"]
-        query_params = self.create_query(position_ms=position_ms, device_id=device_id)
-        return self.get_response(-1, resource_type="me/player/seek", query=query_params, request_type="PUT", required_scopes=required_scopes)
+        return self.call_endpoint("seek_position", position_ms=position_ms, device_id=device_id)
 
     def set_repeat_mode(self, state:str, device_id=None):
-        required_scopes = ["user-modify-playback-state"]
         if state not in ["track", "context", "off"]:
             raise Exception("Invalid state. Refer to the Spotify API Documentation for valid states: "
                             "https://developer.spotify.com/documentation/web-api/reference/set-repeat-mode-on-users-playback")
-        query_params = self.create_query(state=state, device_id=device_id)
-        return self.get_response(-1, resource_type="me/player/repeat", query=query_params, request_type="PUT", required_scopes=required_scopes)
+        return self.call_endpoint("set_repeat_mode", state=state, device_id=device_id)
 
     def set_volume(self, volume_percent:int, device_id=None):
-        required_scopes = ["user-modify-playback-state"]
         # simply do nothing if volume percent is outside of range
         if volume_percent not in range(0, 101):
             return False
-        query_params = self.create_query(volume_percent=volume_percent, device_id=device_id)
-        return self.get_response(-1, resource_type="me/player/volume", query=query_params, request_type="PUT", required_scopes=required_scopes)
+        return self.call_endpoint("set_volume", volume_percent=volume_percent, device_id=device_id)
 
     def toggle_shuffle(self, state:bool, device_id=None):
-        required_scopes = ["user-modify-playback-state"]
-        query_params = self.create_query(state=state, device_id=device_id)
-        return self.get_response(-1, resource_type="me/player/shuffle", query=query_params, request_type="PUT", required_scopes=required_scopes)
+        return self.call_endpoint("toggle_shuffle", state=state, device_id=device_id)
     
     def get_recently_played_tracks(self, limit:str|None=None, after:int|None=None, before:int|None=None):
-        required_scopes = ["user-read-recently-played"]
         # Only one should be specified, not both
         if after != None and before != None:
             raise Exception("If after is specified, before must not be specified, and vice versa.")
-        query_params = self.create_query(limit=limit, after=after, before=before)
-        return self.get_response(-1, resource_type="me/player/recently-played", query=query_params, required_scopes=required_scopes)
+        return self.call_endpoint("get_recently_played_tracks", limit=limit, after=after, before=before)
     
     def get_queue(self):
-        required_scopes = ["user-read-playback-state"]
-        return self.get_response(-1, resource_type="me/player/queue", required_scopes=required_scopes)
+        return self.call_endpoint("get_queue")
     
     def add_item_to_queue(self, uri:str, device_id=None):
-        required_scopes = ["user-modify-playback-state"]
         if not("spotify:track:" in uri or "spotify:episode:" in uri):
             raise Exception("Invalid URI. Please submit either a track or episode URI.")
-        query_params = self.create_query(uri=uri, device_id=device_id)
-        return self.get_response(-1, resource_type="me/player/queue", query=query_params, request_type="POST", required_scopes=required_scopes)
+        return self.call_endpoint("add_item_to_queue", uri=uri, device_id=device_id)
 
     '''
     /playlists
     '''
     def change_playlist_details(self, _playlist_id:str, name:str|None=None, public:bool|None=None, collaborative:bool|None=None, description:str|None=None):
-        required_scopes = ["playlist-modify-public", "playlist-modify-private"]
         if public:
             collaborative = False
         data = self.create_json_body(name=name, public=public, collaborative=collaborative, description=description)
-        return self.get_response(_playlist_id, resource_type="playlists", request_type="PUT", required_scopes=required_scopes, data=data)
+        return self.call_endpoint("change_playlist_details", _playlist_id, data=data)
     
     def get_platlist_items(self, _playlist_id:str, market:str|None=None, fields:str|None=None, limit:str|None=None, offset:str|None=None, additional_types:list|None=None):
-        required_scopes = ["playlist-read-private"]
-        query_params = self.create_query(market=market, fields=fields, limit=limit, offset=offset, additional_types=additional_types)
-        return self.get_response(f"{_playlist_id}/tracks", resource_type="playlists", query=query_params, required_scopes=required_scopes)  
+        additional_types = self.check_additional_types(additional_types=additional_types)
+        return self.call_endpoint("get_platlist_items", _playlist_id, market=market, fields=fields, limit=limit, offset=offset, additional_types=additional_types)
     
     def update_playlist_items(self, _playlist_id:str, uris:list|None=None, range_start:int|None=None, range_length:int|None=None, snapshot_id:str|None=None):
-        required_scopes = ["playlist-modify-public", "playlist-modify-private"]
-        self.check_uris(uris)
+        uris = self.check_uris(uris)
         data = self.create_json_body(uris=uris, range_start=range_start, range_length=range_length, snapshot_id=snapshot_id)
-        return self.get_response(f"{_playlist_id}/tracks", resource_type="playlists", request_type="PUT", required_scopes=required_scopes, data=data)
+        return self.call_endpoint("update_playlist_items", _playlist_id, data=data)
     
     def add_items_to_playlist(self, _playlist_id:str, uris:list|None=None, position:int|None=None):
-        required_scopes = ["playlist-modify-public", "playlist-modify-private"]
-        self.check_uris(uris)
+        uris = self.check_uris(uris)
         data = self.create_json_body(uris=uris, position=position)
-        return self.get_response(f"{_playlist_id}/tracks", resource_type="playlists", request_type="POST", required_scopes=required_scopes, data=data)
+        return self.call_endpoint("add_items_to_playlist", _playlist_id, data=data)
     
     def remove_items_to_playlist(self, _playlist_id:str, uris:list, snapshot_id:str|None=None):
-        required_scopes = ["playlist-modify-public", "playlist-modify-private"]
-        self.check_uris(uris)
+        uris = self.check_uris(uris)
         uris = self.create_list_of_objects(uris=uris)
         data = self.create_json_body(uris=uris, snapshot_id=snapshot_id)
-        return self.get_response(f"{_playlist_id}/tracks", resource_type="playlists", request_type="DELETE", required_scopes=required_scopes, data=data)
+        return self.call_endpoint("remove_items_to_playlist", _playlist_id, data=data)
     
     def get_current_users_playlists(self, limit:int|None=None, offset:int|None=None):
-        required_scopes = ["playlist-read-private"]
-        query_params = self.create_query(limit=limit, offset=offset)
-        return self.get_response(-1, resource_type="me/playlists", query=query_params, required_scopes=required_scopes)
+        return self.call_endpoint("get_current_users_playlists", limit=limit, offset=offset)
 
     def get_users_playlists(self, _user_id:str, limit:int|None=None, offset:int|None=None):
-        required_scopes = ["playlist-read-private"]
-        query_params = self.create_query(limit=limit, offset=offset)
-        return self.get_response(f"{_user_id}/playlists", resource_type="users", query=query_params, required_scopes=required_scopes)
+        return self.call_endpoint("get_users_playlists", _user_id, limit=limit, offset=offset)
     
     def create_playlist(self, _user_id:str, name:str, public:bool|None=True, collaborative:bool|None=False, description:str|None=None):
-        required_scopes = ["playlist-modify-public", "playlist-modify-private"]
         if public:
             collaborative = False
         data = self.create_json_body(name=name, public=public, collaborative=collaborative, description=description)
-        return self.get_response(f"{_user_id}/playlists", resource_type="users", request_type="POST", required_scopes=required_scopes, data=data)
+        return self.call_endpoint("create_playlist", _user_id, data=data)
 
     def add_cover_image(self, _playlist_id:str, image_data:str):
-        required_scopes = ["ugc-image-upload", "playlist-modify-public", "playlist-modify-private"]
+        # Pillow takes longer to import than the rest of the package, only load it when needed
+        from PIL import Image
 
         decoded_string = base64.b64decode(image_data)
-        im = Image.open(io.BytesIO(decoded_string))
-        im.verify()
+        try:
+            im = Image.open(io.BytesIO(decoded_string))
+            im.verify()
+        except Exception:
+            raise ValueError("Image is not a valid image.")
         if im.format != "JPEG":
             raise ValueError("Image is not a JPEG image.")
-        
-        return self.get_response(f"{_playlist_id}/images", resource_type="playlists", request_type="PUT", required_scopes=required_scopes, data=image_data)
+        if len(image_data) > MAX_COVER_SIZE:
+            raise ValueError(f"Image is over the {MAX_COVER_SIZE // 1024} KB limit after base64 encoding.")
+
+        return self.call_endpoint("add_cover_image", _playlist_id, data=image_data)
+    
+    def upload_cover_image(self, _playlist_id:str, image, **kwargs):
+        '''
+            Parameters:
+                image: file path, bytes or binary stream of the image, in any format Pillow reads
+                kwargs: passed to images.prepare_cover_image, ex. max_dimension
+
+            The image is converted or resized only if it is not a JPEG or is over the 256 KB
+            limit, and is base64 encoded while it is sent.
+        '''
+        if not self.has_required_scopes(ENDPOINTS["add_cover_image"].scopes):
+            return {}
+        with prepare_cover_image(image, **kwargs) as cover:
+            return self.call_endpoint("add_cover_image", _playlist_id, data=cover.get_body())
 
     '''
     /me/shows
     '''
     def get_show(self, _show_id:str, market:str|None=None):
-        required_scopes = ["user-read-playback-position"]
-        query_params = self.create_query(market=market)
-        return self.get_response(_show_id, resource_type="shows", query=query_params, required_scopes=required_scopes)
+        return self.call_endpoint("get_show", _show_id, market=market)
     
     def get_shows(self, _show_ids:list, market:str|None=None):
-        required_scopes = ["user-read-playback-position"]
-        ids = self.convert_list_to_str(",", _show_ids)
-        query_params = self.create_query(ids=ids, market=market)
-        return self.get_response(-1, resource_type="shows", query=query_params, required_scopes=required_scopes)
+        return self.call_endpoint("get_shows", ids=_show_ids, market=market)
 
     def get_saved_shows(self, limit:str|None=None, offset:str|None=None):
-        required_scopes = ["user-library-read"]
-        query_params = self.create_query(limit=limit, offset=offset)
-        return self.get_response(-1, resource_type="me/shows", query=query_params, required_scopes=required_scopes)
+        return self.call_endpoint("get_saved_shows", limit=limit, offset=offset)
     
     def save_shows(self, _show_ids:list):
-        required_scopes = ["user-library-modify"]
-        ids = self.convert_list_to_str(",", _show_ids)
-        query_params = self.create_query(ids=ids)
-        return self.get_response(-1, resource_type="me/shows", query=query_params, request_type="PUT", required_scopes=required_scopes)
+        return self.call_endpoint("save_shows", ids=_show_ids)
     
     def remove_saved_shows(self, _show_ids:list, market:str|None=None):
-        required_scopes = ["user-library-modify"]
-        ids = self.convert_list_to_str(",", _show_ids)
-        query_params = self.create_query(ids=ids, market=market)
-        return self.get_response(-1, resource_type="me/shows", query=query_params, request_type="DELETE", required_scopes=required_scopes)
+        return self.call_endpoint("remove_saved_shows", ids=_show_ids, market=market)
     
     def check_saved_shows(self, _show_ids:list):
-        required_scopes = ["user-read-playback-position"]
-        ids = self.convert_list_to_str(",", _show_ids)
-        query_params = self.create_query(ids=ids)
-        return self.get_response(-1, resource_type="me/shows/contains", query=query_params, required_scopes=required_scopes)
+        return self.call_endpoint("check_saved_shows", ids=_show_ids)
     
     '''
     /tracks
     '''
     def get_saved_tracks(self, market:str|None=None, limit:int|None=None, offset:int|None=None):
-        required_scopes = ["user-library-read"]
-        query_params = self.create_query(market=market, limit=limit, offset=offset)
-        return self.get_response(-1, resource_type="me/tracks", query=query_params, required_scopes=required_scopes)
+        return self.call_endpoint("get_saved_tracks", market=market, limit=limit, offset=offset)
     
     def save_tracks(self, _track_ids:list):
-        required_scopes = ["user-library-modify"]
-        ids = self.convert_list_to_str(",", _track_ids)
-        query_params = self.create_query(ids=ids)
-        return self.get_response(-1, resource_type="me/tracks", query=query_params, request_type="PUT", required_scopes=required_scopes)
+        return self.call_endpoint("save_tracks", ids=_track_ids)
 
     def remove_saved_tracks(self, _track_ids:list):
-        required_scopes = ["user-library-modify"]
-        ids = self.convert_list_to_str(",", _track_ids)
-        query_params = self.create_query(ids=ids)
-        return self.get_response(-1, resource_type="me/tracks", query=query_params, request_type="DELETE", required_scopes=required_scopes)
+        return self.call_endpoint("remove_saved_tracks", ids=_track_ids)
     
     def check_saved_tracks(self, _show_ids:list):
-        required_scopes = ["user-library-read"]
-        ids = self.convert_list_to_str(",", _show_ids)
-        query_params = self.create_query(ids=ids)
-        return self.get_response(-1, resource_type="me/tracks/contains", query=query_params, required_scopes=required_scopes)
+        return self.call_endpoint("check_saved_tracks", ids=_show_ids)
     
     '''
     GET /me
     '''
     def get_current_users_profile(self):
-        required_scopes = ["user-read-private", "user-read-email"]
-        return self.get_response(-1, resource_type="me", required_scopes=required_scopes)
+        return self.call_endpoint("get_current_users_profile")
 
     def get_top_items(self, type:str, time_range:str|None=None, limit:int|None=None, offset:int|None=None):
-        required_scopes = ["user-top-read"]
         if type not in ["artists", "tracks"]:
             raise Exception("Invalid type. Valid values are 'artists' or 'tracks'")
         if time_range not in ["long_term", "medium_term", "short_term"]:
             time_range = None
-        query_params = self.create_query(time_range=time_range, limit=limit, offset=offset)
-        return self.get_response(type, resource_type="me/top", query=query_params, required_scopes=required_scopes)
+        return self.call_endpoint("get_top_items", type, time_range=time_range, limit=limit, offset=offset)
 
     def follow_playlist(self, _playlist_id:str, public:bool=True):
-        required_scopes = ["playlist-modify-public", "playlist-modify-private"]
         data = self.create_json_body(public=public)
-        return self.get_response(f"{_playlist_id}/followers", resource_type="playlists", request_type="PUT", required_scopes=required_scopes, data=data)
+        return self.call_endpoint("follow_playlist", _playlist_id, data=data)
     
     def unfollow_playlist(self, _playlist_id:str):
-        required_scopes = ["playlist-modify-public", "playlist-modify-private"]
-        return self.get_response(f"{_playlist_id}/followers", resource_type="playlists", request_type="DELETE", required_scopes=required_scopes)
+        return self.call_endpoint("unfollow_playlist", _playlist_id)
 
     '''
     NOTE 6/25/2023: Currently only artist is supported for type, however type is left as a 
          parameter if this were to change in the future.
     '''
     def get_followed_artists(self, type:str|None="artist", after:str|None=None, limit:int|None=None):
-        required_scopes = ["user-follow-read"]
         type = "artist"
-        query_params = self.create_query(type=type, after=after, limit=limit)
-        return self.get_response(-1, resource_type="me/following", query=query_params, required_scopes=required_scopes)
+        return self.call_endpoint("get_followed_artists", type=type, after=after, limit=limit)
     
     def follow_artists_or_users(self, type:str, _ids:list):
-        required_scopes = ["user-follow-modify"]
         if type not in ["artist", "user"]:
             raise Exception("Invalid type. Valid values are 'artist' or 'user'")
-        ids = self.convert_list_to_str(",", _ids)
-        query_params = self.create_query(type=type, ids=ids)
-        return self.get_response(-1, resource_type="me/following", query=query_params, request_type="PUT", required_scopes=required_scopes)
+        return self.call_endpoint("follow_artists_or_users", type=type, ids=_ids)
     
     def unfollow_artists_or_users(self, type:str, _ids:list):
-        required_scopes = ["user-follow-modify"]
         if type not in ["artist", "user"]:
             raise Exception("Invalid type. Valid values are 'artist' or 'user'")
-        ids = self.convert_list_to_str(",", _ids)
-        query_params = self.create_query(type=type, ids=ids)
-        return self.get_response(-1, resource_type="me/following", query=query_params, request_type="DELETE", required_scopes=required_scopes)
+        return self.call_endpoint("unfollow_artists_or_users", type=type, ids=_ids)
     
     def check_artists_or_users(self, type:str, _ids:list):
-        required_scopes = ["user-follow-read"]
         if type not in ["artist", "user"]:
             raise Exception("Invalid type. Valid values are 'artist' or 'user'")
-        ids = self.convert_list_to_str(",", _ids)
-        query_params = self.create_query(type=type, ids=ids)
-        return self.get_response(-1, resource_type="me/following/contains", query=query_params, required_scopes=required_scopes)
+        return self.call_endpoint("check_artists_or_users", type=type, ids=_ids)
+    
+    '''
+    Library export
+    '''
+    def export_library(self, output=None, callback=None, **kwargs):
+        '''
+            Streams the saved tracks, albums, shows, episodes, audiobooks, followed artists
+            and playlists of the user. See library.export_library for the parameters.
+        '''
+        return export_library(self, output=output, callback=callback, **kwargs)
+
+add_endpoint_methods(SpotifyOAuth, user_endpoints=True)
 
 class SpotifyPKCE(SpotifyOAuth):
     code_verifier = None
@@ -625,7 +557,8 @@ class SpotifyPKCE(SpotifyOAuth):
         data["client_id"] = self.client_id
         return data
     
-    def request_user_auth(self, scopes: list = None, state: str = None, show_dialog: bool = False):
+    def get_authorize_url(self, scopes:list=None, state:str=None, show_dialog:bool=False):
+        # every authorization needs a new verifier and challenge
         self.set_verifier_and_challenge()
-        return super().request_user_auth(scopes, state, show_dialog)
+        return super().get_authorize_url(scopes, state, show_dialog)
     
\ No newline at end of file
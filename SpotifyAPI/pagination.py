@@ -0,0 +1,51 @@
+
+__all__ = ["iterate_pages", "iterate_items"]
+
+'''
+Paging helpers
+
+Spotify returns a paging object for anything that is a list, with the url of the next
+page in "next" (offset based endpoints) or with a "cursors" object (cursor based endpoints
+like /me/following and /me/player/recently-played). Both put the full url in "next", so
+following it works for either kind.
+
+Reference: https://developer.spotify.com/documentation/web-api/concepts/api-calls
+'''
+def get_paging_object(response, page_key=None):
+    if isinstance(response, dict) and "error" in response:
+        raise Exception(f"Could not get page. Error: {response['error']}")
+    if page_key != None and isinstance(response, dict):
+        response = response.get(page_key)
+    if not isinstance(response, dict):
+        return {}
+    return response
+
+def iterate_pages(client, method=None, *args, page_key:str|None=None, call=None, next_url:str|None=None, **kwargs):
+    '''
+        Parameters:
+            client: SpotifyClient or SpotifyOAuth used to follow the "next" urls
+            method: bound method that returns the first page, ex. client.get_saved_tracks
+            page_key: key the paging object is nested under, ex. "artists" for get_followed_artists
+            call: function used to make each request, ex. RequestPool.call. Defaults to calling directly
+            next_url: start from this url instead of calling method, used to resume
+
+        Yields each paging object, stopping after the page without a "next" url.
+    '''
+    if call == None:
+        call = lambda fn, *a, **kw: fn(*a, **kw)
+
+    if next_url != None:
+        page = get_paging_object(call(client.get_page, next_url), page_key)
+    else:
+        page = get_paging_object(call(method, *args, **kwargs), page_key)
+
+    while page:
+        yield page
+        next_url = page.get("next")
+        if not next_url or not page.get("items"):
+            return
+        page = get_paging_object(call(client.get_page, next_url), page_key)
+
+def iterate_items(client, method=None, *args, **kwargs):
+    for page in iterate_pages(client, method, *args, **kwargs):
+        yield from page.get("items") or []
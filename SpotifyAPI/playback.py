@@ -0,0 +1,393 @@
+
+__all__ = ["PlaybackWatcher", "PLAYBACK_COMMANDS", "PlaybackQueue"]
+
+import atexit
+import heapq
+import itertools
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future
+from .concurrency import RequestPool
+from .endpoints import ENDPOINTS
+
+'''
+Playback state of many users from one scheduler thread
+
+Every watched user has a due time in a heap. The scheduler thread sleeps until the earliest
+one, and hands the poll to a RequestPool. After each poll the next one is scheduled from the
+state that came back:
+
+    playing: shortly after the current item is expected to end, but at most max_interval away
+    paused: paused_interval, doubling while nothing changes, up to max_idle_interval
+    no active device (204): idle_interval, doubling while nothing changes, up to max_idle_interval
+    error: idle_interval
+'''
+# fields compared between polls, ("item", "id") means state["item"]["id"]
+WATCHED_FIELDS = {
+    "item": ("item", "id"),
+    "is_playing": ("is_playing",),
+    "device": ("device", "id"),
+    "volume": ("device", "volume_percent"),
+    "context": ("context", "uri"),
+    "shuffle_state": ("shuffle_state",),
+    "repeat_state": ("repeat_state",),
+}
+# a progress further than this from where it should be counts as a seek
+SEEK_TOLERANCE_MS = 3000
+
+def get_field(state, path):
+    for key in path:
+        if not isinstance(state, dict):
+            return None
+        state = state.get(key)
+    return state
+
+class PlaybackWatch(object):
+    __slots__ = ["key", "auth", "callback", "state", "polled", "quiet_polls", "polls", "changes", "errors", "active"]
+
+    def __init__(self, key, auth, callback):
+        self.key = key
+        self.auth = auth
+        self.callback = callback
+        self.state = None
+        self.polled = None
+        self.quiet_polls = 0
+        self.polls = 0
+        self.changes = 0
+        self.errors = 0
+        self.active = True
+
+class PlaybackWatcher(object):
+    '''
+    Polls get_playback for any number of users and calls back when their playback changes.
+
+        watcher = PlaybackWatcher()
+        watcher.watch(auth, on_change, key="user-1")
+
+        def on_change(key, state, previous, changes):
+            ...
+
+    state and previous are get_playback responses, {} when nothing is playing on any device.
+    changes lists what changed: "item", "is_playing", "device", "volume", "context",
+    "shuffle_state", "repeat_state", "progress" (a seek) and "active" (playback started or stopped).
+    The first poll of a user always calls back. Callbacks run on the pool's threads.
+
+    The auth needs the user-read-playback-state scope.
+    '''
+    def __init__(self, min_interval:float=1.0, max_interval:float=15.0, paused_interval:float=5.0,
+                 idle_interval:float=10.0, max_idle_interval:float=60.0, end_margin:float=0.5,
+                 market:str|None=None, pool:RequestPool|None=None, max_workers:int=4, start:bool=True):
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.paused_interval = paused_interval
+        self.idle_interval = idle_interval
+        self.max_idle_interval = max_idle_interval
+        self.end_margin = end_margin
+        self.market = market
+        self.owns_pool = pool == None
+        self.pool = pool if pool != None else RequestPool(max_workers=max_workers)
+        self.condition = threading.Condition()
+        # (due, sequence, watch)
+        self.heap = []
+        self.sequence = itertools.count()
+        self.watches = {}
+        self.closed = False
+        self.thread = None
+        if start:
+            self.start()
+
+    def start(self):
+        if self.thread != None:
+            return
+        self.thread = threading.Thread(target=self.run, name="spotify-api-playback-watcher", daemon=True)
+        self.thread.start()
+        atexit.register(self.close)
+
+    def watch(self, auth, callback, key=None):
+        '''
+            Starts polling for auth, key is passed to the callback and defaults to auth
+        '''
+        key = key if key != None else auth
+        # a missing scope returns {}, which would look the same as no active device forever
+        scopes = ENDPOINTS["get_playback"].scopes
+        if not auth.has_required_scopes(scopes):
+            raise Exception(f"Could not watch playback, the user has not granted the scopes: {', '.join(scopes)}")
+        with self.condition:
+            if key in self.watches:
+                raise Exception("This key is already being watched.")
+            watch = PlaybackWatch(key, auth, callback)
+            self.watches[key] = watch
+            self.schedule(watch, 0)
+        return watch
+
+    def unwatch(self, key):
+        with self.condition:
+            watch = self.watches.pop(key, None)
+            if watch != None:
+                # the heap entry is skipped when it comes up
+                watch.active = False
+
+    def __len__(self):
+        return len(self.watches)
+
+    def schedule(self, watch, delay):
+        # called with the condition held
+        heapq.heappush(self.heap, (time.monotonic() + delay, next(self.sequence), watch))
+        self.condition.notify()
+
+    def run(self):
+        with self.condition:
+            while not self.closed:
+                if not self.heap:
+                    self.condition.wait()
+                    continue
+                due, _, watch = self.heap[0]
+                delay = due - time.monotonic()
+                if delay > 0:
+                    self.condition.wait(delay)
+                    continue
+                heapq.heappop(self.heap)
+                if watch.active:
+                    self.pool.executor.submit(self.poll, watch)
+
+    def poll(self, watch):
+        try:
+            delay = self.poll_now(watch)
+        except Exception:
+            watch.errors += 1
+            delay = self.idle_interval
+        with self.condition:
+            if watch.active and not self.closed:
+                self.schedule(watch, delay)
+
+    def poll_now(self, watch):
+        '''
+            Polls once and calls back if anything changed, returns the seconds until the next poll
+        '''
+        now = time.monotonic()
+        state = self.pool.call(watch.auth.get_playback, market=self.market)
+        if "error" in state:
+            raise Exception(f"Could not get playback state. Error: {state['error']}")
+        watch.polls += 1
+
+        previous, polled = watch.state, watch.polled
+        watch.state, watch.polled = state, now
+        changes = self.get_changes(previous, state, now - polled if polled != None else 0)
+        if changes:
+            watch.changes += 1
+            watch.quiet_polls = 0
+            watch.callback(watch.key, state, previous if previous != None else {}, changes)
+        else:
+            watch.quiet_polls += 1
+        return self.get_next_delay(state, watch.quiet_polls)
+
+    def get_changes(self, previous, state, elapsed):
+        if previous == None:
+            return list(WATCHED_FIELDS) + ["active"] if state else ["active"]
+        if bool(previous) != bool(state):
+            return ["active"]
+        changes = [name for name, path in WATCHED_FIELDS.items() if get_field(previous, path) != get_field(state, path)]
+        if state and not changes and state.get("progress_ms") != None and previous.get("progress_ms") != None:
+            expected = previous["progress_ms"] + (elapsed * 1000 if previous.get("is_playing") else 0)
+            if abs(state["progress_ms"] - expected) > SEEK_TOLERANCE_MS:
+                changes.append("progress")
+        return changes
+
+    def get_next_delay(self, state, quiet_polls:int=0):
+        if not state:
+            return min(self.idle_interval * 2 ** min(quiet_polls, 16), self.max_idle_interval)
+        if not state.get("is_playing"):
+            return min(self.paused_interval * 2 ** min(quiet_polls, 16), self.max_idle_interval)
+        duration, progress = get_field(state, ("item", "duration_ms")), state.get("progress_ms")
+        if duration == None or progress == None:
+            return self.max_interval
+        remaining = (duration - progress) / 1000 + self.end_margin
+        return min(max(remaining, self.min_interval), self.max_interval)
+
+    def get_stats(self):
+        watches = list(self.watches.values())
+        return {"watched": len(watches), "polls": sum(w.polls for w in watches),
+                "changes": sum(w.changes for w in watches), "errors": sum(w.errors for w in watches)}
+
+    def close(self):
+        if self.closed:
+            return
+        with self.condition:
+            self.closed = True
+            self.condition.notify()
+        if self.thread != None:
+            self.thread.join()
+            atexit.unregister(self.close)
+        if self.owns_pool:
+            self.pool.shutdown()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+'''
+Playback commands and how a newer one affects the same command still waiting to be sent
+
+    "latest": the newer one replaces it, the setting does not depend on what is playing
+    "track": the newer one replaces it unless a command that changes the track is between them
+    "ordered": both are sent, in order. These are the commands that change the track
+'''
+PLAYBACK_COMMANDS = {
+    "set_volume": "latest",
+    "toggle_shuffle": "latest",
+    "set_repeat_mode": "latest",
+    "seek_position": "track",
+    "start_playback": "ordered",
+    "stop_playback": "ordered",
+    "skip_to_next": "ordered",
+    "skip_to_previous": "ordered",
+    "add_item_to_queue": "ordered",
+}
+
+class PlaybackCommand(object):
+    __slots__ = ["name", "args", "futures"]
+
+    def __init__(self, name, args):
+        self.name = name
+        self.args = args
+        self.futures = [Future()]
+
+class PlaybackQueue(object):
+    '''
+    Queues playback commands per device and sends them one after another.
+
+    Each device has at most one command in flight. Commands made while it is being sent wait
+    in the device's queue, where a newer set_volume, toggle_shuffle or set_repeat_mode replaces
+    the waiting one, and a newer seek_position replaces the waiting one if no skip, queue add,
+    start or stop is between them. Skips and queue adds are always sent, in order. Devices
+    are independent, their commands go out concurrently on the pool.
+
+        queue = PlaybackQueue(auth)
+        for volume in range(0, 101):
+            queue.set_volume(volume)   # a few requests, not 101
+        queue.flush()
+
+    Every command returns a Future, with the result of the request that carried it out. A
+    replaced command gets the result of the command that replaced it.
+    '''
+    def __init__(self, auth, pool:RequestPool|None=None, max_workers:int=4):
+        self.auth = auth
+        self.owns_pool = pool == None
+        self.pool = pool if pool != None else RequestPool(max_workers=max_workers)
+        self.lock = threading.Lock()
+        self.idle = threading.Condition(self.lock)
+        # device id: deque of PlaybackCommand, devices with a command in flight are in sending
+        self.queues = {}
+        self.sending = set()
+        self.sent = 0
+        self.coalesced = 0
+        self.closed = False
+
+    def set_volume(self, volume_percent:int, device_id=None):
+        return self.add("set_volume", device_id, volume_percent=volume_percent)
+
+    def toggle_shuffle(self, state:bool, device_id=None):
+        return self.add("toggle_shuffle", device_id, state=state)
+
+    def set_repeat_mode(self, state:str, device_id=None):
+        return self.add("set_repeat_mode", device_id, state=state)
+
+    def seek_position(self, position_ms:int, device_id=None):
+        return self.add("seek_position", device_id, position_ms=position_ms)
+
+    def start_playback(self, device_id=None):
+        return self.add("start_playback", device_id)
+
+    def stop_playback(self, device_id=None):
+        return self.add("stop_playback", device_id)
+
+    def skip_to_next(self, device_id=None):
+        return self.add("skip_to_next", device_id)
+
+    def skip_to_previous(self, device_id=None):
+        return self.add("skip_to_previous", device_id)
+
+    def add_item_to_queue(self, uri:str, device_id=None):
+        return self.add("add_item_to_queue", device_id, uri=uri)
+
+    def add(self, name:str, device_id, **args):
+        command = PlaybackCommand(name, args)
+        with self.lock:
+            if self.closed:
+                raise Exception("The queue is closed.")
+            queue = self.queues.setdefault(device_id, deque())
+            replaced = self.find_replaced(queue, name)
+            if replaced != None:
+                queue.remove(replaced)
+                command.futures.extend(replaced.futures)
+                self.coalesced += 1
+            queue.append(command)
+            if device_id not in self.sending:
+                self.sending.add(device_id)
+                self.pool.executor.submit(self.drain, device_id)
+        return command.futures[0]
+
+    def find_replaced(self, queue, name):
+        kind = PLAYBACK_COMMANDS[name]
+        if kind == "ordered":
+            return None
+        for waiting in reversed(queue):
+            if waiting.name == name:
+                return waiting
+            if kind == "track" and PLAYBACK_COMMANDS[waiting.name] == "ordered":
+                return None
+        return None
+
+    def drain(self, device_id):
+        while True:
+            with self.lock:
+                queue = self.queues[device_id]
+                if not queue:
+                    del self.queues[device_id]
+                    self.sending.discard(device_id)
+                    self.idle.notify_all()
+                    return
+                command = queue.popleft()
+            try:
+                result = self.pool.call(getattr(self.auth, command.name), device_id=device_id, **command.args)
+            except Exception as e:
+                for future in command.futures:
+                    future.set_exception(e)
+            else:
+                for future in command.futures:
+                    future.set_result(result)
+            with self.lock:
+                self.sent += 1
+
+    def __len__(self):
+        with self.lock:
+            return sum(len(queue) for queue in self.queues.values())
+
+    def flush(self, timeout:float|None=None):
+        '''
+            Waits until every queued command is sent, returns False on timeout
+        '''
+        with self.lock:
+            return self.idle.wait_for(lambda: not self.sending, timeout)
+
+    def get_stats(self):
+        with self.lock:
+            return {"sent": self.sent, "coalesced": self.coalesced, "pending": sum(len(q) for q in self.queues.values())}
+
+    def close(self):
+        with self.lock:
+            if self.closed:
+                return
+            self.closed = True
+        self.flush()
+        if self.owns_pool:
+            self.pool.shutdown()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
@@ -0,0 +1,181 @@
+
+__all__ = ["ReplayResponse", "ReplayTransport", "RecordingTransport"]
+
+import json
+import os
+import random
+import threading
+import time
+from collections import deque
+from urllib.parse import urlparse, parse_qsl, urlencode
+
+'''
+Offline replay of recorded responses
+
+A ReplayTransport has the same get/post/put/delete methods as requests, so it can be set
+as the session of any client:
+
+    client.session = ReplayTransport("fixtures/")
+
+Each response is a file in the fixtures directory named after the request, ex.
+
+    GET /v1/me/tracks?limit=50&offset=50  ->  GET_v1_me_tracks@limit=50&offset=50.json
+    GET /v1/albums/4aawyAB9vmqN3uQ7FjRGTy ->  GET_v1_albums_4aawyAB9vmqN3uQ7FjRGTy.json
+
+The query is sorted, and a file without the query is used when there is no exact match.
+A file holds the JSON body as Spotify sent it; error bodies ({"error": {"status": ...}})
+are replayed with their status code. RecordingTransport writes these files.
+'''
+def get_fixture_name(method:str, url:str, with_query:bool=True):
+    parsed_url = urlparse(url)
+    name = method.upper() + parsed_url.path.replace("/", "_")
+    if with_query and parsed_url.query:
+        name += "@" + urlencode(sorted(parse_qsl(parsed_url.query)))
+    # keep the name a valid file name on every platform
+    for char in ':*?"<>|\\':
+        name = name.replace(char, "-")
+    return name + ".json"
+
+class ReplayResponse(object):
+    '''
+    The parts of requests.Response the clients use
+    '''
+    def __init__(self, status_code:int, content:bytes, url:str, headers:dict|None=None):
+        self.status_code = status_code
+        self.content = content
+        self.url = url
+        self.headers = headers if headers != None else {"Content-Type": "application/json; charset=utf-8"}
+
+    @property
+    def ok(self):
+        return self.status_code < 400
+
+    @property
+    def text(self):
+        return self.content.decode("utf-8")
+
+    def json(self, **kwargs):
+        return json.loads(self.content, **kwargs)
+
+class ReplayTransport(object):
+    '''
+    Parameters:
+        directory: folder with the recorded responses
+        latency: seconds added to every request
+        jitter: up to this many extra seconds are added at random
+        rate_limit_every: every nth request gets a 429 with a Retry-After header
+        retry_after: value of the Retry-After header, in seconds
+        cache: keep the files in memory after the first read, so disk reads are not measured
+
+    Responses without a file are a 404, except PUT and DELETE requests which succeed with
+    an empty body. Token requests (POST .../api/token) get a new fake token if there is
+    no file for them. The last 1000 requests are kept in requests, for checking in tests.
+    '''
+    def __init__(self, directory:str, latency:float=0.0, jitter:float=0.0, rate_limit_every:int|None=None,
+                 retry_after:int=1, cache:bool=True, seed:int|None=None):
+        self.directory = directory
+        self.latency = latency
+        self.jitter = jitter
+        self.rate_limit_every = rate_limit_every
+        self.retry_after = retry_after
+        self.cache = cache
+        self.files = {}
+        self.random = random.Random(seed)
+        self.lock = threading.Lock()
+        self.request_count = 0
+        self.requests = deque(maxlen=1000)
+
+    def read_fixture(self, name):
+        if self.cache and name in self.files:
+            return self.files[name]
+        path = os.path.join(self.directory, name)
+        content = None
+        if os.path.exists(path):
+            with open(path, "rb") as f:
+                content = f.read()
+        if self.cache:
+            self.files[name] = content
+        return content
+
+    def request(self, method:str, url:str, headers=None, data=None, **kwargs):
+        with self.lock:
+            self.request_count += 1
+            count = self.request_count
+            self.requests.append((method, url))
+            delay = self.latency + (self.random.random() * self.jitter if self.jitter else 0)
+        if delay:
+            time.sleep(delay)
+
+        if self.rate_limit_every and count % self.rate_limit_every == 0:
+            body = {"error": {"status": 429, "message": "API rate limit exceeded"}}
+            headers = {"Content-Type": "application/json; charset=utf-8", "Retry-After": str(self.retry_after)}
+            return ReplayResponse(429, json.dumps(body).encode("utf-8"), url, headers)
+
+        content = self.read_fixture(get_fixture_name(method, url))
+        if content == None:
+            content = self.read_fixture(get_fixture_name(method, url, with_query=False))
+        if content == None and method == "POST" and urlparse(url).path.endswith("/api/token"):
+            token = {"access_token": f"replay-token-{count}", "token_type": "Bearer", "expires_in": 3600}
+            content = json.dumps(token).encode("utf-8")
+        if content == None and method in ["PUT", "DELETE"]:
+            # saving, removing, following etc. return an empty body
+            return ReplayResponse(200, b"", url)
+        if content == None:
+            body = {"error": {"status": 404, "message": f"No fixture for {method} {url}"}}
+            return ReplayResponse(404, json.dumps(body).encode("utf-8"), url)
+
+        status_code = 200
+        # error bodies are small, only check those
+        if len(content) < 512 and content.startswith(b'{"error"'):
+            error = json.loads(content)["error"]
+            if isinstance(error, dict):
+                status_code = error.get("status", 400)
+        return ReplayResponse(status_code, content, url)
+
+    def get(self, url, **kwargs):
+        return self.request("GET", url, **kwargs)
+
+    def post(self, url, **kwargs):
+        return self.request("POST", url, **kwargs)
+
+    def put(self, url, **kwargs):
+        return self.request("PUT", url, **kwargs)
+
+    def delete(self, url, **kwargs):
+        return self.request("DELETE", url, **kwargs)
+
+class RecordingTransport(object):
+    '''
+    Makes real requests with session (a requests.Session by default) and writes each
+    response body to directory, in the format ReplayTransport reads.
+
+    NOTE: token responses are not recorded, they contain real credentials.
+    '''
+    def __init__(self, directory:str, session=None):
+        if session == None:
+            import requests
+            session = requests.Session()
+        self.directory = directory
+        self.session = session
+        os.makedirs(directory, exist_ok=True)
+
+    def request(self, method:str, url:str, **kwargs):
+        response = self.session.request(method, url, **kwargs)
+        if urlparse(url).path.endswith("/api/token"):
+            return response
+        if response.content:
+            with open(os.path.join(self.directory, get_fixture_name(method, url)), "wb") as f:
+                f.write(response.content)
+        return response
+
+    def get(self, url, **kwargs):
+        return self.request("GET", url, **kwargs)
+
+    def post(self, url, **kwargs):
+        return self.request("POST", url, **kwargs)
+
+    def put(self, url, **kwargs):
+        return self.request("PUT", url, **kwargs)
+
+    def delete(self, url, **kwargs):
+        return self.request("DELETE", url, **kwargs)
@@ -0,0 +1,78 @@
+
+__all__ = ["SEARCH_TYPES", "search_stream"]
+
+from concurrent.futures import FIRST_COMPLETED, wait
+from .concurrency import RateLimiter, RequestPool
+from .pagination import get_paging_object
+
+'''
+Search across several types at once
+
+Spotify pages each searched type separately, and stops at offset + limit = 1000. The first
+page of each type gives the total, after that every remaining page of every type is
+requested at the same time, so a full result set takes about two round trips.
+'''
+SEARCH_TYPES = ["album", "artist", "track", "playlist", "show", "episode", "audiobook"]
+MAX_SEARCH_RESULTS = 1000
+
+def search_stream(client, query:str|dict, types:list|None=None, market:str|None=None, include_external:str|None=None,
+                  top_k:int|None=None, limit:int=50, pool:RequestPool|None=None, max_workers:int=4, rate_limit:float|None=None):
+    '''
+        Yields (search_type, item) for every result of every type as the pages arrive, skipping
+        items already yielded for that type (search pages can overlap) and null items.
+
+        Parameters:
+            client: SpotifyClient or SpotifyOAuth
+            query: same as SpotifyClient.search
+            types: types from SEARCH_TYPES, defaults to all of them
+            top_k: only the first top_k results of each type are requested and yielded
+            limit: results per request, up to 50
+            pool: RequestPool to run the requests in, one is created if not given
+            max_workers, rate_limit: used to create the pool when pool is not given
+
+        Pages of a type can arrive out of order, items are yielded in the order their pages
+        arrive. Stopping the iteration cancels the requests that were not sent yet.
+    '''
+    types = list(types) if types != None else list(SEARCH_TYPES)
+    if not all(t in SEARCH_TYPES for t in types):
+        raise Exception(f"Invalid search type. Valid values are {', '.join(SEARCH_TYPES)}")
+    limit = min(max(limit, 1), 50)
+    ceiling = MAX_SEARCH_RESULTS if top_k == None else min(top_k, MAX_SEARCH_RESULTS)
+    limit = min(limit, ceiling)
+
+    owns_pool = pool == None
+    if owns_pool:
+        rate_limiter = RateLimiter(rate_limit) if rate_limit != None else None
+        pool = RequestPool(max_workers=max_workers, rate_limiter=rate_limiter)
+
+    def request(search_type, offset):
+        # the last page is cut short so offset + limit stays within the ceiling
+        page_limit = min(limit, ceiling - offset)
+        return pool.submit(client.search, query, search_type=search_type, market=market, limit=page_limit,
+                           offset=offset, include_external=include_external)
+
+    pending = {request(t, 0): (t, 0) for t in types}
+    seen = {t: set() for t in types}
+    try:
+        while pending:
+            done, _ = wait(list(pending), return_when=FIRST_COMPLETED)
+            for future in done:
+                search_type, offset = pending.pop(future)
+                page = get_paging_object(future.result(), f"{search_type}s")
+                if offset == 0:
+                    total = min(page.get("total") or 0, ceiling)
+                    for next_offset in range(limit, total, limit):
+                        pending[request(search_type, next_offset)] = (search_type, next_offset)
+                for rank, item in enumerate(page.get("items") or [], offset):
+                    if item == None or rank >= ceiling:
+                        continue
+                    key = item.get("id") or item.get("uri")
+                    if key in seen[search_type]:
+                        continue
+                    seen[search_type].add(key)
+                    yield search_type, item
+    finally:
+        for future in pending:
+            future.cancel()
+        if owns_pool:
+            pool.shutdown(wait=False)
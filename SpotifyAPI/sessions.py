@@ -0,0 +1,213 @@
+
+__all__ = ["UserSession", "SessionManager"]
+
+import datetime
+import threading
+import time
+import requests
+import weakref
+from collections import OrderedDict
+from .oauth import SpotifyOAuth, SpotifyPKCE
+
+'''
+Multi-user sessions
+
+A SessionManager holds the client credentials and one requests.Session for every user.
+Each user only costs a UserSession record while active, and a tuple in the store
+otherwise. Clients for a user are created on demand with manager.client(user_id) and
+can be thrown away after use.
+'''
+class UserSession(object):
+    __slots__ = ["user_id", "access_token", "refresh_token", "expires", "scopes", "lock", "__weakref__"]
+
+    def __init__(self, user_id:str, access_token:str|None, refresh_token:str|None, expires:float, scopes:tuple|None):
+        self.user_id = user_id
+        self.access_token = access_token
+        self.refresh_token = refresh_token
+        # unix timestamp
+        self.expires = expires
+        self.scopes = scopes
+        self.lock = threading.Lock()
+
+    def to_record(self):
+        scopes = " ".join(self.scopes) if self.scopes != None else None
+        return (self.access_token, self.refresh_token, self.expires, scopes)
+
+    @classmethod
+    def from_record(cls, user_id:str, record:tuple):
+        access_token, refresh_token, expires, scopes = record
+        scopes = tuple(scopes.split()) if scopes != None else None
+        return cls(user_id, access_token, refresh_token, expires, scopes)
+
+class SessionClient(SpotifyOAuth):
+    '''
+    SpotifyOAuth that gets its tokens from a SessionManager instead of keeping them
+    '''
+    def __init__(self, manager, user_id:str):
+        super().__init__(manager.client_id, manager.client_secret, manager.redirect_uri)
+        self.manager = manager
+        self.user_id = user_id
+        self.session = manager.session
+        self.token_url = manager.token_url
+        self.base_url = manager.base_url
+
+    @property
+    def scopes(self):
+        scopes = self.manager.get_user_session(self.user_id).scopes
+        return list(scopes) if scopes != None else None
+
+    @scopes.setter
+    def scopes(self, scopes):
+        # set by validate_scopes, the manager keeps the scopes
+        return
+
+    def get_access_token(self):
+        return self.manager.get_access_token(self.user_id)
+
+    def refresh_access_token(self):
+        self.manager.refresh(self.user_id)
+
+class SessionManager(object):
+    '''
+    Parameters:
+        client_id, client_secret, redirect_uri: app settings shared by every user
+        store: where the token state of each user is kept, anything with get() and item
+            assignment (ex. a dict, shelve.open(...) or a redis wrapper). Records are tuples of
+            (access_token, refresh_token, expires, scopes). Defaults to a dict.
+        max_sessions: number of active sessions kept in memory, the least recently used
+            session is evicted past it
+        session: requests.Session shared by every user, one is created if not given
+        pkce: refresh the tokens the way SpotifyPKCE does (no client secret)
+
+    Tokens are refreshed lazily when a client needs one, and only once per user even if
+    several threads ask at the same time.
+    '''
+    refresh_margin = 60
+
+    def __init__(self, client_id:str, client_secret:str|None, redirect_uri:str|None=None, store=None,
+                 max_sessions:int=10000, session=None, pkce:bool=False):
+        self.client_id = client_id
+        self.client_secret = client_secret
+        self.redirect_uri = redirect_uri
+        self.store = store if store != None else {}
+        self.max_sessions = max_sessions
+        self.session = session if session != None else requests.Session()
+        self.pkce = pkce
+        # only used to build the token headers, never holds a user's tokens
+        auth_class = SpotifyPKCE if pkce else SpotifyOAuth
+        self.config = auth_class(client_id, client_secret, redirect_uri)
+        self.token_url = self.config.token_url
+        self.base_url = self.config.base_url
+        self.sessions = OrderedDict()
+        # evicted sessions that are still in use (ex. by a thread refreshing the token), so
+        # a reload returns the same object and its lock instead of a second one
+        self.evicted = weakref.WeakValueDictionary()
+        self.lock = threading.Lock()
+
+    def __len__(self):
+        with self.lock:
+            return len(self.sessions)
+
+    def add_user(self, user_id:str, access_token:str|None, refresh_token:str, expires_in:float=0, scopes:list|None=None):
+        expires = time.time() + expires_in
+        scopes = tuple(scopes) if scopes != None else None
+        user_session = UserSession(user_id, access_token, refresh_token, expires, scopes)
+        self.store[user_id] = user_session.to_record()
+        with self.lock:
+            self.evicted.pop(user_id, None)
+            self.sessions[user_id] = user_session
+            self.sessions.move_to_end(user_id)
+            self.evict()
+        return user_session
+
+    def add_user_from_auth(self, user_id:str, auth:SpotifyOAuth):
+        '''
+            Takes over the tokens of an authorized client, ex. from AuthCallbackServer
+        '''
+        if auth.refresh_token == None:
+            raise Exception("The client is missing a refresh token, exchange the authorization code first.")
+        expires_in = 0
+        if auth.access_token_expires != None:
+            expires_in = (auth.access_token_expires - datetime.datetime.now()).total_seconds()
+        return self.add_user(user_id, auth.access_token, auth.refresh_token, expires_in, auth.scopes)
+
+    def remove_user(self, user_id:str):
+        with self.lock:
+            self.sessions.pop(user_id, None)
+            self.evicted.pop(user_id, None)
+        if user_id in self.store:
+            del self.store[user_id]
+
+    def get_user_session(self, user_id:str):
+        with self.lock:
+            user_session = self.sessions.get(user_id)
+            if user_session == None:
+                user_session = self.evicted.pop(user_id, None)
+                if user_session != None:
+                    self.sessions[user_id] = user_session
+                    self.evict()
+            if user_session != None:
+                self.sessions.move_to_end(user_id)
+                return user_session
+
+        record = self.store.get(user_id)
+        if record == None:
+            raise Exception(f"Unknown user {user_id}, add the user with add_user first.")
+        with self.lock:
+            # another thread may have loaded it while the store was read
+            user_session = self.sessions.get(user_id)
+            if user_session == None:
+                user_session = UserSession.from_record(user_id, record)
+                self.sessions[user_id] = user_session
+                self.evict()
+            self.sessions.move_to_end(user_id)
+        return user_session
+
+    def evict(self):
+        # the store always has the latest tokens, so evicted sessions are just dropped
+        while len(self.sessions) > self.max_sessions:
+            user_id, user_session = self.sessions.popitem(last=False)
+            self.evicted[user_id] = user_session
+
+    def client(self, user_id:str):
+        '''
+            Returns a SpotifyOAuth for the user that shares this manager's session and tokens
+        '''
+        self.get_user_session(user_id)
+        return SessionClient(self, user_id)
+
+    def get_access_token(self, user_id:str):
+        user_session = self.get_user_session(user_id)
+        if user_session.access_token != None and user_session.expires - self.refresh_margin > time.time():
+            return user_session.access_token
+        with user_session.lock:
+            # whoever got the lock first already refreshed it
+            if user_session.access_token != None and user_session.expires - self.refresh_margin > time.time():
+                return user_session.access_token
+            self.refresh_session(user_session)
+            return user_session.access_token
+
+    def refresh(self, user_id:str):
+        user_session = self.get_user_session(user_id)
+        with user_session.lock:
+            self.refresh_session(user_session)
+
+    def refresh_session(self, user_session:UserSession):
+        data = {"grant_type": "refresh_token", "refresh_token": user_session.refresh_token}
+        if self.pkce:
+            data["client_id"] = self.client_id
+        headers = self.config.get_token_headers()
+
+        response = self.session.post(self.token_url, data=data, headers=headers)
+        token = response.json()
+        if response.status_code not in range(200, 299):
+            raise Exception(f"Could not refresh the access token of {user_session.user_id}. Error: {token}")
+
+        user_session.access_token = token["access_token"]
+        user_session.expires = time.time() + token["expires_in"]
+        # Spotify may or may not send a new refresh token
+        if "refresh_token" in token:
+            user_session.refresh_token = token["refresh_token"]
+        if "scope" in token:
+            user_session.scopes = tuple(token["scope"].split())
+        self.store[user_session.user_id] = user_session.to_record()
@@ -0,0 +1,124 @@
+
+__all__ = ["IncrementalSync"]
+
+import datetime
+from .checkpoint import JSONCheckpoint
+from .concurrency import RequestPool
+from .endpoints import ENDPOINTS
+from .pagination import get_paging_object, iterate_pages
+
+'''
+Incremental sync for cursor based endpoints
+
+The last cursor of each user and endpoint is saved in a JSONCheckpoint, so each sync
+only requests what was added since the previous one.
+
+Reference: https://developer.spotify.com/documentation/web-api/reference/get-recently-played
+'''
+class IncrementalSync(object):
+    max_limit = 50
+
+    def __init__(self, auth, store:str|JSONCheckpoint, user_id:str|None=None, pool:RequestPool|None=None):
+        '''
+            Parameters:
+                auth: SpotifyOAuth or SpotifyPKCE of the user
+                store: path or JSONCheckpoint where the cursors are kept, can be shared between users
+                user_id: key used for the user in the store. If not given the id from
+                    get_current_users_profile is used
+                pool: RequestPool, used so the requests go through its rate limiter
+        '''
+        if isinstance(store, str):
+            store = JSONCheckpoint(store)
+        self.auth = auth
+        self.store = store
+        self.user_id = user_id
+        self.pool = pool
+
+    def call(self, fn, *args, **kwargs):
+        if self.pool != None:
+            return self.pool.call(fn, *args, **kwargs)
+        return fn(*args, **kwargs)
+
+    def get_key(self, endpoint):
+        if self.user_id == None:
+            profile = self.call(self.auth.get_current_users_profile)
+            if "id" not in profile:
+                raise Exception("Could not get the user id, pass in user_id or request the user-read-private scope.")
+            self.user_id = profile["id"]
+        return f"{self.user_id}/{endpoint}"
+
+    def get_cursor(self, endpoint:str):
+        return self.store.get(self.get_key(endpoint))
+
+    def reset(self, endpoint:str):
+        self.store.delete(self.get_key(endpoint))
+
+    def check_scopes(self, name:str):
+        # a missing scope returns {}, which would look the same as nothing new
+        scopes = ENDPOINTS[name].scopes
+        if not self.auth.has_required_scopes(scopes):
+            raise Exception(f"Could not sync, the user has not granted the scopes: {', '.join(scopes)}")
+
+    def sync_recently_played(self):
+        '''
+            Returns the plays since the last sync, oldest first.
+
+            The first sync returns the last 50 plays, which is all Spotify keeps.
+        '''
+        self.check_scopes("get_recently_played_tracks")
+        key = self.get_key("recently-played")
+        after = self.store.get(key)
+
+        plays = {}
+        while True:
+            response = self.call(self.auth.get_recently_played_tracks, limit=self.max_limit, after=after)
+            page = get_paging_object(response)
+            items = page.get("items") or []
+            for item in items:
+                plays[item["played_at"]] = item
+            if not items:
+                break
+
+            cursors = page.get("cursors") or {}
+            newest = cursors.get("after") or max(get_played_at_ms(item) for item in items)
+            newest = int(newest)
+            if after != None and newest <= after:
+                break
+            after = newest
+            # without a cursor only the most recent page is returned
+            if not page.get("next") and len(items) < self.max_limit:
+                break
+
+        if after != None:
+            self.store.set(key, after)
+        return [plays[played_at] for played_at in sorted(plays)]
+
+    def sync_followed_artists(self):
+        '''
+            Returns the followed artists after the saved cursor, following the pages to the end.
+
+            NOTE: the cursor is the id of the last artist returned, so this only picks up
+                artists Spotify lists after it. Call reset("followed-artists") to read
+                the full list again.
+        '''
+        self.check_scopes("get_followed_artists")
+        key = self.get_key("followed-artists")
+        after = self.store.get(key)
+
+        artists = []
+        pages = iterate_pages(self.auth, self.auth.get_followed_artists, page_key="artists",
+                              call=self.call, after=after, limit=self.max_limit)
+        for page in pages:
+            items = page.get("items") or []
+            artists.extend(items)
+            if items:
+                after = items[-1]["id"]
+
+        if after != None:
+            self.store.set(key, after)
+        return artists
+
+def get_played_at_ms(item):
+    # played_at is an ISO 8601 string, ex. 2016-12-13T20:44:04.589Z
+    played_at = datetime.datetime.fromisoformat(item["played_at"].replace("Z", "+00:00"))
+    return int(played_at.timestamp() * 1000)
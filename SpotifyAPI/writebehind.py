@@ -0,0 +1,179 @@
+
+__all__ = ["WriteBehindQueue"]
+
+import atexit
+import threading
+from collections import deque
+from .concurrency import RequestPool
+from .ids import to_id_list
+from .library import SAVED_ITEM_METHODS, chunk_list, get_saved_item_method
+
+class WriteBehindQueue(object):
+    '''
+    Queues save/remove (and follow/unfollow) calls for one user and sends them in batches.
+
+    Operations on the same id within a flush interval are coalesced, only the last one is
+    kept. A save followed by a remove (or the other way around) cancels out, the first
+    operation is assumed to have changed the state. If a LibraryMembership is passed in,
+    its cache is used instead: operations that would not change the cached state are
+    dropped, and the cache is updated after each batch is sent.
+
+    Pending operations are flushed every flush_interval seconds by a background thread,
+    as soon as a full batch is pending, and when close() is called or the program exits.
+
+    A batch that raises, or gets a 429 or a 5xx, is queued again, up to max_retries times.
+    Any other failure (a 4xx, or missing scopes) drops the batch. Either way the error is
+    kept in errors, which holds the last max_errors of them.
+
+    Collections: tracks, albums, episodes, shows, audiobooks, artists, users
+    '''
+    def __init__(self, auth, flush_interval:float=1.0, membership=None, pool:RequestPool|None=None, start:bool=True,
+                 max_retries:int=5, max_errors:int=100):
+        self.auth = auth
+        self.flush_interval = flush_interval
+        self.membership = membership
+        self.max_retries = max_retries
+        self.owns_pool = pool == None
+        self.pool = pool if pool != None else RequestPool(max_workers=4)
+        self.lock = threading.Lock()
+        self.flush_lock = threading.Lock()
+        self.wake = threading.Event()
+        self.closed = False
+        self.thread = None
+        self.errors = deque(maxlen=max_errors)
+        # (collection, id): times its operation failed and was queued again
+        self.retries = {}
+        # collection: {id: "save" | "remove"}
+        self.pending = {collection: {} for collection in SAVED_ITEM_METHODS}
+        if start:
+            self.start()
+
+    def start(self):
+        if self.thread != None:
+            return
+        self.thread = threading.Thread(target=self.run, name="spotify-api-write-behind", daemon=True)
+        self.thread.start()
+        atexit.register(self.close)
+
+    def run(self):
+        while not self.closed:
+            self.wake.wait(self.flush_interval)
+            self.wake.clear()
+            if not self.closed:
+                self.flush()
+
+    def save(self, collection:str, _ids:list|str):
+        self.add(collection, _ids, "save")
+
+    def remove(self, collection:str, _ids:list|str):
+        self.add(collection, _ids, "remove")
+
+    def add(self, collection:str, _ids:list|str, action:str):
+        if collection not in self.pending:
+            raise Exception(f"Invalid collection. Valid values are {', '.join(SAVED_ITEM_METHODS)}")
+        if self.closed:
+            raise Exception("The queue is closed.")
+        if isinstance(_ids, str):
+            _ids = [_ids]
+        else:
+            _ids = to_id_list(_ids)
+
+        with self.lock:
+            pending = self.pending[collection]
+            for _id in _ids:
+                # a new operation gets its own retries
+                self.retries.pop((collection, _id), None)
+                previous = pending.pop(_id, None)
+                if previous != None and previous != action and self.membership == None:
+                    # save then remove (or remove then save), nothing to send
+                    continue
+                pending[_id] = action
+            full = len(pending) >= SAVED_ITEM_METHODS[collection][3]
+        if full:
+            self.wake.set()
+
+    def __len__(self):
+        with self.lock:
+            return sum(len(pending) for pending in self.pending.values())
+
+    def flush(self):
+        '''
+            Sends every pending operation, returns the number of requests made
+        '''
+        with self.flush_lock:
+            with self.lock:
+                pending = self.pending
+                self.pending = {collection: {} for collection in SAVED_ITEM_METHODS}
+
+            batches = []
+            for collection, operations in pending.items():
+                for action in ["save", "remove"]:
+                    _ids = [_id for _id, a in operations.items() if a == action]
+                    _ids = self.drop_unchanged(collection, _ids, action == "save")
+                    for chunk in chunk_list(_ids, SAVED_ITEM_METHODS[collection][3]):
+                        method = get_saved_item_method(self.auth, collection, action)
+                        batches.append((collection, action, chunk, self.pool.submit(method, chunk)))
+
+            for collection, action, chunk, future in batches:
+                try:
+                    response = future.result()
+                except Exception as e:
+                    self.errors.append(e)
+                    self.requeue(collection, chunk, action)
+                    continue
+                if response != True:
+                    # {} when the client is missing the scopes, the error of a failed request otherwise
+                    error = response.get("error") if isinstance(response, dict) else None
+                    status = error.get("status") if isinstance(error, dict) else None
+                    self.errors.append(Exception(f"Could not {action} {collection}. Error: {error or 'missing scopes'}"))
+                    if status == 429 or (isinstance(status, int) and status >= 500):
+                        self.requeue(collection, chunk, action)
+                    else:
+                        self.forget(collection, chunk)
+                    continue
+                self.forget(collection, chunk)
+                if self.membership != None:
+                    self.membership.update(collection, chunk, action == "save")
+            return len(batches)
+
+    def drop_unchanged(self, collection, _ids, saved):
+        if self.membership == None:
+            return _ids
+        bitmap = self.membership.get_bitmap(collection)
+        return [_id for _id in _ids if bitmap.get(_id) != saved]
+
+    def requeue(self, collection, _ids, action):
+        # a newer operation on the same id wins over the one that failed
+        with self.lock:
+            pending = self.pending[collection]
+            for _id in _ids:
+                retries = self.retries.get((collection, _id), 0)
+                if retries >= self.max_retries:
+                    self.retries.pop((collection, _id), None)
+                    continue
+                if _id not in pending:
+                    pending[_id] = action
+                    self.retries[(collection, _id)] = retries + 1
+
+    def forget(self, collection, _ids):
+        with self.lock:
+            for _id in _ids:
+                self.retries.pop((collection, _id), None)
+
+    def close(self):
+        if self.closed:
+            return
+        self.closed = True
+        self.wake.set()
+        if self.thread != None:
+            self.thread.join()
+            atexit.unregister(self.close)
+        self.flush()
+        if self.owns_pool:
+            self.pool.shutdown()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
@@ -0,0 +1,96 @@
+'''
+Offline benchmarks of the client side overhead, using ReplayTransport and the fixtures
+from benchmarks.fixtures. Nothing goes over the network.
+
+    python -m benchmarks.bench_client [--number 2000] [--latency 0.02]
+
+--latency is added to every replayed request, use it to see how the concurrent helpers
+(membership checks, library export) overlap requests. Per-call overhead is the time of a
+call minus the time of the same request made directly on the transport.
+'''
+import argparse
+import tempfile
+import time
+from SpotifyAPI import SpotifyClient, SpotifyOAuth, SpotifyPKCE, LibraryMembership, iterate_items
+from SpotifyAPI.endpoints import ENDPOINTS
+from SpotifyAPI.replay import ReplayTransport
+from benchmarks.fixtures import BASE_URL, build_fixtures
+
+def bench(fn, number):
+    fn()
+    start = time.perf_counter()
+    for i in range(number):
+        fn()
+    return (time.perf_counter() - start) / number
+
+def make_clients(directory, latency):
+    transport = ReplayTransport(directory, latency=latency)
+    client = SpotifyClient("clid", "clst")
+    client.session = transport
+    auth = SpotifyOAuth("clid", "clst", "https://localhost/callback")
+    auth.session = transport
+    auth.scopes = list(SpotifyOAuth.available_scopes)
+    return transport, client, auth
+
+def run(number:int=2000, latency:float=0.0):
+    '''
+        Returns a list of (name, seconds per call, overhead per call or None)
+    '''
+    results = []
+    with tempfile.TemporaryDirectory() as directory:
+        ids = build_fixtures(directory)
+        transport, client, auth = make_clients(directory, 0.0)
+        album_url = f"{BASE_URL}/v1/albums/{ids['album_id']}"
+
+        raw = bench(lambda: transport.get(album_url, headers={}).json(), number)
+        results.append(("transport.get + json (baseline)", raw, None))
+        results.append(("create_query", bench(lambda: client.create_query(market="US", limit=50, offset=100), number), None))
+        results.append(("build_endpoint", bench(lambda: client.build_endpoint(ids["album_id"], "albums", "v1", "market=US"), number), None))
+        def old_url():
+            query = client.create_query(market="US", limit=50, offset=100)
+            return client.build_endpoint(f"{ids['album_id']}/tracks", "albums", "v1", query)
+        results.append(("create_query + build_endpoint", bench(old_url, number), None))
+        template = ENDPOINTS["get_album_tracks"]
+        results.append(("EndpointTemplate.url", bench(lambda: template.url(BASE_URL, ids["album_id"], market="US", limit=50, offset=100), number), None))
+
+        seconds = bench(lambda: client.get_album(ids["album_id"]), number)
+        results.append(("get_album", seconds, seconds - raw))
+        raw_search = bench(lambda: transport.get(f"{BASE_URL}/v1/search?q=Doxy&type=track", headers={}).json(), number)
+        seconds = bench(lambda: client.search({"track": "Doxy", "artist": "Miles Davis"}, search_type="track"), number)
+        results.append(("search", seconds, seconds - raw_search))
+
+        pages = max(1, number // 100)
+        seconds = bench(lambda: sum(1 for item in iterate_items(auth, auth.get_saved_tracks, limit=50)), pages)
+        results.append(("iterate_items, 500 saved tracks", seconds, None))
+
+        seconds = bench(lambda: client.request_access_token(client.get_token_data()), number)
+        results.append(("client credentials token", seconds, None))
+        pkce = SpotifyPKCE("clid", None, "https://localhost/callback")
+        results.append(("PKCE get_authorize_url", bench(lambda: pkce.get_authorize_url(["user-top-read"]), number), None))
+        def exchange():
+            auth.set_code("fake_code")
+            auth.exchange_code()
+        results.append(("set_code + exchange_code", bench(exchange, number), None))
+
+        # the concurrent helpers use their own transport so latency applies
+        transport, client, auth = make_clients(directory, latency)
+        def check():
+            membership = LibraryMembership(auth, max_workers=8)
+            membership.check("tracks", ids["track_ids"])
+            membership.close()
+        results.append(("membership check, 1000 ids", bench(check, max(1, number // 200)), None))
+    return results
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--number", type=int, default=2000, help="calls per benchmark")
+    parser.add_argument("--latency", type=float, default=0.0, help="seconds added to each request of the concurrent benchmarks")
+    args = parser.parse_args()
+
+    print(f"{'benchmark':<36}{'us/call':>12}{'calls/s':>12}{'overhead us':>14}")
+    for name, seconds, overhead in run(args.number, args.latency):
+        overhead = f"{overhead * 1e6:.1f}" if overhead != None else "-"
+        print(f"{name:<36}{seconds * 1e6:>12.1f}{1 / seconds:>12.0f}{overhead:>14}")
+
+if __name__ == "__main__":
+    main()
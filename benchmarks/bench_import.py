@@ -0,0 +1,68 @@
+'''
+Cold start cost of the package, each statement is run in a new interpreter.
+
+    python -m benchmarks.bench_import [--repeat 10] [--max-ms 150]
+
+Prints the median wall time of every statement against a bare interpreter, and the heavy
+modules it loaded. With --max-ms the exit code is 1 when the overhead of any statement
+goes over the budget, so it can guard startup latency in CI.
+'''
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+import time
+
+STATEMENTS = [
+    "pass",
+    "import SpotifyAPI",
+    "from SpotifyAPI import SpotifyClient",
+    "from SpotifyAPI import SpotifyOAuth",
+    "from SpotifyAPI import SessionManager",
+]
+# modules that should only be loaded by the code that needs them
+HEAVY_MODULES = ["requests", "PIL", "asyncio", "http.server", "numpy", "sqlite3"]
+
+def loaded_modules(statement:str):
+    code = f"{statement}\nimport sys, json\nprint(json.dumps([m for m in {HEAVY_MODULES!r} if m in sys.modules]))"
+    output = subprocess.run([sys.executable, "-c", code], check=True, capture_output=True, text=True).stdout
+    return json.loads(output)
+
+def time_statement(statement:str, repeat:int):
+    times = []
+    for i in range(repeat):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, "-c", statement], check=True)
+        times.append(time.perf_counter() - start)
+    return statistics.median(times)
+
+def run(repeat:int=10):
+    '''
+        Returns a list of (statement, median seconds, overhead over a bare interpreter, heavy modules loaded)
+    '''
+    results = []
+    baseline = None
+    for statement in STATEMENTS:
+        seconds = time_statement(statement, repeat)
+        if baseline == None:
+            baseline = seconds
+        results.append((statement, seconds, seconds - baseline, loaded_modules(statement)))
+    return results
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=10, help="interpreters started per statement")
+    parser.add_argument("--max-ms", type=float, default=None, help="fail when a statement adds more than this")
+    args = parser.parse_args()
+
+    failed = False
+    print(f"{'statement':<40}{'ms':>8}{'overhead ms':>14}  heavy modules")
+    for statement, seconds, overhead, modules in run(args.repeat):
+        print(f"{statement:<40}{seconds * 1e3:>8.1f}{overhead * 1e3:>14.1f}  {', '.join(modules) or '-'}")
+        if args.max_ms != None and overhead * 1e3 > args.max_ms:
+            failed = True
+    sys.exit(1 if failed else 0)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+'''
+End to end benchmarks against the local mock server (SpotifyAPI.mockserver), over real
+HTTP on localhost. Use these for the concurrent features, where request latency matters.
+
+    python -m benchmarks.bench_mockserver [--latency 0.02] [--rate-limit 1000] [--workers 1 4 16]
+'''
+import argparse
+import io
+import time
+import requests
+from SpotifyAPI import SpotifyClient, SpotifyOAuth, MockSpotifyServer, RequestPool, SyntheticCatalog, export_library
+
+def timed(fn):
+    start = time.perf_counter()
+    count = fn()
+    return count, time.perf_counter() - start
+
+def run(latency:float=0.02, rate_limit:float|None=None, workers:tuple=(1, 4, 16), requests_per_run:int=200):
+    '''
+        Returns a list of (name, workers, requests or items, seconds)
+    '''
+    catalog = SyntheticCatalog(saved_tracks=1000, saved_albums=200, followed_artists=100)
+    server = MockSpotifyServer(catalog, latency=latency, rate_limit=rate_limit).start_in_thread()
+    results = []
+    try:
+        client = server.configure(SpotifyClient("clid", "clst"))
+        client.session = requests.Session()
+        auth = server.configure(SpotifyOAuth("clid", "clst", "http://127.0.0.1/callback"))
+        auth.session = requests.Session()
+        auth.validate_scopes(SpotifyOAuth.available_scopes)
+        auth.set_code("mock-code")
+
+        track_ids = catalog.track_ids[:requests_per_run]
+        for max_workers in workers:
+            def get_tracks():
+                with RequestPool(max_workers=max_workers) as pool:
+                    return sum(1 for future in [pool.submit(client.get_track, _id) for _id in track_ids] if future.result())
+            count, seconds = timed(get_tracks)
+            results.append(("get_track", max_workers, count, seconds))
+
+            def export():
+                counts = export_library(auth, io.StringIO(), max_workers=max_workers)
+                return sum(counts.values())
+            count, seconds = timed(export)
+            results.append(("export_library", max_workers, count, seconds))
+    finally:
+        server.stop_thread()
+    return results
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--latency", type=float, default=0.02, help="seconds the server waits before each response")
+    parser.add_argument("--rate-limit", type=float, default=None, help="requests per second before the server sends 429s")
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 4, 16])
+    args = parser.parse_args()
+
+    print(f"{'benchmark':<20}{'workers':>8}{'items':>8}{'seconds':>10}{'items/s':>10}")
+    for name, max_workers, count, seconds in run(args.latency, args.rate_limit, tuple(args.workers)):
+        print(f"{name:<20}{max_workers:>8}{count:>8}{seconds:>10.2f}{count / seconds:>10.0f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,119 @@
+'''
+Builds a fixtures directory for ReplayTransport with responses shaped and sized like the
+real ones: full album objects with 180 markets, saved track pages with nested albums and
+artists, search results and /contains responses.
+
+    python -m benchmarks.fixtures <directory>
+'''
+import json
+import os
+import random
+import sys
+from SpotifyAPI.mockserver import MARKETS
+from SpotifyAPI.replay import get_fixture_name
+
+BASE_URL = "https://api.spotify.com"
+BASE62 = "0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz"
+
+class FixtureBuilder(object):
+    def __init__(self, directory, seed=0):
+        self.directory = directory
+        self.random = random.Random(seed)
+        os.makedirs(directory, exist_ok=True)
+
+    def new_id(self):
+        return "".join(self.random.choice(BASE62) for i in range(22))
+
+    def write(self, method, url, body):
+        with open(os.path.join(self.directory, get_fixture_name(method, url)), "w", encoding="utf-8") as f:
+            json.dump(body, f)
+
+    def images(self, _id):
+        return [{"url": f"https://i.scdn.co/image/ab67616d0000b273{_id}{size}", "height": size, "width": size}
+                for size in (640, 300, 64)]
+
+    def artist(self):
+        _id = self.new_id()
+        return {"external_urls": {"spotify": f"https://open.spotify.com/artist/{_id}"},
+                "href": f"{BASE_URL}/v1/artists/{_id}", "id": _id, "name": f"Artist {_id[:6]}",
+                "type": "artist", "uri": f"spotify:artist:{_id}"}
+
+    def simplified_album(self, artists):
+        _id = self.new_id()
+        return {"album_type": "album", "total_tracks": 12, "available_markets": list(MARKETS),
+                "external_urls": {"spotify": f"https://open.spotify.com/album/{_id}"},
+                "href": f"{BASE_URL}/v1/albums/{_id}", "id": _id, "images": self.images(_id),
+                "name": f"Album {_id[:6]}", "release_date": "1999-06-01", "release_date_precision": "day",
+                "type": "album", "uri": f"spotify:album:{_id}", "artists": artists}
+
+    def track(self, album=None, artists=None, simplified=False):
+        _id = self.new_id()
+        artists = artists if artists != None else [self.artist()]
+        track = {"artists": artists, "available_markets": list(MARKETS), "disc_number": 1,
+                 "duration_ms": self.random.randint(120000, 420000), "explicit": False,
+                 "external_urls": {"spotify": f"https://open.spotify.com/track/{_id}"},
+                 "href": f"{BASE_URL}/v1/tracks/{_id}", "id": _id, "is_local": False,
+                 "name": f"Track {_id[:6]}", "preview_url": f"https://p.scdn.co/mp3-preview/{_id}",
+                 "track_number": self.random.randint(1, 12), "type": "track", "uri": f"spotify:track:{_id}"}
+        if not simplified:
+            track["album"] = album if album != None else self.simplified_album(artists)
+            track["external_ids"] = {"isrc": f"US{self.random.randint(10**9, 10**10 - 1)}"}
+            track["popularity"] = self.random.randint(0, 100)
+        return track
+
+    def paging(self, url, items, limit, offset, total):
+        next_url = f"{url}?offset={offset + limit}&limit={limit}" if offset + limit < total else None
+        previous_url = f"{url}?offset={max(0, offset - limit)}&limit={limit}" if offset > 0 else None
+        return {"href": f"{url}?offset={offset}&limit={limit}", "items": items, "limit": limit,
+                "next": next_url, "offset": offset, "previous": previous_url, "total": total}
+
+    def album(self):
+        artists = [self.artist()]
+        album = self.simplified_album(artists)
+        url = f"{album['href']}/tracks"
+        tracks = [self.track(artists=artists, simplified=True) for i in range(20)]
+        album.update({"tracks": self.paging(url, tracks, 50, 0, 20), "copyrights": [{"text": "(C) 1999", "type": "C"}],
+                      "external_ids": {"upc": str(self.random.randint(10**11, 10**12 - 1))},
+                      "genres": [], "label": "Label", "popularity": 50})
+        return album
+
+    def saved_tracks(self, pages=10, limit=50):
+        # a few albums repeat across the library, like a real one
+        albums = [self.simplified_album([self.artist()]) for i in range(40)]
+        url = f"{BASE_URL}/v1/me/tracks"
+        total = pages * limit
+        for page in range(pages):
+            offset = page * limit
+            items = []
+            for i in range(limit):
+                album = self.random.choice(albums)
+                track = self.track(album=album, artists=album["artists"])
+                items.append({"added_at": "2023-06-25T10:00:00Z", "track": track})
+            body = self.paging(url, items, limit, offset, total)
+            page_url = f"{url}?limit={limit}" if page == 0 else f"{url}?offset={offset}&limit={limit}"
+            self.write("GET", page_url, body)
+
+    def build(self):
+        album = self.album()
+        self.write("GET", f"{BASE_URL}/v1/albums/{album['id']}", album)
+        self.write("GET", f"{BASE_URL}/v1/markets", {"markets": MARKETS})
+
+        tracks = [self.track() for i in range(20)]
+        search = {"tracks": self.paging(f"{BASE_URL}/v1/search", tracks, 20, 0, 1000)}
+        self.write("GET", f"{BASE_URL}/v1/search", search)
+
+        self.saved_tracks()
+        self.write("GET", f"{BASE_URL}/v1/me/tracks/contains", [self.random.random() < 0.3 for i in range(50)])
+        return {"album_id": album["id"], "track_ids": [self.new_id() for i in range(1000)]}
+
+def build_fixtures(directory, seed=0):
+    '''
+        Writes the fixtures to directory, returns ids the benchmarks can request
+    '''
+    return FixtureBuilder(directory, seed).build()
+
+if __name__ == "__main__":
+    if len(sys.argv) != 2:
+        print("usage: python -m benchmarks.fixtures <directory>")
+        sys.exit(1)
+    build_fixtures(sys.argv[1])
@@ -0,0 +1,89 @@
+import asyncio
+import threading
+import unittest
+import urllib.error
+import urllib.request
+from SpotifyAPI import SpotifyOAuth, SpotifyPKCE, AuthCallbackServer, AsyncAuthCallbackServer
+from unittest.mock import patch, MagicMock
+from urllib.parse import urlparse, parse_qs
+
+POST_DICT = {"expires_in": 3600, "access_token": "access_token", "refresh_token": "refresh_token"}
+
+def make_mock_response(status_code, return_value):
+    mock_response = MagicMock(status_code=status_code)
+    mock_response.json.return_value = return_value
+    return mock_response
+
+def get_state(url):
+    return parse_qs(urlparse(url).query)["state"][0]
+
+def redirect(url):
+    try:
+        with urllib.request.urlopen(url) as response:
+            return response.status
+    except urllib.error.HTTPError as e:
+        return e.code
+
+class TestCallbackServer(unittest.TestCase):
+    @patch('SpotifyAPI.client.requests.post', MagicMock(return_value=make_mock_response(200, POST_DICT)))
+    @patch('SpotifyAPI.client.requests.get')
+    def test_concurrent_flows(self, mock_get):
+        with AuthCallbackServer(port=0) as server:
+            auths = [SpotifyOAuth("clid", "clst", server.redirect_uri) for i in range(3)]
+            flows = [server.authorize(auth, scopes=["user-top-read"]) for auth in auths]
+            self.assertEqual(server.pending(), 3)
+            self.assertEqual(len(set(flow.state for flow in flows)), 3)
+
+            for i, flow in reversed(list(enumerate(flows))):
+                status = redirect(f"{server.redirect_uri}?code=code{i}&state={get_state(flow.url)}")
+                self.assertEqual(status, 200)
+
+            for i, flow in enumerate(flows):
+                auth = flow.wait(timeout=5)
+                self.assertEqual(auth.code, f"code{i}")
+                self.assertEqual(auth.access_token, "access_token")
+                self.assertEqual(auth.refresh_token, "refresh_token")
+            self.assertEqual(server.pending(), 0)
+
+            # an unknown state is rejected and a redirect with an error fails the flow
+            self.assertEqual(redirect(f"{server.redirect_uri}?code=code&state=fake_state"), 404)
+            flow = server.authorize(SpotifyPKCE("clid", None, server.redirect_uri))
+            self.assertTrue("code_challenge=" in flow.url)
+            self.assertEqual(redirect(f"{server.redirect_uri}?error=access_denied&state={flow.state}"), 400)
+            with self.assertRaises(Exception) as context:
+                flow.wait(timeout=5)
+            self.assertTrue("access_denied" in str(context.exception))
+
+            # an abandoned flow is removed once its wait times out
+            flow = server.authorize(SpotifyOAuth("clid", "clst", server.redirect_uri))
+            with self.assertRaises(Exception):
+                flow.wait(timeout=0.01)
+            self.assertEqual(server.pending(), 0)
+        mock_get.assert_not_called()
+
+    @patch('SpotifyAPI.client.requests.post', MagicMock(return_value=make_mock_response(200, POST_DICT)))
+    def test_async_server(self):
+        async def run():
+            async with AsyncAuthCallbackServer(port=0) as server:
+                auth = SpotifyOAuth("clid", "clst", server.redirect_uri)
+                flow = server.authorize(auth, scopes=["user-top-read"])
+                url = f"{server.redirect_uri}?code=fake_code&state={flow.state}"
+                status = await asyncio.get_running_loop().run_in_executor(None, redirect, url)
+                self.assertEqual(status, 200)
+                auth = await flow.wait(timeout=5)
+                self.assertEqual(auth.code, "fake_code")
+                self.assertEqual(auth.access_token, "access_token")
+
+                flow = server.authorize(auth)
+                with self.assertRaises(Exception):
+                    await flow.wait(timeout=0.01)
+                self.assertEqual(server.pending(), 0)
+
+                # cancelled from another thread, the wait wakes up on its own loop
+                flow = server.authorize(auth)
+                loop = asyncio.get_running_loop()
+                loop.call_later(0.05, lambda: threading.Thread(target=server.cancel, args=(flow.state,)).start())
+                with self.assertRaises(Exception) as context:
+                    await flow.wait(timeout=5)
+                self.assertTrue("cancelled" in str(context.exception))
+        asyncio.run(run())
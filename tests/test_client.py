@@ -1,5 +1,5 @@
 import unittest
-from SpotifyAPI import SpotifyClient
+from SpotifyAPI import SpotifyClient, ReplayResponse
 from unittest.mock import patch, MagicMock
 
 def make_mock_get_response(status_code, return_value):
@@ -103,4 +103,16 @@ class TestClient(unittest.TestCase):
         self.assertTrue("track%2Calbum" not in response)
         self.assertTrue(str(self.client.max_limit) in response)
         self.assertTrue(str(55) not in response)
-        self.assertTrue("offset=" + str(self.client.min_offset) in response)
\ No newline at end of file
+        self.assertTrue("offset=" + str(self.client.min_offset) in response)
+
+    def test_send_result(self):
+        client = SpotifyClient("clid", "clst")
+        client.get_access_headers = MagicMock(return_value={})
+        client.session = MagicMock()
+        url = "https://api.spotify.com/v1/me/tracks?ids=1"
+        client.session.put.return_value = ReplayResponse(200, b"", url)
+        self.assertEqual(client.send_request("PUT", url), True)
+        client.session.put.return_value = ReplayResponse(403, b'{"error": {"status": 403, "message": "Forbidden"}}', url)
+        self.assertEqual(client.send_request("PUT", url), {"error": {"status": 403, "message": "Forbidden"}})
+        client.session.delete.return_value = ReplayResponse(502, b"<html></html>", url)
+        self.assertEqual(client.send_request("DELETE", url)["error"]["status"], 502)
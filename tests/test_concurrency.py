@@ -0,0 +1,187 @@
+import asyncio
+import io
+import requests
+import threading
+import time
+import unittest
+from SpotifyAPI import SpotifyClient, SyntheticCatalog, MockSpotifyServer, AdaptiveConcurrencyLimiter, RequestPool, \
+    ReplayResponse, HedgePolicy, Base64Stream, call_deadline
+from unittest.mock import MagicMock, patch
+
+class TestAdaptiveConcurrencyLimiter(unittest.TestCase):
+    def test_additive_increase(self):
+        limiter = AdaptiveConcurrencyLimiter(initial_limit=2, max_limit=5)
+        for i in range(100):
+            limiter.acquire()
+            limiter.release(0.1, 200)
+        self.assertEqual(limiter.current_limit, 5)
+        self.assertEqual(limiter.get_stats()["in_flight"], 0)
+
+    def test_multiplicative_decrease(self):
+        limiter = AdaptiveConcurrencyLimiter(initial_limit=16)
+        with patch("SpotifyAPI.concurrency.time.monotonic", return_value=1000.0):
+            limiter.acquire()
+            limiter.release(0.1, 200)
+            # a burst of 429s only cuts the limit once
+            for status in [429, 429, 503]:
+                limiter.acquire()
+                limiter.release(0.1, status)
+        self.assertEqual(limiter.current_limit, 8)
+        with patch("SpotifyAPI.concurrency.time.monotonic", return_value=1001.0):
+            limiter.acquire()
+            limiter.release(0.1, None)
+        self.assertEqual(limiter.current_limit, 4)
+        self.assertEqual(limiter.get_stats()["failures"], 4)
+
+    def test_latency_spike(self):
+        limiter = AdaptiveConcurrencyLimiter(initial_limit=16, smoothing=1.0)
+        limiter.acquire()
+        limiter.release(0.1, 200)
+        limiter.acquire()
+        limiter.release(0.5, 200)
+        self.assertEqual(limiter.current_limit, 8)
+
+    def test_acquire_blocks(self):
+        limiter = AdaptiveConcurrencyLimiter(initial_limit=1, max_limit=1)
+        limiter.acquire()
+        acquired = threading.Event()
+        thread = threading.Thread(target=lambda: (limiter.acquire(), acquired.set()))
+        thread.start()
+        self.assertFalse(acquired.wait(0.05))
+        limiter.release(0.1, 200)
+        self.assertTrue(acquired.wait(1))
+        thread.join()
+
+    def test_acquire_timeout(self):
+        limiter = AdaptiveConcurrencyLimiter(initial_limit=1, max_limit=1)
+        limiter.acquire()
+        with self.assertRaises(TimeoutError):
+            limiter.acquire(0.05)
+        limiter.cancel()
+        limiter.acquire(0.05)
+        self.assertEqual(limiter.get_stats()["in_flight"], 1)
+
+    def test_client(self):
+        catalog = SyntheticCatalog(artists=10, albums_per_artist=2, tracks_per_album=20, playlists=1)
+        server = MockSpotifyServer(catalog, rate_limit=50).start_in_thread()
+        try:
+            client = server.configure(SpotifyClient("clid", "clst"))
+            client.concurrency_limiter = AdaptiveConcurrencyLimiter(initial_limit=16, max_limit=16)
+            with RequestPool(max_workers=16) as pool:
+                responses = [pool.submit(client.get_track, track_id) for track_id in list(catalog.tracks)[:200]]
+                responses = [future.result() for future in responses]
+            self.assertTrue(any("error" in response for response in responses))
+            stats = client.concurrency_limiter.get_stats()
+            self.assertTrue(stats["failures"] > 0)
+            self.assertTrue(stats["decreases"] > 0)
+            self.assertEqual(stats["in_flight"], 0)
+        finally:
+            server.stop_thread()
+
+class TestDeadlinesAndRetries(unittest.TestCase):
+    def setUp(self):
+        self.client = SpotifyClient("clid", "clst")
+        self.client.get_access_headers = MagicMock(return_value={})
+        self.client.session = MagicMock()
+
+    def get_response(self, status_code:int, content:bytes=b'{"id": "1"}', headers:dict|None=None):
+        return ReplayResponse(status_code, content, "https://api.spotify.com/v1/tracks/1", headers)
+
+    def test_retries(self):
+        self.client.max_retries = 2
+        self.client.session.get.side_effect = [self.get_response(429, b"{}", {"Retry-After": "0"}),
+                                               self.get_response(503, b"{}"), self.get_response(200)]
+        self.client.retry_backoff = 0
+        self.assertEqual(self.client.get_track("1"), {"id": "1"})
+        self.assertEqual(self.client.session.get.call_count, 3)
+
+    def test_no_retry_of_post_5xx(self):
+        self.client.max_retries = 2
+        self.client.session.post.return_value = self.get_response(503, b"{}")
+        self.client.send_request("POST", "https://api.spotify.com/v1/me/player/next")
+        self.assertEqual(self.client.session.post.call_count, 1)
+
+    def test_deadline(self):
+        self.client.max_retries = 5
+        self.client.deadline = 0.5
+        self.client.session.get.return_value = self.get_response(429, b"{}", {"Retry-After": "10"})
+        self.client.get_track("1")
+        # the retry would start after the deadline
+        self.assertEqual(self.client.session.get.call_count, 1)
+        self.assertTrue(0 < self.client.session.get.call_args.kwargs["timeout"] <= 0.5)
+
+    def test_call_deadline(self):
+        self.client.session.get.return_value = self.get_response(200)
+        with call_deadline(10):
+            with call_deadline(-1):
+                self.assertRaises(TimeoutError, self.client.get_track, "1")
+            self.client.get_track("1")
+            self.assertTrue(self.client.session.get.call_args.kwargs["timeout"] <= 10)
+        self.client.get_track("1")
+        self.assertEqual(self.client.session.get.call_args.kwargs["timeout"], 30.0)
+
+    def test_call_deadline_in_other_threads(self):
+        self.client.session.get.return_value = self.get_response(200, b'{"tracks": [{"id": "1"}]}')
+        with call_deadline(0.5):
+            asyncio.run(self.client.get_track_async("1"))
+            self.assertTrue(self.client.session.get.call_args.kwargs["timeout"] <= 0.5)
+            self.client.get_tracks_batched(["1", "2"])
+            self.assertTrue(self.client.session.get.call_args.kwargs["timeout"] <= 0.5)
+        with call_deadline(-1):
+            self.assertRaises(TimeoutError, self.client.get_tracks_batched, ["1", "2"])
+
+    def test_deadline_while_limited(self):
+        self.client.session.get.return_value = self.get_response(200)
+        self.client.concurrency_limiter = AdaptiveConcurrencyLimiter(initial_limit=1, max_limit=1)
+        self.client.concurrency_limiter.acquire()
+        start = time.monotonic()
+        with call_deadline(0.1):
+            self.assertRaises(TimeoutError, self.client.get_track, "1")
+        self.assertTrue(time.monotonic() - start < 1)
+        self.client.session.get.assert_not_called()
+
+    def test_timeout_during_attempt(self):
+        self.client.session.get.side_effect = requests.ReadTimeout("read timed out")
+        with self.assertRaises(TimeoutError):
+            self.client.get_track("1")
+
+    def test_retry_rewinds_stream_body(self):
+        self.client.max_retries = 1
+        self.client.retry_backoff = 0
+        bodies = []
+        def put(url, data, **kwargs):
+            bodies.append(data.read())
+            return self.get_response(429 if len(bodies) == 1 else 202, b"", {"Retry-After": "0"})
+        self.client.session.put.side_effect = put
+        url = "https://api.spotify.com/v1/playlists/1/images"
+        self.assertEqual(self.client.send_request("PUT", url, Base64Stream(io.BytesIO(b"cover"), 5)), True)
+        self.assertEqual(bodies, [b"Y292ZXI="] * 2)
+
+        # a stream that can not start over is not sent again
+        bodies.clear()
+        self.client.send_request("PUT", url, io.BufferedReader(io.BytesIO(b"cover")))
+        self.assertEqual(len(bodies), 1)
+
+    def test_hedge(self):
+        calls = []
+        def get(url, **kwargs):
+            calls.append(url)
+            if len(calls) == 1:
+                time.sleep(0.5)
+                return self.get_response(200, b'{"id": "slow"}')
+            return self.get_response(200, b'{"id": "fast"}')
+        self.client.session.get.side_effect = get
+        self.client.hedge = HedgePolicy(max_delay=0.05, max_ratio=1.0)
+        try:
+            self.assertEqual(self.client.get_track("1"), {"id": "fast"})
+            self.assertEqual(self.client.hedge.get_stats(), {"requests": 1, "hedges": 1, "hedge_wins": 1})
+            # over the hedging budget the first response is waited for
+            self.client.hedge.max_ratio = 0.5
+            calls.clear()
+            self.assertEqual(self.client.get_track("1"), {"id": "slow"})
+            self.assertEqual(self.client.hedge.get_stats()["hedges"], 1)
+        finally:
+            self.client.hedge.shutdown()
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,65 @@
+import os
+import tempfile
+import unittest
+from SpotifyAPI import SpotifyClient, SyntheticCatalog, MockSpotifyServer, crawl_related_artists
+
+class TestCrawler(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.catalog = SyntheticCatalog(artists=40, albums_per_artist=1, tracks_per_album=1, playlists=1)
+        cls.server = MockSpotifyServer(cls.catalog).start_in_thread()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.stop_thread()
+
+    def crawl(self, **kwargs):
+        client = self.server.configure(SpotifyClient("clid", "clst"))
+        artists, edges = [], []
+        for kind, value in client.crawl_related_artists(list(self.catalog.artists)[:2], **kwargs):
+            (artists if kind == "artist" else edges).append(value["id"] if kind == "artist" else value)
+        return artists, edges
+
+    def test_full_crawl(self):
+        artists, edges = self.crawl(max_workers=4)
+        self.assertEqual(len(artists), len(set(artists)))
+        self.assertEqual(set(artists), set(self.catalog.artists))
+        self.assertEqual(len(edges), 20 * len(self.catalog.artists))
+        for source, target in edges:
+            self.assertTrue(target in self.catalog.artists[source]["related"])
+
+    def test_limits(self):
+        artists, edges = self.crawl(max_depth=1)
+        self.assertEqual(len(edges), 40)
+        seeds = list(self.catalog.artists)[:2]
+        self.assertEqual(set(artists), set(seeds) | {target for _, target in edges})
+
+        artists, edges = self.crawl(max_artists=10)
+        self.assertEqual(len(artists), 10)
+
+    def test_resume(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "crawl.json")
+            artists, edges = [], []
+            crawl = self.crawl_stream(path)
+            for kind, value in crawl:
+                (artists if kind == "artist" else edges).append(value)
+                if len(edges) == 95:
+                    break
+            crawl.close()
+
+            for kind, value in self.crawl_stream(path):
+                (artists if kind == "artist" else edges).append(value)
+            self.assertEqual({artist["id"] for artist in artists}, set(self.catalog.artists))
+            self.assertEqual(len({artist["id"] for artist in artists}), len(artists))
+            self.assertEqual(len(set(edges)), 20 * len(self.catalog.artists))
+
+            # a finished crawl has nothing left to do
+            self.assertEqual(list(self.crawl_stream(path)), [])
+
+    def crawl_stream(self, path):
+        client = self.server.configure(SpotifyClient("clid", "clst"))
+        return crawl_related_artists(client, list(self.catalog.artists)[:2], checkpoint=path, checkpoint_every=3, max_pending=2)
+
+if __name__ == "__main__":
+    unittest.main()
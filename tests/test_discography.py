@@ -0,0 +1,49 @@
+import unittest
+from SpotifyAPI import SpotifyClient, SyntheticCatalog, MockSpotifyServer, ResponseCache
+from unittest.mock import MagicMock
+
+class TestDiscography(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.catalog = SyntheticCatalog(artists=2, albums_per_artist=55, tracks_per_album=120, playlists=1)
+        cls.server = MockSpotifyServer(cls.catalog).start_in_thread()
+        cls.artist_id = list(cls.catalog.artists)[0]
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.stop_thread()
+
+    def test_full_discography(self):
+        client = self.server.configure(SpotifyClient("clid", "clst"))
+        client.get_albums = MagicMock(wraps=client.get_albums)
+        client.get_album_tracks = MagicMock(wraps=client.get_album_tracks)
+        albums = list(client.fetch_discography(self.artist_id, max_workers=8))
+
+        expected = self.catalog.artists[self.artist_id]["albums"]
+        self.assertEqual(sorted(album["id"] for album in albums), sorted(expected))
+        for album in albums:
+            track_ids = [track["id"] for track in album["tracks"]["items"]]
+            self.assertEqual(track_ids, self.catalog.albums[album["id"]]["tracks"])
+            self.assertEqual(album["tracks"]["next"], None)
+        # 55 albums in batches of 20, and two extra track pages per album
+        self.assertEqual(client.get_albums.call_count, 3)
+        self.assertTrue(all(len(call.args[0]) <= 20 for call in client.get_albums.call_args_list))
+        self.assertEqual(client.get_album_tracks.call_count, 110)
+
+    def test_include_groups(self):
+        client = self.server.configure(SpotifyClient("clid", "clst"))
+        albums = list(client.fetch_discography(self.artist_id, include_groups=["single"]))
+        expected = [_id for _id in self.catalog.artists[self.artist_id]["albums"]
+                    if self.catalog.albums[_id]["album_type"] == "single"]
+        self.assertEqual(sorted(album["id"] for album in albums), sorted(expected))
+
+    def test_cache_not_changed(self):
+        client = self.server.configure(SpotifyClient("clid", "clst"))
+        client.cache = ResponseCache()
+        list(client.fetch_discography(self.artist_id))
+        albums = list(client.fetch_discography(self.artist_id))
+        self.assertTrue(all(len(album["tracks"]["items"]) == 120 for album in albums))
+        self.assertTrue(client.cache.hits > 0)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,115 @@
+import asyncio
+import unittest
+from urllib.parse import urlencode
+from SpotifyAPI import SpotifyClient, SpotifyOAuth, EndpointTemplate, ENDPOINTS, ResponseCache
+from unittest.mock import MagicMock
+
+BASE_URL = "https://api.spotify.com"
+
+class TestEndpoints(unittest.TestCase):
+    def test_url(self):
+        template = EndpointTemplate("albums/{id}/tracks", ("market", "limit", "offset"))
+        self.assertEqual(template.url(BASE_URL, "abc"), f"{BASE_URL}/v1/albums/abc/tracks")
+        self.assertEqual(template.url(BASE_URL, "abc", market="US", limit=10, offset=None),
+                         f"{BASE_URL}/v1/albums/abc/tracks?market=US&limit=10")
+        with self.assertRaises(Exception):
+            template.url(BASE_URL)
+        with self.assertRaises(Exception) as context:
+            template.url(BASE_URL, "abc", fields="name")
+        self.assertTrue("Unsupported parameter" in str(context.exception))
+
+    def test_encode_matches_urlencode(self):
+        template = ENDPOINTS["search"]
+        params = {"q": "track:Doxy artist:Miles Davis", "type": "track", "market": "US"}
+        self.assertEqual(template.encode(params), urlencode(params))
+
+    def test_limits(self):
+        template = ENDPOINTS["search"]
+        self.assertEqual(template.encode({"limit": 55, "offset": 5000}), "limit=50&offset=1000")
+        self.assertEqual(template.encode({"limit": -1, "offset": -1}), "limit=1&offset=0")
+
+    def test_ids(self):
+        template = ENDPOINTS["get_albums"]
+        self.assertEqual(template.encode({"ids": ["a", "b"]}), "ids=a%2Cb")
+        with self.assertRaises(Exception) as context:
+            template.encode({"ids": [str(i) for i in range(21)]})
+        self.assertTrue("Maximum number of ids exceeded" in str(context.exception))
+
+    def test_client_methods(self):
+        client = SpotifyClient("clid", "clst")
+        client.access_token = "token"
+        client.access_token_expires = None
+        client.get_access_token = MagicMock(return_value="token")
+        client.session = MagicMock()
+        client.session.get.return_value.json.return_value = {}
+
+        client.get_albums(["a", "b"], market="US")
+        client.session.get.assert_called_with(f"{BASE_URL}/v1/albums?ids=a%2Cb&market=US", headers={"Authorization": "Bearer token"}, timeout=30.0)
+        client.get_browse_category("party", country="SE")
+        client.session.get.assert_called_with(f"{BASE_URL}/v1/browse/categories/party?country=SE", headers={"Authorization": "Bearer token"}, timeout=30.0)
+        client.get_artist_albums("abc", include_groups=["album", "single"])
+        client.session.get.assert_called_with(f"{BASE_URL}/v1/artists/abc/albums?include_groups=album%2Csingle", headers={"Authorization": "Bearer token"}, timeout=30.0)
+
+class TestGeneratedMethods(unittest.TestCase):
+    def make_client(self, client_class=SpotifyClient):
+        client = client_class("clid", "clst") if client_class == SpotifyClient else client_class("clid", "clst", "https://localhost/callback")
+        client.get_access_token = MagicMock(return_value="token")
+        client.send_request = MagicMock()
+        return client
+
+    def test_batched(self):
+        client = self.make_client()
+        client.send_request.side_effect = lambda method, url, data: {"albums": [{"id": url}]}
+        response = client.get_albums_batched([str(i) for i in range(45)], market="US")
+        self.assertEqual(len(response["albums"]), 3)
+        urls = sorted(call.args[1] for call in client.send_request.call_args_list)
+        self.assertTrue(all("market=US" in url for url in urls))
+        self.assertEqual([url.count("%2C") + 1 for url in urls], [20, 20, 5])
+
+    def test_batched_error(self):
+        client = self.make_client()
+        client.send_request.return_value = {"error": {"status": 429}}
+        with self.assertRaises(Exception):
+            client.get_tracks_batched(["a", "b"])
+
+    def test_items(self):
+        auth = self.make_client(SpotifyOAuth)
+        auth.scopes = ["user-library-read"]
+        auth.send_request.side_effect = [
+            {"items": [{"id": "t1"}, {"id": "t2"}], "next": f"{BASE_URL}/v1/me/tracks?offset=2&limit=2"},
+            {"items": [{"id": "t3"}], "next": None}]
+        items = list(auth.get_saved_tracks_items(limit=2))
+        self.assertEqual([item["id"] for item in items], ["t1", "t2", "t3"])
+        self.assertEqual(auth.send_request.call_args_list[1].args[1], f"{BASE_URL}/v1/me/tracks?offset=2&limit=2")
+
+    def test_async(self):
+        client = self.make_client()
+        client.send_request.return_value = {"id": "abc"}
+        response = asyncio.run(client.get_album_async("abc", market="US"))
+        self.assertEqual(response, {"id": "abc"})
+        client.send_request.assert_called_once_with("GET", f"{BASE_URL}/v1/albums/abc?market=US", None)
+
+    def test_user_endpoints(self):
+        self.assertFalse(hasattr(SpotifyClient, "save_tracks_batched"))
+        self.assertTrue(hasattr(SpotifyOAuth, "save_tracks_batched"))
+        self.assertTrue(hasattr(SpotifyOAuth, "get_tracks_batched"))
+        auth = self.make_client(SpotifyOAuth)
+        auth.scopes = None
+        self.assertEqual(auth.save_tracks(["a"]), {})
+        auth.send_request.assert_not_called()
+
+    def test_cache(self):
+        client = self.make_client()
+        client.cache = ResponseCache(max_size=1)
+        client.send_request.return_value = {"id": "abc"}
+        client.get_album("abc")
+        client.get_album("abc")
+        self.assertEqual(client.send_request.call_count, 1)
+        self.assertEqual(client.cache.hits, 1)
+        client.get_album("def")
+        client.get_album("abc")
+        self.assertEqual(client.send_request.call_count, 3)
+        # only catalog endpoints are cached
+        client.get_playlist("abc")
+        client.get_playlist("abc")
+        self.assertEqual(client.send_request.call_count, 5)
@@ -0,0 +1,81 @@
+import random
+import unittest
+from SpotifyAPI import SpotifyClient, SpotifyOAuth, IdSet, base62_to_int, int_to_base62, encode_ids, decode_ids, \
+    validate_ids, encode_uris, decode_uris, validate_uris, to_id_list
+from unittest.mock import MagicMock
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+class TestIds(unittest.TestCase):
+    def test_base62(self):
+        self.assertEqual(base62_to_int("0000000000000000000010"), 62)
+        self.assertEqual(int_to_base62(62), "0000000000000000000010")
+        self.assertEqual(int_to_base62(base62_to_int("4iV5W9uYEdYUVa79Axb7Rh")), "4iV5W9uYEdYUVa79Axb7Rh")
+        self.assertEqual(int_to_base62(base62_to_int("ZZZZZZZZZZZZZZZZZZZZZZ")), "ZZZZZZZZZZZZZZZZZZZZZZ")
+        with self.assertRaises(Exception):
+            base62_to_int("4iV5W9uYEdYUVa79Axb7R-")
+
+    def test_id_set(self):
+        alphabet = "0123456789abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ"
+        rng = random.Random(7)
+        ids = ["".join(rng.choice(alphabet) for i in range(22)) for j in range(5000)] + ["0" * 22]
+        id_set = IdSet(capacity=4)
+        self.assertTrue(all(id_set.add(_id) for _id in ids))
+        self.assertFalse(id_set.add(ids[10]))
+        self.assertEqual(len(id_set), len(ids))
+        self.assertTrue(all(_id in id_set for _id in ids))
+        self.assertFalse("1" * 22 in id_set)
+        self.assertEqual(sorted(id_set), sorted(ids))
+
+        copy = IdSet.from_bytes(id_set.to_bytes())
+        self.assertEqual(len(copy), len(ids))
+        self.assertTrue(all(_id in copy for _id in ids))
+
+@unittest.skipIf(numpy == None, "NumPy is not installed")
+class TestIdArrays(unittest.TestCase):
+    ids = ["4iV5W9uYEdYUVa79Axb7Rh", "0" * 22, int_to_base62(2 ** 128 - 1)]
+
+    def test_ids(self):
+        rng = random.Random(3)
+        ids = self.ids + [int_to_base62(rng.getrandbits(128)) for i in range(1000)]
+        encoded = encode_ids(ids)
+        self.assertEqual(encoded.dtype.itemsize, 16)
+        self.assertEqual(decode_ids(encoded), ids)
+        self.assertEqual(int(encoded["hi"][0]) << 64 | int(encoded["lo"][0]), base62_to_int(ids[0]))
+        self.assertEqual(decode_ids(encode_ids(numpy.array(ids, dtype="S"))), ids)
+
+        invalid = ["4iV5W9uYEdYUVa79Axb7R", "4iV5W9uYEdYUVa79Axb7Rhh", "4iV5W9uYEdYUVa79Axb7R-", "\u00e9" * 22,
+                   int_to_base62(2 ** 128)]
+        self.assertEqual(validate_ids(self.ids + invalid).tolist(), [True] * 3 + [False] * 5)
+        with self.assertRaises(Exception):
+            encode_ids(self.ids + invalid[:1])
+
+    def test_uris(self):
+        uris = ["spotify:track:4iV5W9uYEdYUVa79Axb7Rh", "spotify:episode:512ojhOuo1ktJprKbVcKyQ", "spotify:artist:0OdUWJ0sBjDrqHygGUXeCF"]
+        encoded = encode_uris(uris)
+        self.assertEqual(decode_uris(encoded), uris)
+        self.assertEqual(to_id_list(encoded), uris)
+        self.assertEqual(validate_uris(encoded, types=["track", "episode"]).tolist(), [True, True, False])
+        self.assertEqual(validate_uris(uris + ["spotify:user:someone", "4iV5W9uYEdYUVa79Axb7Rh"]).tolist(),
+                         [True, True, True, False, False])
+
+    def test_client_methods(self):
+        client = SpotifyClient("clid", "clst")
+        client.send_request = MagicMock(return_value={"tracks": []})
+        client.get_tracks(encode_ids(self.ids))
+        self.assertTrue(client.send_request.call_args.args[1].endswith("ids=" + "%2C".join(self.ids)))
+        self.assertEqual(client.convert_list_to_str(",", numpy.array(["a", "b"])), "a,b")
+        client.get_tracks_batched(encode_ids(self.ids * 20))
+        self.assertEqual(client.send_request.call_count, 3)
+
+        auth = SpotifyOAuth("clid", "clst", "http://localhost/callback")
+        uris = encode_uris(["spotify:track:4iV5W9uYEdYUVa79Axb7Rh", "spotify:episode:512ojhOuo1ktJprKbVcKyQ"])
+        self.assertEqual(auth.check_uris(uris), decode_uris(uris))
+        with self.assertRaises(Exception):
+            auth.check_uris(encode_uris(["spotify:artist:0OdUWJ0sBjDrqHygGUXeCF"]))
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,113 @@
+import base64
+import io
+import unittest
+from SpotifyAPI import SpotifyOAuth, Base64Stream, ReplayResponse, prepare_cover_image, upload_cover_images
+from unittest.mock import MagicMock
+from PIL import Image
+
+class NonSeekable(io.RawIOBase):
+    def __init__(self, data):
+        self.data = io.BytesIO(data)
+
+    def readable(self):
+        return True
+
+    def readinto(self, buffer):
+        # short reads, like a socket
+        chunk = self.data.read(min(len(buffer), 1000))
+        buffer[:len(chunk)] = chunk
+        return len(chunk)
+
+class TestImages(unittest.TestCase):
+    def setUp(self):
+        with open("tests/image.jpg", "rb") as f:
+            self.jpeg = f.read()
+
+    def test_base64_stream(self):
+        data = bytes(range(256)) * 1000 + b"x"
+        stream = Base64Stream(NonSeekable(data), len(data))
+        self.assertEqual(len(stream), len(base64.b64encode(data)))
+        parts = []
+        while True:
+            part = stream.read(8192)
+            if not part:
+                break
+            parts.append(part)
+        self.assertEqual(b"".join(parts), base64.b64encode(data))
+        self.assertEqual(b"".join(Base64Stream(io.BytesIO(data), len(data))), base64.b64encode(data))
+
+    def test_jpeg_is_streamed(self):
+        for source in ["tests/image.jpg", self.jpeg, io.BytesIO(self.jpeg), NonSeekable(self.jpeg)]:
+            with prepare_cover_image(source) as cover:
+                self.assertFalse(cover.recompressed)
+                self.assertEqual(cover.size, len(self.jpeg))
+                self.assertEqual(cover.get_body().read(), base64.b64encode(self.jpeg))
+
+    def test_recompress(self):
+        with prepare_cover_image("tests/image2.png") as cover:
+            self.assertTrue(cover.recompressed)
+            data = cover.stream.read()
+        self.assertTrue(data.startswith(b"\xff\xd8\xff"))
+        self.assertEqual(Image.open(io.BytesIO(data)).format, "JPEG")
+
+        # read from the current position, not from the start of the stream
+        with open("tests/image2.png", "rb") as f:
+            stream = io.BytesIO(b"header" + f.read())
+        stream.seek(6)
+        with prepare_cover_image(stream) as cover:
+            self.assertTrue(cover.recompressed)
+
+        # a JPEG over the limit is made smaller
+        with prepare_cover_image(self.jpeg, max_size=20000) as cover:
+            self.assertTrue(cover.recompressed)
+            self.assertTrue(len(cover.get_body()) <= 20000)
+
+    def test_upload_cover_image(self):
+        auth = SpotifyOAuth("clid", "clst", "https://localhost/callback")
+        auth.scopes = ["ugc-image-upload", "playlist-modify-public", "playlist-modify-private"]
+        auth.get_access_token = MagicMock(return_value="token")
+        auth.session = MagicMock()
+        bodies = []
+        auth.session.put.side_effect = lambda url, headers, data, **kwargs: bodies.append(data.read())
+        self.assertTrue(auth.upload_cover_image("playlist", "tests/image.jpg"))
+        self.assertEqual(auth.session.put.call_args.args[0], "https://api.spotify.com/v1/playlists/playlist/images")
+        self.assertEqual(bodies[0], base64.b64encode(self.jpeg))
+
+        auth.scopes = None
+        self.assertEqual(auth.upload_cover_image("playlist", "tests/image.jpg"), {})
+
+class TestUploadCoverImages(unittest.TestCase):
+    def test_upload_cover_images(self):
+        with open("tests/image.jpg", "rb") as f:
+            jpeg = f.read()
+        auth = SpotifyOAuth("clid", "clst", "https://localhost/callback")
+        auth.scopes = ["ugc-image-upload", "playlist-modify-public", "playlist-modify-private"]
+        auth.get_access_token = MagicMock(return_value="token")
+        auth.session = MagicMock()
+        bodies = {}
+        def put(url, headers, data, **kwargs):
+            playlist_id = url.split("/")[-2]
+            bodies[playlist_id] = data.read()
+            if playlist_id == "rejected":
+                return ReplayResponse(413, b'{"error": {"status": 413, "message": "Payload too large"}}', url)
+            return ReplayResponse(202, b"", url)
+        auth.session.put.side_effect = put
+
+        items = [("jpeg_path", "tests/image.jpg"), ("jpeg_bytes", jpeg), ("png", "tests/image2.png"),
+                 ("stream", io.BytesIO(jpeg)), ("missing", "tests/missing.jpg"), ("not_an_image", b"not an image"),
+                 ("rejected", jpeg)]
+        finished = []
+        report = upload_cover_images(auth, items, callback=finished.append, processes=2, max_workers=2, max_pending=3)
+
+        results = {result.playlist_id: result for result in report.results}
+        self.assertEqual(len(finished), 7)
+        self.assertTrue("413" in results["rejected"].error)
+        self.assertEqual(sorted(p for p, r in results.items() if r.ok), ["jpeg_bytes", "jpeg_path", "png", "stream"])
+        self.assertTrue(results["png"].recompressed)
+        self.assertFalse(results["jpeg_path"].recompressed)
+        self.assertEqual(bodies["jpeg_path"], base64.b64encode(jpeg))
+        self.assertTrue(base64.b64decode(bodies["png"]).startswith(b"\xff\xd8\xff"))
+
+        stats = report.get_stats()
+        self.assertEqual((stats["uploaded"], stats["failed"], stats["recompressed"]), (4, 3, 1))
+        self.assertTrue(stats["images_per_second"] > 0)
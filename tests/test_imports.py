@@ -0,0 +1,26 @@
+import json
+import subprocess
+import sys
+import unittest
+
+def get_loaded(statement, modules):
+    code = f"{statement}\nimport sys, json\nprint(json.dumps([m for m in {modules!r} if m in sys.modules]))"
+    output = subprocess.run([sys.executable, "-c", code], check=True, capture_output=True, text=True).stdout
+    return json.loads(output)
+
+class TestImports(unittest.TestCase):
+    def test_import_package(self):
+        self.assertEqual(get_loaded("import SpotifyAPI", ["requests", "PIL", "asyncio", "SpotifyAPI.client"]), [])
+
+    def test_import_client(self):
+        self.assertEqual(get_loaded("from SpotifyAPI import SpotifyClient", ["PIL", "asyncio", "http.server", "numpy", "sqlite3", "SpotifyAPI.oauth"]), [])
+
+    def test_import_oauth(self):
+        self.assertEqual(get_loaded("from SpotifyAPI import SpotifyOAuth, SpotifyPKCE", ["PIL", "asyncio", "http.server", "numpy", "sqlite3"]), [])
+
+    def test_exports(self):
+        import SpotifyAPI
+        for name in SpotifyAPI.__all__:
+            self.assertTrue(hasattr(SpotifyAPI, name), name)
+        with self.assertRaises(AttributeError):
+            SpotifyAPI.not_a_name
@@ -0,0 +1,53 @@
+import json
+import unittest
+from SpotifyAPI import SpotifyClient, InterningDecoder, ReplayResponse
+from unittest.mock import MagicMock
+
+ARTIST = {"id": "a1", "name": "Artist", "uri": "spotify:artist:a1", "images": [{"url": "https://i.scdn.co/image/a1", "height": 640, "width": 640}]}
+ALBUM = {"id": "b1", "name": "Album", "artists": [ARTIST], "available_markets": ["US", "CA", "JP"]}
+
+def page(offset):
+    items = [{"track": {"id": f"t{offset + i}", "name": f"Track {i}", "artists": [ARTIST], "album": ALBUM,
+                        "available_markets": ["US", "CA", "JP"], "track_number": i + 1}} for i in range(10)]
+    return json.dumps({"items": items, "offset": offset, "next": None}).encode("utf-8")
+
+class TestInterningDecoder(unittest.TestCase):
+    def test_shared_objects(self):
+        decoder = InterningDecoder()
+        first = json.loads(page(0), object_hook=decoder.object_hook)
+        second = json.loads(page(10), object_hook=decoder.object_hook)
+        tracks = [item["track"] for item in first["items"] + second["items"]]
+
+        self.assertEqual(json.loads(page(0)), first)
+        self.assertTrue(all(track["album"] is tracks[0]["album"] for track in tracks))
+        self.assertTrue(all(track["artists"][0] is tracks[0]["album"]["artists"][0] for track in tracks))
+        self.assertTrue(all(track["available_markets"] is tracks[0]["album"]["available_markets"] for track in tracks))
+        self.assertFalse(tracks[0] is tracks[10])
+        self.assertTrue(decoder.get_stats()["hits"] > 0)
+
+    def test_types_kept_apart(self):
+        decoder = InterningDecoder()
+        values = json.loads('[{"a": 1}, {"a": 1.0}, {"a": true}, {"a": "1"}, {"a": [1]}, {"a": [true]}]', object_hook=decoder.object_hook)
+        self.assertEqual([type(v["a"]) for v in values], [int, float, bool, str, list, list])
+        self.assertEqual(type(values[5]["a"][0]), bool)
+
+    def test_bounded(self):
+        decoder = InterningDecoder(max_objects=10, max_strings=5)
+        for i in range(100):
+            json.loads(json.dumps({"id": str(i), "name": f"name {i}"}), object_hook=decoder.object_hook)
+        self.assertEqual(len(decoder), 10)
+        self.assertEqual(decoder.get_stats()["strings"], 5)
+
+    def test_client(self):
+        client = SpotifyClient("clid", "clst")
+        client.access_token = "token"
+        client.get_access_headers = MagicMock(return_value={})
+        client.decoder = InterningDecoder()
+        client.session = MagicMock()
+        client.session.get.side_effect = [ReplayResponse(200, page(0), "url"), ReplayResponse(200, page(10), "url")]
+        first = client.send_request("GET", "url")
+        second = client.send_request("GET", "url")
+        self.assertTrue(first["items"][0]["track"]["album"] is second["items"][0]["track"]["album"])
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,75 @@
+import io
+import json
+import os
+import tempfile
+import unittest
+from SpotifyAPI import SpotifyOAuth, export_library
+from unittest.mock import MagicMock
+
+def make_page(items, next_url=None):
+    return {"items": items, "next": next_url, "total": len(items)}
+
+def make_auth():
+    auth = MagicMock(spec=SpotifyOAuth)
+    auth.get_saved_tracks.return_value = make_page([{"id": "t1"}, {"id": "t2"}], "https://api.spotify.com/v1/me/tracks?offset=2")
+    auth.get_saved_albums.return_value = make_page([{"id": "a1"}])
+    auth.get_followed_artists.return_value = {"artists": make_page([{"id": "ar1"}])}
+    auth.get_page.return_value = make_page([{"id": "t3"}])
+    return auth
+
+class TestLibrary(unittest.TestCase):
+    def test_export_library(self):
+        auth = make_auth()
+        output = io.StringIO()
+        counts = export_library(auth, output, collections=["tracks", "albums", "artists"])
+        self.assertEqual(counts, {"tracks": 3, "albums": 1, "artists": 1})
+
+        lines = [json.loads(line) for line in output.getvalue().splitlines()]
+        track_ids = [line["item"]["id"] for line in lines if line["collection"] == "tracks"]
+        self.assertEqual(track_ids, ["t1", "t2", "t3"])
+        auth.get_page.assert_called_once_with("https://api.spotify.com/v1/me/tracks?offset=2")
+
+    def test_export_library_callback(self):
+        items = []
+        export_library(make_auth(), callback=lambda c, item: items.append((c, item["id"])), collections=["albums"])
+        self.assertEqual(items, [("albums", "a1")])
+
+        with self.assertRaises(Exception):
+            export_library(make_auth(), collections=["fake_collection"], callback=print)
+        with self.assertRaises(Exception):
+            export_library(make_auth())
+
+    def test_export_library_resume(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = os.path.join(tmp_dir, "checkpoint.json")
+            auth = make_auth()
+            auth.get_page.side_effect = Exception("connection lost")
+            with self.assertRaises(Exception):
+                export_library(auth, io.StringIO(), collections=["tracks"], checkpoint=path)
+
+            auth = make_auth()
+            output = io.StringIO()
+            counts = export_library(auth, output, collections=["tracks", "albums"], checkpoint=path)
+            self.assertEqual(counts, {"tracks": 3, "albums": 1})
+            auth.get_saved_tracks.assert_not_called()
+            self.assertEqual(len(output.getvalue().splitlines()), 2)
+
+            # everything is done, nothing is requested again
+            auth = make_auth()
+            export_library(auth, io.StringIO(), checkpoint=path, collections=["tracks", "albums"])
+            auth.get_page.assert_not_called()
+            auth.get_saved_albums.assert_not_called()
+
+    def test_export_library_missing_scopes(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = os.path.join(tmp_dir, "checkpoint.json")
+            auth = make_auth()
+            auth.has_required_scopes.return_value = False
+            with self.assertRaises(Exception):
+                export_library(auth, io.StringIO(), collections=["albums"], checkpoint=path)
+            auth.get_saved_albums.assert_not_called()
+
+            # the collection was not recorded as done
+            auth = make_auth()
+            counts = export_library(auth, io.StringIO(), collections=["albums"], checkpoint=path)
+            self.assertEqual(counts, {"albums": 1})
@@ -0,0 +1,41 @@
+import unittest
+from SpotifyAPI import SpotifyClient, SyntheticCatalog, MockSpotifyServer, MARKETS, fetch_market_variants
+from unittest.mock import MagicMock
+
+class TestMarketVariants(unittest.TestCase):
+    def test_mock_server(self):
+        catalog = SyntheticCatalog(artists=1, albums_per_artist=1, tracks_per_album=3, playlists=1)
+        server = MockSpotifyServer(catalog).start_in_thread()
+        try:
+            client = server.configure(SpotifyClient("clid", "clst"))
+            album_id = list(catalog.albums)[0]
+            result = client.fetch_market_variants("get_album", album_id)
+            self.assertEqual(len(result), 1)
+            self.assertEqual(sorted(result.markets), sorted(MARKETS))
+            self.assertEqual(result.get("JP")["id"], album_id)
+        finally:
+            server.stop_thread()
+
+    def test_variants(self):
+        client = MagicMock()
+        def get_track(_id, market):
+            if market == "XX":
+                return {"error": {"status": 404}}
+            # dictionaries with the same content in a different order are the same variant
+            if market in ("US", "CA"):
+                return {"is_playable": True, "id": _id}
+            return {"id": _id, "is_playable": market != "JP"}
+        client.get_track.side_effect = get_track
+        result = fetch_market_variants(client, "get_track", "a", markets=["US", "CA", "GB", "JP", "XX", "US"])
+
+        self.assertEqual(client.get_track.call_count, 5)
+        self.assertEqual(len(result), 2)
+        self.assertEqual(result.get("JP"), {"id": "a", "is_playable": False})
+        self.assertEqual(result.get("XX"), None)
+        self.assertEqual(list(result.errors), ["XX"])
+        groups = sorted(result.get_groups())
+        self.assertEqual(groups, [["CA", "GB", "US"], ["JP"]])
+        self.assertEqual(result.to_dict()["markets"]["GB"], result.markets["US"])
+
+if __name__ == "__main__":
+    unittest.main()
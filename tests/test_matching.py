@@ -0,0 +1,100 @@
+import os
+import tempfile
+import unittest
+from SpotifyAPI import SpotifyClient, SyntheticCatalog, MockSpotifyServer, MatchIndex, CatalogMatcher
+from unittest.mock import MagicMock
+
+class TestCatalogMatcher(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.catalog = SyntheticCatalog(artists=10, albums_per_artist=2, tracks_per_album=5, playlists=1)
+        cls.server = MockSpotifyServer(cls.catalog).start_in_thread()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.stop_thread()
+
+    def test_match_and_index(self):
+        client = self.server.configure(SpotifyClient("clid", "clst"))
+        isrcs = list(self.catalog.isrcs)[:20]
+        upcs = list(self.catalog.upcs)[:5]
+        # every key three times, plus one that does not exist
+        records = [{"isrc": isrc, "row": i} for i, isrc in enumerate(isrcs * 3)] + \
+                  [{"upc": upc} for upc in upcs] + [{"isrc": "XX0000000000"}]
+
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "matches.db")
+            with CatalogMatcher(client, path, max_workers=4) as matcher:
+                results = list(matcher.match(records))
+                self.assertEqual(len(results), len(records))
+                for record, spotify_id, source in results:
+                    if "isrc" in record and record["isrc"] in self.catalog.isrcs:
+                        self.assertEqual(spotify_id, self.catalog.isrcs[record["isrc"]])
+                    elif "upc" in record:
+                        self.assertEqual(spotify_id, self.catalog.upcs[record["upc"]])
+                    else:
+                        self.assertEqual(spotify_id, None)
+                    self.assertTrue(source in ("index", "search"))
+                # each key is searched for once, no matter how many records share it
+                self.assertEqual(matcher.searches, 26)
+                self.assertEqual(matcher.matched, 65)
+                self.assertEqual(matcher.unmatched, 1)
+
+            # a new run answers everything from the index, including the miss
+            with CatalogMatcher(client, path) as matcher:
+                results = list(matcher.match(records))
+                self.assertTrue(all(source == "index" for _, _, source in results))
+                stats = matcher.get_stats()
+                self.assertEqual(stats["searches"], 0)
+                self.assertEqual(stats["hit_ratio"], 1.0)
+                self.assertTrue(stats["records_per_second"] > 0)
+
+    def test_errors_not_indexed(self):
+        client = MagicMock()
+        client.search.return_value = {"error": {"status": 429, "message": "API rate limit exceeded"}}
+        index = MatchIndex()
+        matcher = CatalogMatcher(client, index, max_workers=2)
+        results = list(matcher.match([{"title": "Doxy", "artist": "Miles Davis"}, {"title": " doxy", "artist": "MILES DAVIS"}]))
+        self.assertEqual([source for _, _, source in results], ["error", "error"])
+        self.assertEqual(client.search.call_count, 1)
+        client.search.assert_called_with('track:Doxy artist:"Miles Davis"', search_type="track", market=None, limit=1)
+        self.assertEqual(len(index), 0)
+        matcher.close()
+
+    def test_title_and_artist(self):
+        client = self.server.configure(SpotifyClient("clid", "clst"))
+        track_id = next(iter(self.catalog.tracks))
+        track = self.catalog.tracks[track_id]
+        album = self.catalog.albums[track["album"]]
+        artist = self.catalog.artists[album["artist"]]["name"]
+        with CatalogMatcher(client) as matcher:
+            results = list(matcher.match([{"title": track["name"], "artist": artist}]))
+        spotify_id = results[0][1]
+        self.assertNotEqual(spotify_id, None)
+        self.assertEqual(self.catalog.tracks[spotify_id]["name"].lower(), track["name"].lower())
+
+    def test_unmatched_ttl(self):
+        client = MagicMock()
+        client.search.return_value = {"tracks": {"items": []}}
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "matches.db")
+            with MatchIndex(path) as index:
+                index.set_many([("isrc", "XX0000000000", None)])
+                self.assertEqual(index.get("isrc", "XX0000000000"), (True, None))
+                self.assertEqual(index.get("isrc", "XX0000000000", unmatched_ttl=-1), (False, None))
+
+            # a fresh miss is trusted, an expired one is searched for again
+            with CatalogMatcher(client, path) as matcher:
+                self.assertEqual(list(matcher.match([{"isrc": "XX0000000000"}]))[0][2], "index")
+            with CatalogMatcher(client, path, unmatched_ttl=-1) as matcher:
+                self.assertEqual(list(matcher.match([{"isrc": "XX0000000000"}]))[0][2], "search")
+            self.assertEqual(client.search.call_count, 1)
+
+    def test_invalid_record(self):
+        matcher = CatalogMatcher(MagicMock())
+        with self.assertRaises(Exception):
+            list(matcher.match([{"name": "Doxy"}]))
+        matcher.close()
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,92 @@
+import unittest
+from SpotifyAPI import SpotifyOAuth, LibraryMembership, MembershipBitmap
+from unittest.mock import MagicMock
+
+class TestMembership(unittest.TestCase):
+    def test_bitmap(self):
+        bitmap = MembershipBitmap()
+        self.assertEqual(bitmap.get("id1"), None)
+        for i in range(20):
+            bitmap.set(f"id{i}", i % 2 == 0)
+        self.assertEqual(len(bitmap), 20)
+        self.assertEqual(len(bitmap.known), 3)
+        self.assertTrue(bitmap.get("id18"))
+        self.assertFalse(bitmap.get("id19"))
+        bitmap.set("id18", False)
+        self.assertFalse(bitmap.get("id18"))
+        bitmap.discard("id18")
+        self.assertEqual(bitmap.get("id18"), None)
+
+    def test_check_chunks_and_caches(self):
+        auth = MagicMock(spec=SpotifyOAuth)
+        auth.check_saved_tracks.side_effect = lambda ids: [_id.endswith("0") for _id in ids]
+        membership = LibraryMembership(auth)
+        ids = [f"id{i}" for i in range(120)]
+
+        result = membership.check("tracks", ids + ["id0"])
+        self.assertEqual(len(result), 120)
+        self.assertTrue(result["id10"])
+        self.assertFalse(result["id11"])
+        self.assertEqual(auth.check_saved_tracks.call_count, 3)
+        self.assertTrue(all(len(call.args[0]) <= 50 for call in auth.check_saved_tracks.call_args_list))
+
+        # answered from the cache
+        self.assertTrue(membership.is_saved("tracks", "id20"))
+        self.assertEqual(auth.check_saved_tracks.call_count, 3)
+        membership.close()
+
+    def test_save_and_remove_update_cache(self):
+        auth = MagicMock(spec=SpotifyOAuth)
+        auth.check_artists_or_users.return_value = "not a list"
+        auth.follow_artists_or_users.return_value = True
+        auth.unfollow_artists_or_users.return_value = True
+        membership = LibraryMembership(auth)
+        membership.save("artists", ["ar1"])
+        auth.follow_artists_or_users.assert_called_once_with("artist", ["ar1"])
+        self.assertTrue(membership.is_saved("artists", "ar1"))
+
+        membership.remove("artists", ["ar1"])
+        self.assertFalse(membership.is_saved("artists", "ar1"))
+        auth.check_artists_or_users.assert_not_called()
+
+        # a failed save leaves the cache as it was
+        auth.follow_artists_or_users.return_value = {"error": {"status": 429, "message": ""}}
+        with self.assertRaises(Exception):
+            membership.save("artists", ["ar1"])
+        self.assertFalse(membership.is_saved("artists", "ar1"))
+
+        with self.assertRaises(Exception):
+            membership.check("artists", ["ar2"])
+        with self.assertRaises(Exception):
+            membership.check("fake_collection", ["ar2"])
+        membership.close()
+
+    def test_save_missing_scopes(self):
+        auth = SpotifyOAuth("clid", "clst", "https://fadelafuente.github.io/")
+        auth.has_required_scopes = MagicMock(return_value=False)
+        auth.session = MagicMock()
+        membership = LibraryMembership(auth)
+        with self.assertRaises(Exception):
+            membership.save("tracks", ["t1"])
+        auth.session.put.assert_not_called()
+        self.assertEqual(membership.get_bitmap("tracks").get("t1"), None)
+        membership.close()
+
+    def test_client_methods_update_cache(self):
+        auth = SpotifyOAuth("clid", "clst", "https://fadelafuente.github.io/")
+        auth.scopes = SpotifyOAuth.available_scopes
+        auth.get_access_headers = MagicMock(return_value={})
+        auth.session = MagicMock()
+        membership = LibraryMembership(auth, rate_limit=100)
+        self.assertIs(auth.membership, membership)
+
+        auth.save_tracks(["t1", "t2"])
+        auth.follow_artists_or_users("artist", ["ar1"])
+        self.assertEqual(membership.check("tracks", ["t1", "t2"]), {"t1": True, "t2": True})
+        self.assertTrue(membership.is_saved("artists", "ar1"))
+        auth.remove_saved_tracks(["t1"])
+        self.assertFalse(membership.is_saved("tracks", "t1"))
+        auth.session.get.assert_not_called()
+
+        membership.close()
+        self.assertEqual(auth.membership, None)
@@ -0,0 +1,124 @@
+import io
+import unittest
+import requests
+from SpotifyAPI import SpotifyClient, SpotifyOAuth, MockSpotifyServer, SyntheticCatalog, export_library
+
+class TestMockSpotifyServer(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        catalog = SyntheticCatalog(artists=10, albums_per_artist=3, tracks_per_album=5, saved_tracks=120)
+        cls.server = MockSpotifyServer(catalog).start_in_thread()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.stop_thread()
+
+    def test_client(self):
+        catalog = self.server.catalog
+        client = self.server.configure(SpotifyClient("clid", "clst"))
+        client.session = requests.Session()
+
+        album_id = catalog.album_ids[0]
+        album = client.get_album(album_id)
+        self.assertEqual(album["id"], album_id)
+        self.assertEqual(len(album["tracks"]["items"]), 5)
+        self.assertTrue(client.access_token.startswith("mock-"))
+
+        tracks = client.get_tracks(catalog.track_ids[:3] + ["missing_id"])["tracks"]
+        self.assertEqual([t["id"] if t else None for t in tracks], catalog.track_ids[:3] + [None])
+
+        track_id = catalog.track_ids[3]
+        isrc = catalog.tracks[track_id]["isrc"]
+        response = client.search({"isrc": isrc}, search_type="track")
+        self.assertEqual([t["id"] for t in response["tracks"]["items"]], [track_id])
+        self.assertEqual(client.get_track("missing_id")["error"]["status"], 404)
+
+    def test_oauth_library(self):
+        auth = self.server.configure(SpotifyOAuth("clid", "clst", "http://127.0.0.1/callback"))
+        auth.validate_scopes(SpotifyOAuth.available_scopes)
+        auth.set_code("mock-code")
+
+        output = io.StringIO()
+        counts = export_library(auth, output, collections=["tracks", "artists", "playlists"])
+        self.assertEqual(counts, {"tracks": 120, "artists": 10, "playlists": 20})
+        self.assertEqual(auth.refresh_token, "mock-refresh-token")
+
+        track_id = self.server.catalog.track_ids[0]
+        auth.remove_saved_tracks([track_id])
+        self.assertEqual(auth.check_saved_tracks([track_id]), [False])
+        auth.save_tracks([track_id])
+        self.assertEqual(auth.check_saved_tracks([track_id]), [True])
+
+    def test_player(self):
+        now = [1000.0]
+        server = MockSpotifyServer(SyntheticCatalog(artists=2, saved_tracks=5), clock=lambda: now[0]).start_in_thread()
+        try:
+            auth = server.configure(SpotifyOAuth("clid", "clst", "http://127.0.0.1/callback"))
+            auth.validate_scopes(SpotifyOAuth.available_scopes)
+            auth.set_code("mock-code")
+            saved = server.catalog.saved["tracks"]
+
+            self.assertEqual(auth.get_playback(), {})
+            self.assertEqual(auth.stop_playback()["error"]["status"], 404)
+            self.assertEqual(auth.start_playback(), True)
+            playback = auth.get_playback()
+            self.assertTrue(playback["is_playing"])
+            self.assertEqual(playback["item"]["id"], saved[0])
+
+            # the track ends and the next one starts
+            now[0] += server.catalog.tracks[saved[0]]["duration_ms"] / 1000 + 2
+            playback = auth.get_currently_playing_track()
+            self.assertEqual(playback["item"]["id"], saved[1])
+            self.assertTrue(1900 <= playback["progress_ms"] <= 2100)
+
+            auth.add_item_to_queue(f"spotify:track:{saved[4]}")
+            self.assertEqual(auth.get_queue()["queue"][0]["id"], saved[4])
+            auth.skip_to_next()
+            self.assertEqual(auth.get_playback()["item"]["id"], saved[4])
+            auth.skip_to_next()
+            self.assertEqual(auth.get_playback()["item"]["id"], saved[2])
+
+            auth.seek_position(1000)
+            auth.set_volume(10)
+            self.assertEqual(auth.get_available_devices()["devices"][0]["volume_percent"], 10)
+            self.assertEqual(auth.stop_playback(), True)
+            self.assertFalse(auth.get_playback()["is_playing"])
+            self.assertEqual(auth.get_playback()["progress_ms"], 1000)
+        finally:
+            server.stop_thread()
+
+    def test_rate_limit(self):
+        now = [1000.0]
+        server = MockSpotifyServer(SyntheticCatalog(artists=1), rate_limit=3, retry_after=5, clock=lambda: now[0])
+        server.start_in_thread()
+        client = server.configure(SpotifyClient("clid", "clst"))
+        # the token request takes one of the 3 requests per second
+        responses = [client.get_available_markets() for i in range(3)]
+        now[0] += 1
+        responses.append(client.get_available_markets())
+        server.stop_thread()
+        self.assertTrue(responses[0]["markets"])
+        self.assertEqual(responses[2]["error"]["status"], 429)
+        self.assertTrue(responses[3]["markets"])
+        self.assertEqual(server.stats["rate_limited"], 1)
+
+        response = requests.get(f"{self.server.url}/v1/markets")
+        self.assertEqual(response.status_code, 401)
+
+    def test_bad_requests(self):
+        headers = {"Authorization": "Bearer token"}
+        for path in ["/v1/me/following?type=artist&limit=abc", "/v1/me/player/recently-played?after=abc",
+                     "/v1/me/tracks?limit=abc"]:
+            response = requests.get(f"{self.server.url}{path}", headers=headers)
+            self.assertEqual(response.status_code, 400)
+            self.assertEqual(response.json()["error"]["status"], 400)
+
+        # any other exception in a handler is a 500, not a dropped connection
+        server = MockSpotifyServer(SyntheticCatalog(artists=1))
+        def broken(query, body):
+            raise RuntimeError("bug")
+        server.routes = [(method, pattern, broken) for method, pattern, handler in server.routes]
+        server.start_in_thread()
+        response = requests.get(f"{server.url}/v1/markets", headers=headers)
+        server.stop_thread()
+        self.assertEqual(response.status_code, 500)
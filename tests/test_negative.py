@@ -0,0 +1,96 @@
+import unittest
+from SpotifyAPI import SpotifyClient, SyntheticCatalog, MockSpotifyServer, BloomFilter, NegativeCache
+from unittest.mock import MagicMock, patch
+
+class TestNegativeCache(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.catalog = SyntheticCatalog(artists=5, albums_per_artist=2, tracks_per_album=10, playlists=1)
+        cls.server = MockSpotifyServer(cls.catalog).start_in_thread()
+        cls.missing = [f"{i:0>22}" for i in range(30)]
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.stop_thread()
+
+    def get_client(self, **kwargs):
+        client = self.server.configure(SpotifyClient("clid", "clst"))
+        client.negative_cache = NegativeCache(**kwargs)
+        client.send_request = MagicMock(wraps=client.send_request)
+        return client
+
+    def test_get_tracks(self):
+        client = self.get_client()
+        track_ids = list(self.catalog.tracks)[:10]
+        ids = track_ids[:5] + self.missing[:5] + track_ids[5:]
+        first = client.get_tracks(ids)["tracks"]
+        second = client.get_tracks(ids)["tracks"]
+        self.assertEqual(first, second)
+        self.assertEqual([track["id"] if track else None for track in second], track_ids[:5] + [None] * 5 + track_ids[5:])
+        self.assertTrue("0" * 22 not in client.send_request.call_args.args[1])
+
+        # every id is remembered, no request is made
+        client.get_tracks(self.missing[:5])
+        self.assertEqual(client.send_request.call_count, 2)
+        self.assertEqual(client.negative_cache.get_stats(), {"skipped": 10, "requests_saved": 1, "ids": 5})
+
+        # remembered per market
+        client.get_tracks(self.missing[:5], market="JP")
+        self.assertEqual(client.send_request.call_count, 3)
+
+    def test_single_and_batched(self):
+        client = self.get_client()
+        self.assertEqual(client.get_album(self.missing[0])["error"]["status"], 404)
+        self.assertEqual(client.get_album(self.missing[0])["error"]["status"], 404)
+        self.assertEqual(client.send_request.call_count, 1)
+
+        album_ids = list(self.catalog.albums)
+        client.get_albums_batched(self.missing[:20] + album_ids)
+        client.send_request.reset_mock()
+        albums = client.get_albums_batched(self.missing[:20] + album_ids)["albums"]
+        self.assertEqual(albums[:20], [None] * 20)
+        self.assertEqual([album["id"] for album in albums[20:]], album_ids)
+        self.assertEqual(client.send_request.call_count, 1)
+        self.assertEqual(client.negative_cache.requests_saved, 2)
+
+    def test_ttl(self):
+        cache = NegativeCache(ttl=10)
+        with patch("SpotifyAPI.negative.time.monotonic", return_value=100):
+            cache.add("tracks", "a")
+            self.assertTrue(cache.contains("tracks", "a"))
+            self.assertFalse(cache.contains("tracks", "a", "US"))
+        with patch("SpotifyAPI.negative.time.monotonic", return_value=111):
+            self.assertFalse(cache.contains("tracks", "a"))
+
+        cache = NegativeCache(ttl=10, bloom=True, capacity=1000)
+        with patch("SpotifyAPI.negative.time.monotonic", return_value=cache.rotated + 5):
+            cache.add("tracks", "a")
+        with patch("SpotifyAPI.negative.time.monotonic", return_value=cache.rotated + 15):
+            self.assertTrue(cache.contains("tracks", "a"))
+        with patch("SpotifyAPI.negative.time.monotonic", return_value=cache.rotated + 25):
+            self.assertFalse(cache.contains("tracks", "a"))
+
+        # idle for longer than twice ttl, both filters are dropped
+        cache = NegativeCache(ttl=10, bloom=True, capacity=1000)
+        with patch("SpotifyAPI.negative.time.monotonic", return_value=cache.rotated + 5):
+            cache.add("tracks", "a")
+            cache.add("tracks", "a")
+            self.assertEqual(len(cache), 1)
+        with patch("SpotifyAPI.negative.time.monotonic", return_value=cache.rotated + 15):
+            cache.add("tracks", "a")
+            self.assertEqual(len(cache), 1)
+        with patch("SpotifyAPI.negative.time.monotonic", return_value=cache.rotated + 100):
+            self.assertFalse(cache.contains("tracks", "a"))
+            self.assertEqual(len(cache), 0)
+
+    def test_bloom_filter(self):
+        bloom = BloomFilter(capacity=10000, error_rate=0.01)
+        for i in range(10000):
+            bloom.add(f"tracks::{i}")
+        self.assertTrue(all(f"tracks::{i}" in bloom for i in range(10000)))
+        false_positives = sum(f"albums::{i}" in bloom for i in range(10000))
+        self.assertTrue(false_positives < 300)
+        self.assertTrue(len(bloom.bits) < 15000)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -19,7 +19,7 @@ def mocked_request(*args, **kwargs):
 class TestOAuth(unittest.TestCase):
     auth = SpotifyOAuth("clid", "clst", "https://fadelafuente.github.io/")
 
-    @patch('SpotifyAPI.oauth.requests')
+    @patch('SpotifyAPI.client.requests')
     @patch('SpotifyAPI.oauth.SpotifyOAuth.get_redirect_url', MagicMock(return_value="https://fadelafuente.github.io/callback?code=fake_code"))
     def test_00_request_user_auth(self, mock_requests):
         mock_requests.get.return_value = make_mock_response(200, None)
@@ -31,13 +31,11 @@ class TestOAuth(unittest.TestCase):
         self.assertEqual(self.auth.scopes, ["user-top-read"])
         self.assertEqual(self.auth.code, "fake_code")
 
-    # I seriously do not understand why I can only do it this way instead of the previous way like in 
-    # test_client, but what can I do
-    @patch('SpotifyAPI.oauth.requests')
+    @patch('SpotifyAPI.client.requests.get')
     @patch('SpotifyAPI.client.requests.post', MagicMock(side_effect=mocked_request))
     @patch('SpotifyAPI.oauth.SpotifyOAuth.get_redirect_url', MagicMock(return_value="https://fadelafuente.github.io/callback?code=fake_code"))
     def test_01_get_playback(self, mock_oauth_get):
-        mock_oauth_get.get.return_value = make_mock_response(200, GET_DICT)
+        mock_oauth_get.return_value = make_mock_response(200, GET_DICT)
         response = self.auth.get_playback()
         self.assertEqual(response, {})
         self.auth.request_user_auth(scopes=SpotifyOAuth.available_scopes)
@@ -45,7 +43,7 @@ class TestOAuth(unittest.TestCase):
         response = self.auth.get_playback()
         self.assertEqual(response["id"], "fake_id")
 
-    @patch('SpotifyAPI.oauth.requests.put')
+    @patch('SpotifyAPI.client.requests.put')
     @patch('SpotifyAPI.client.requests.post', MagicMock(side_effect=mocked_request))
     @patch('SpotifyAPI.oauth.SpotifyOAuth.get_redirect_url', MagicMock(return_value="https://fadelafuente.github.io/callback?code=fake_code"))
     def test_02_transfer_playback(self, mock_oauth_get):
@@ -58,7 +56,7 @@ class TestOAuth(unittest.TestCase):
         response = self.auth.transfer_playback("fake_id")
         self.assertTrue(response)
 
-    @patch('SpotifyAPI.oauth.requests.put')
+    @patch('SpotifyAPI.client.requests.put')
     @patch('SpotifyAPI.client.requests.post', MagicMock(side_effect=mocked_request))
     @patch('SpotifyAPI.oauth.SpotifyOAuth.get_redirect_url', MagicMock(return_value="https://fadelafuente.github.io/callback?code=fake_code"))
     def test_03_set_repeat_mode(self, mock_oauth_get):
@@ -72,7 +70,7 @@ class TestOAuth(unittest.TestCase):
         response = self.auth.set_repeat_mode("context")
         self.assertTrue(response)
 
-    @patch('SpotifyAPI.oauth.requests.post')
+    @patch('SpotifyAPI.client.requests.post')
     @patch('SpotifyAPI.client.requests.post', MagicMock(side_effect=mocked_request))
     @patch('SpotifyAPI.oauth.SpotifyOAuth.get_redirect_url', MagicMock(return_value="https://fadelafuente.github.io/callback?code=fake_code"))
     def test_04_add_item_to_queue(self, mock_oauth_get):
@@ -85,7 +83,7 @@ class TestOAuth(unittest.TestCase):
         response = self.auth.add_item_to_queue("spotify:episode:abcde1234")
         self.assertTrue(response)
     
-    @patch('SpotifyAPI.oauth.requests.get')
+    @patch('SpotifyAPI.client.requests.get')
     @patch('SpotifyAPI.client.requests.post', MagicMock(side_effect=mocked_request))
     @patch('SpotifyAPI.oauth.SpotifyOAuth.get_redirect_url', MagicMock(return_value="https://fadelafuente.github.io/callback?code=fake_code"))
     def test_05_get_recently_played_tracks(self, mock_oauth_get):
@@ -98,7 +96,7 @@ class TestOAuth(unittest.TestCase):
         response = self.auth.get_recently_played_tracks(after="after")
         self.assertEqual(response["id"], "fake_id")
 
-    @patch('SpotifyAPI.oauth.requests.put')
+    @patch('SpotifyAPI.client.requests.put')
     @patch('SpotifyAPI.client.requests.post', MagicMock(side_effect=mocked_request))
     @patch('SpotifyAPI.oauth.SpotifyOAuth.get_redirect_url', MagicMock(return_value="https://fadelafuente.github.io/callback?code=fake_code"))
     def test_06_add_cover_image(self, mock_oauth_get):
@@ -111,11 +109,20 @@ class TestOAuth(unittest.TestCase):
         self.assertTrue("Image is not a JPEG image." in str(context.exception))
 
         with open('tests/image.jpg', "rb") as image:
-            image_data = base64.b64encode(image.read())  
+            jpeg = image.read()
+        image_data = base64.b64encode(jpeg)
         response = self.auth.add_cover_image("fake_playlist", image_data)
         self.assertTrue(response)
 
-    @patch('SpotifyAPI.oauth.requests.get')
+        # a truncated JPEG and one over the 256 KB limit are rejected before the request
+        mock_oauth_get.reset_mock()
+        with self.assertRaises(ValueError):
+            self.auth.add_cover_image("fake_playlist", base64.b64encode(jpeg[:100]))
+        with self.assertRaises(ValueError):
+            self.auth.add_cover_image("fake_playlist", base64.b64encode(jpeg * 3))
+        mock_oauth_get.assert_not_called()
+
+    @patch('SpotifyAPI.client.requests.get')
     @patch('SpotifyAPI.client.requests.post', MagicMock(side_effect=mocked_request))
     @patch('SpotifyAPI.oauth.SpotifyOAuth.get_redirect_url', MagicMock(return_value="https://fadelafuente.github.io/callback?code=fake_code"))
     def test_07_get_top_items(self, mock_oauth_get):
@@ -126,7 +133,7 @@ class TestOAuth(unittest.TestCase):
         response = self.auth.get_top_items("artists")
         self.assertEqual(response["id"], "fake_id")
 
-    @patch('SpotifyAPI.oauth.requests.delete')
+    @patch('SpotifyAPI.client.requests.delete')
     @patch('SpotifyAPI.client.requests.post', MagicMock(side_effect=mocked_request))
     @patch('SpotifyAPI.oauth.SpotifyOAuth.get_redirect_url', MagicMock(return_value="https://fadelafuente.github.io/callback?code=fake_code"))
     def test_08_unfollow_artists_or_users(self, mock_oauth_get):
@@ -0,0 +1,156 @@
+import threading
+import unittest
+from SpotifyAPI import SpotifyOAuth, PlaybackWatcher, PlaybackQueue
+from unittest.mock import MagicMock
+
+def playback(track_id="a", is_playing=True, progress_ms=0, duration_ms=200000, device_id="d1"):
+    return {"item": {"id": track_id, "duration_ms": duration_ms}, "is_playing": is_playing, "progress_ms": progress_ms,
+            "device": {"id": device_id, "volume_percent": 50}, "context": None, "shuffle_state": False, "repeat_state": "off"}
+
+class TestPlaybackWatcher(unittest.TestCase):
+    def setUp(self):
+        self.watcher = PlaybackWatcher(start=False)
+
+    def tearDown(self):
+        self.watcher.close()
+
+    def test_changes(self):
+        auth = MagicMock()
+        callback = MagicMock()
+        watch = self.watcher.watch(auth, callback, key="user")
+        auth.get_playback.side_effect = [playback(progress_ms=190000), playback(progress_ms=190000), playback("b"), {},
+                                         {"error": {"status": 429}}]
+
+        self.assertAlmostEqual(self.watcher.poll_now(watch), 10.5)
+        self.assertEqual(callback.call_args.args[3][-1], "active")
+        # progress did not move while no time passed, so it is not a seek
+        self.watcher.poll_now(watch)
+        self.assertEqual(callback.call_count, 1)
+        self.watcher.poll_now(watch)
+        self.assertEqual(callback.call_args.args[3], ["item"])
+        self.assertEqual(callback.call_args.args[2]["item"]["id"], "a")
+        self.assertEqual(self.watcher.poll_now(watch), 10)
+        self.assertEqual(callback.call_args.args[3], ["active"])
+        with self.assertRaises(Exception):
+            self.watcher.poll_now(watch)
+        self.assertEqual(callback.call_count, 3)
+
+    def test_missing_scopes(self):
+        auth = MagicMock(spec=SpotifyOAuth)
+        auth.has_required_scopes.return_value = False
+        with self.assertRaises(Exception):
+            self.watcher.watch(auth, MagicMock(), key="user")
+        self.assertEqual(len(self.watcher), 0)
+        auth.has_required_scopes.assert_called_once_with(("user-read-playback-state",))
+
+    def test_seek(self):
+        changes = self.watcher.get_changes(playback(progress_ms=1000), playback(progress_ms=60000), 2)
+        self.assertEqual(changes, ["progress"])
+        self.assertEqual(self.watcher.get_changes(playback(progress_ms=1000), playback(progress_ms=3000), 2), [])
+        paused = playback(is_playing=False, progress_ms=1000)
+        self.assertEqual(self.watcher.get_changes(paused, paused, 30), [])
+
+    def test_next_delay(self):
+        self.assertEqual(self.watcher.get_next_delay(playback(progress_ms=0)), 15)
+        self.assertEqual(self.watcher.get_next_delay(playback(progress_ms=199900)), 1)
+        self.assertEqual(self.watcher.get_next_delay(playback(is_playing=False), 1), 10)
+        self.assertEqual(self.watcher.get_next_delay({}, 0), 10)
+        self.assertEqual(self.watcher.get_next_delay({}, 10), 60)
+
+    def test_scheduler(self):
+        watcher = PlaybackWatcher(min_interval=0.01, idle_interval=0.01, max_idle_interval=0.02)
+        events = []
+        done = threading.Event()
+        def callback(key, state, previous, changes):
+            events.append((key, changes))
+            if len(events) == 4:
+                done.set()
+
+        for i in range(4):
+            auth = MagicMock()
+            auth.get_playback.return_value = {}
+            watcher.watch(auth, callback, key=i)
+        self.assertTrue(done.wait(5))
+        watcher.unwatch(0)
+        watcher.close()
+        self.assertEqual(sorted(key for key, _ in events), [0, 1, 2, 3])
+        self.assertEqual(len(watcher), 3)
+        self.assertTrue(watcher.get_stats()["polls"] >= 3)
+
+    def test_no_content(self):
+        auth = SpotifyOAuth("clid", "clst", "http://localhost/callback")
+        auth.scopes = ["user-read-playback-state"]
+        auth.access_token = "token"
+        auth.get_access_headers = MagicMock(return_value={})
+        auth.session = MagicMock()
+        auth.session.get.return_value.status_code = 204
+        auth.session.get.return_value.content = b""
+        self.assertEqual(auth.get_playback(), {})
+        auth.session.get.return_value.json.assert_not_called()
+
+class TestPlaybackQueue(unittest.TestCase):
+    def setUp(self):
+        self.auth = MagicMock()
+        self.release = threading.Event()
+        self.started = threading.Event()
+        self.calls = []
+        def command(name):
+            def send(device_id=None, **args):
+                # the first command is held so the rest queue up behind it
+                if not self.calls:
+                    self.calls.append((name, device_id, args))
+                    self.started.set()
+                    self.release.wait(5)
+                else:
+                    self.calls.append((name, device_id, args))
+                return True
+            return send
+        for name in ["set_volume", "seek_position", "skip_to_next", "add_item_to_queue", "toggle_shuffle"]:
+            setattr(self.auth, name, MagicMock(side_effect=command(name)))
+
+    def test_coalesce_volume(self):
+        with PlaybackQueue(self.auth) as queue:
+            futures = [queue.set_volume(0)]
+            self.started.wait(5)
+            futures += [queue.set_volume(volume) for volume in range(1, 51)]
+            self.release.set()
+            self.assertTrue(queue.flush(5))
+            self.assertEqual([args["volume_percent"] for _, _, args in self.calls], [0, 50])
+            self.assertTrue(all(future.result() == True for future in futures))
+            self.assertEqual(queue.get_stats(), {"sent": 2, "coalesced": 49, "pending": 0})
+
+    def test_order(self):
+        with PlaybackQueue(self.auth) as queue:
+            queue.toggle_shuffle(True)
+            self.started.wait(5)
+            queue.seek_position(1000)
+            queue.set_volume(10)
+            queue.skip_to_next()
+            queue.seek_position(2000)
+            queue.seek_position(3000)
+            queue.add_item_to_queue("spotify:track:a")
+            queue.set_volume(20)
+            self.release.set()
+            queue.flush(5)
+        self.assertEqual([(name, args) for name, _, args in self.calls],
+                         [("toggle_shuffle", {"state": True}), ("seek_position", {"position_ms": 1000}),
+                          ("skip_to_next", {}), ("seek_position", {"position_ms": 3000}),
+                          ("add_item_to_queue", {"uri": "spotify:track:a"}), ("set_volume", {"volume_percent": 20})])
+
+    def test_devices_and_errors(self):
+        self.auth.skip_to_previous = MagicMock(side_effect=Exception("404"))
+        with PlaybackQueue(self.auth) as queue:
+            queue.set_volume(1, device_id="a")
+            self.started.wait(5)
+            # device b is not held up by device a
+            self.assertEqual(queue.set_volume(2, device_id="b").result(5), True)
+            failed = queue.skip_to_previous(device_id="b")
+            with self.assertRaises(Exception):
+                failed.result(5)
+            self.release.set()
+        self.assertEqual(sorted(device for _, device, _ in self.calls), ["a", "b"])
+        with self.assertRaises(Exception):
+            queue.set_volume(3)
+
+if __name__ == "__main__":
+    unittest.main()
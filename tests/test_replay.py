@@ -0,0 +1,50 @@
+import json
+import os
+import tempfile
+import unittest
+from SpotifyAPI import SpotifyClient, ReplayTransport
+from SpotifyAPI.replay import get_fixture_name
+from benchmarks import bench_client
+
+class TestReplayTransport(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.directory = self.tmp_dir.name
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def write(self, method, url, body):
+        with open(os.path.join(self.directory, get_fixture_name(method, url)), "w") as f:
+            json.dump(body, f)
+
+    def test_fixture_name(self):
+        name = get_fixture_name("get", "https://api.spotify.com/v1/me/tracks?offset=50&limit=50")
+        self.assertEqual(name, "GET_v1_me_tracks@limit=50&offset=50.json")
+
+    def test_replay(self):
+        self.write("GET", "https://api.spotify.com/v1/albums/fake_id", {"id": "fake_id"})
+        self.write("GET", "https://api.spotify.com/v1/albums/gone_id", {"error": {"status": 404, "message": "Not found"}})
+        transport = ReplayTransport(self.directory)
+        client = SpotifyClient("clid", "clst")
+        client.session = transport
+
+        # the query falls back to the file without it
+        self.assertEqual(client.get_album("fake_id", market="US")["id"], "fake_id")
+        self.assertEqual(client.access_token, "replay-token-1")
+        self.assertEqual(transport.get("https://api.spotify.com/v1/albums/gone_id").status_code, 404)
+        self.assertEqual(transport.get("https://api.spotify.com/v1/albums/other_id").status_code, 404)
+        self.assertEqual(transport.put("https://api.spotify.com/v1/me/tracks?ids=a").status_code, 200)
+        self.assertEqual(list(transport.requests)[1], ("GET", "https://api.spotify.com/v1/albums/fake_id?market=US"))
+
+    def test_rate_limit(self):
+        transport = ReplayTransport(self.directory, rate_limit_every=2, retry_after=3)
+        self.assertEqual(transport.get("https://api.spotify.com/v1/markets").status_code, 404)
+        response = transport.get("https://api.spotify.com/v1/markets")
+        self.assertEqual(response.status_code, 429)
+        self.assertEqual(response.headers["Retry-After"], "3")
+        self.assertEqual(response.json()["error"]["status"], 429)
+
+    def test_benchmarks_run(self):
+        results = bench_client.run(number=3)
+        self.assertTrue(all(seconds > 0 for name, seconds, overhead in results))
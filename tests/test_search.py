@@ -0,0 +1,44 @@
+import unittest
+from SpotifyAPI import SpotifyClient, SyntheticCatalog, MockSpotifyServer, search_stream
+from unittest.mock import MagicMock
+
+class TestSearchStream(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.catalog = SyntheticCatalog(artists=60, albums_per_artist=3, tracks_per_album=12, playlists=5)
+        cls.server = MockSpotifyServer(cls.catalog).start_in_thread()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.stop_thread()
+
+    def test_all_pages(self):
+        client = self.server.configure(SpotifyClient("clid", "clst"))
+        results = {}
+        for search_type, item in client.search_stream("e", types=["track", "artist", "show"], max_workers=8):
+            results.setdefault(search_type, []).append(item["id"])
+
+        track_matches = sum(1 for track in self.catalog.tracks.values() if "e" in track["name"].lower())
+        artist_matches = sum(1 for artist in self.catalog.artists.values() if "e" in artist["name"].lower())
+        self.assertTrue(track_matches > 1000)
+        self.assertEqual(len(results["track"]), 1000)
+        self.assertEqual(len(set(results["track"])), 1000)
+        self.assertEqual(len(results["artist"]), artist_matches)
+        self.assertTrue("show" not in results)
+
+    def test_top_k(self):
+        client = self.server.configure(SpotifyClient("clid", "clst"))
+        items = list(search_stream(client, "e", types=["track"], top_k=120))
+        self.assertEqual(len(items), 120)
+
+    def test_dedupe(self):
+        client = MagicMock()
+        pages = {0: ["a", "b"], 2: ["b", None, "c"]}
+        def search(query, search_type, market, limit, offset, include_external):
+            items = [{"id": _id} if _id else None for _id in pages[offset]]
+            return {"albums": {"items": items, "total": 4}}
+        client.search.side_effect = search
+        items = [item["id"] for search_type, item in search_stream(client, "q", types=["album"], limit=2)]
+        self.assertEqual(sorted(items), ["a", "b", "c"])
+        with self.assertRaises(Exception):
+            list(search_stream(client, "q", types=["song"]))
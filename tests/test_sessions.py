@@ -0,0 +1,84 @@
+import threading
+import time
+import unittest
+from SpotifyAPI import SessionManager, UserSession
+from unittest.mock import MagicMock
+
+GET_DICT = {"id": "fake_id", "name": "fake_name", "type": "album"}
+POST_DICT = {"expires_in": 3600, "access_token": "new_access_token"}
+
+def make_mock_response(status_code, return_value):
+    mock_response = MagicMock(status_code=status_code)
+    mock_response.json.return_value = return_value
+    return mock_response
+
+def slow_post(*args, **kwargs):
+    time.sleep(0.05)
+    return make_mock_response(200, POST_DICT)
+
+class TestSessionManager(unittest.TestCase):
+    def test_lru_eviction(self):
+        store = {}
+        manager = SessionManager("clid", "clst", store=store, max_sessions=2, session=MagicMock())
+        for i in range(3):
+            manager.add_user(f"user{i}", "access_token", "refresh_token", 3600, ["user-top-read"])
+        self.assertEqual(len(manager), 2)
+        self.assertEqual(len(store), 3)
+        self.assertFalse("user0" in manager.sessions)
+
+        # evicted users are loaded back from the store
+        self.assertEqual(manager.get_access_token("user0"), "access_token")
+        self.assertFalse("user1" in manager.sessions)
+        self.assertEqual(manager.get_user_session("user0").scopes, ("user-top-read",))
+
+        with self.assertRaises(Exception):
+            manager.get_user_session("fake_user")
+        manager.remove_user("user0")
+        self.assertFalse("user0" in store)
+
+    def test_evicted_session_in_use(self):
+        manager = SessionManager("clid", "clst", max_sessions=1, session=MagicMock())
+        manager.add_user("user0", "access_token", "refresh_token", 3600)
+        user_session = manager.get_user_session("user0")
+        manager.add_user("user1", "access_token", "refresh_token", 3600)
+        self.assertFalse("user0" in manager.sessions)
+        # still held, so the same object (and refresh lock) comes back
+        self.assertIs(manager.get_user_session("user0"), user_session)
+        self.assertEqual(len(manager), 1)
+
+    def test_single_flight_refresh(self):
+        session = MagicMock()
+        session.post.side_effect = slow_post
+        manager = SessionManager("clid", "clst", session=session)
+        manager.add_user("user", None, "refresh_token")
+
+        tokens = []
+        threads = [threading.Thread(target=lambda: tokens.append(manager.get_access_token("user"))) for i in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(tokens, ["new_access_token"] * 8)
+        self.assertEqual(session.post.call_count, 1)
+        self.assertEqual(session.post.call_args.kwargs["data"]["refresh_token"], "refresh_token")
+        self.assertEqual(manager.store["user"][0], "new_access_token")
+
+    def test_client(self):
+        session = MagicMock()
+        session.get.return_value = make_mock_response(200, GET_DICT)
+        manager = SessionManager("clid", "clst", session=session)
+        manager.add_user("user", "access_token", "refresh_token", 3600, ["user-top-read"])
+
+        client = manager.client("user")
+        self.assertEqual(client.get_saved_tracks(), {})
+        response = client.get_top_items("artists")
+        self.assertEqual(response["id"], "fake_id")
+        self.assertEqual(session.get.call_args.kwargs["headers"], {"Authorization": "Bearer access_token"})
+
+    def test_user_session_record(self):
+        user_session = UserSession("user", "access_token", "refresh_token", 10.0, ("a", "b"))
+        record = user_session.to_record()
+        self.assertEqual(record, ("access_token", "refresh_token", 10.0, "a b"))
+        self.assertEqual(UserSession.from_record("user", record).scopes, ("a", "b"))
+        with self.assertRaises(AttributeError):
+            user_session.other = 1
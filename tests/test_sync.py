@@ -0,0 +1,73 @@
+import os
+import tempfile
+import unittest
+from SpotifyAPI import SpotifyOAuth, IncrementalSync
+from unittest.mock import MagicMock
+
+def make_play(track_id, played_at):
+    return {"track": {"id": track_id}, "played_at": played_at}
+
+class TestIncrementalSync(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp_dir.name, "cursors.json")
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_sync_recently_played(self):
+        auth = MagicMock(spec=SpotifyOAuth)
+        auth.get_recently_played_tracks.return_value = {
+            "items": [make_play("t2", "2023-06-25T10:01:00.000Z"), make_play("t1", "2023-06-25T10:00:00.000Z")],
+            "next": None,
+            "cursors": {"after": "1687687260000", "before": "1687687200000"}
+        }
+        sync = IncrementalSync(auth, self.path, user_id="user")
+        plays = sync.sync_recently_played()
+        self.assertEqual([p["track"]["id"] for p in plays], ["t1", "t2"])
+        self.assertEqual(sync.get_cursor("recently-played"), 1687687260000)
+
+        # only plays after the saved cursor are requested
+        auth.get_recently_played_tracks.reset_mock()
+        auth.get_recently_played_tracks.return_value = {"items": [], "next": None, "cursors": None}
+        sync = IncrementalSync(auth, self.path, user_id="user")
+        self.assertEqual(sync.sync_recently_played(), [])
+        auth.get_recently_played_tracks.assert_called_once_with(limit=50, after=1687687260000)
+        self.assertEqual(sync.get_cursor("recently-played"), 1687687260000)
+
+    def test_missing_scopes(self):
+        auth = MagicMock(spec=SpotifyOAuth)
+        auth.has_required_scopes.return_value = False
+        sync = IncrementalSync(auth, self.path, user_id="user")
+        with self.assertRaises(Exception):
+            sync.sync_recently_played()
+        with self.assertRaises(Exception):
+            sync.sync_followed_artists()
+        auth.get_recently_played_tracks.assert_not_called()
+        self.assertEqual(sync.get_cursor("recently-played"), None)
+
+    def test_sync_followed_artists(self):
+        auth = MagicMock(spec=SpotifyOAuth)
+        auth.get_followed_artists.return_value = {"artists": {
+            "items": [{"id": "a1"}, {"id": "a2"}],
+            "next": "https://api.spotify.com/v1/me/following?type=artist&after=a2",
+            "cursors": {"after": "a2"}
+        }}
+        auth.get_page.return_value = {"artists": {"items": [{"id": "a3"}], "next": None, "cursors": {"after": None}}}
+        sync = IncrementalSync(auth, self.path, user_id="user")
+        artists = sync.sync_followed_artists()
+        self.assertEqual([a["id"] for a in artists], ["a1", "a2", "a3"])
+        self.assertEqual(sync.get_cursor("followed-artists"), "a3")
+
+        auth.get_followed_artists.return_value = {"artists": {"items": [], "next": None, "cursors": {"after": None}}}
+        self.assertEqual(sync.sync_followed_artists(), [])
+        auth.get_followed_artists.assert_called_with(after="a3", limit=50)
+
+    def test_user_id_from_profile(self):
+        auth = MagicMock(spec=SpotifyOAuth)
+        auth.get_current_users_profile.return_value = {}
+        with self.assertRaises(Exception):
+            IncrementalSync(auth, self.path).get_cursor("recently-played")
+        auth.get_current_users_profile.return_value = {"id": "user"}
+        sync = IncrementalSync(auth, self.path)
+        self.assertEqual(sync.get_key("recently-played"), "user/recently-played")
@@ -0,0 +1,83 @@
+import unittest
+from SpotifyAPI import SpotifyOAuth, LibraryMembership, WriteBehindQueue
+from unittest.mock import MagicMock
+
+class TestWriteBehindQueue(unittest.TestCase):
+    def test_coalesce_and_cancel(self):
+        auth = MagicMock(spec=SpotifyOAuth)
+        queue = WriteBehindQueue(auth, start=False)
+        queue.save("tracks", "t1")
+        queue.remove("tracks", "t1")
+        queue.save("tracks", ["t2", "t2", "t3"])
+        queue.remove("albums", "al1")
+        queue.save("artists", "ar1")
+        self.assertEqual(len(queue), 4)
+
+        self.assertEqual(queue.flush(), 3)
+        auth.save_tracks.assert_called_once_with(["t2", "t3"])
+        auth.remove_saved_tracks.assert_not_called()
+        auth.remove_saved_albums.assert_called_once_with(["al1"])
+        auth.follow_artists_or_users.assert_called_once_with("artist", ["ar1"])
+        self.assertEqual(len(queue), 0)
+        queue.close()
+
+    def test_batches(self):
+        auth = MagicMock(spec=SpotifyOAuth)
+        queue = WriteBehindQueue(auth, start=False)
+        queue.save("albums", [f"al{i}" for i in range(45)])
+        self.assertEqual(queue.flush(), 3)
+        self.assertEqual([len(call.args[0]) for call in auth.save_albums.call_args_list], [20, 20, 5])
+        queue.close()
+
+    def test_failed_batch_is_requeued(self):
+        auth = MagicMock(spec=SpotifyOAuth)
+        auth.save_tracks.side_effect = [Exception("connection lost"), {"error": {"status": 503, "message": ""}}, True]
+        queue = WriteBehindQueue(auth, start=False)
+        queue.save("tracks", ["t1"])
+        queue.flush()
+        self.assertEqual(len(queue.errors), 1)
+        self.assertEqual(len(queue), 1)
+        # an error response is requeued like an exception
+        queue.flush()
+        self.assertEqual(len(queue.errors), 2)
+        self.assertEqual(len(queue), 1)
+        queue.close()
+        self.assertEqual(auth.save_tracks.call_count, 3)
+        self.assertEqual(len(queue), 0)
+
+    def test_permanent_errors_are_dropped(self):
+        auth = MagicMock(spec=SpotifyOAuth)
+        auth.save_tracks.return_value = {"error": {"status": 400, "message": "Invalid id"}}
+        auth.save_albums.return_value = {}
+        auth.remove_saved_tracks.return_value = {"error": {"status": 503, "message": ""}}
+        membership = LibraryMembership(MagicMock(spec=SpotifyOAuth))
+        queue = WriteBehindQueue(auth, membership=membership, start=False, max_retries=2, max_errors=3)
+        queue.save("tracks", "bad_id")
+        queue.save("albums", "al1")
+        queue.remove("tracks", "t1")
+        queue.flush()
+        # the 400 and the missing scopes are dropped, the 503 is queued again
+        self.assertEqual(len(queue), 1)
+        self.assertEqual(membership.get_bitmap("albums").get("al1"), None)
+        for i in range(3):
+            queue.flush()
+        self.assertEqual(auth.remove_saved_tracks.call_count, 3)
+        self.assertEqual(len(queue), 0)
+        self.assertEqual(len(queue.errors), 3)
+        queue.close()
+
+    def test_membership(self):
+        auth = MagicMock(spec=SpotifyOAuth)
+        auth.save_tracks.return_value = True
+        membership = LibraryMembership(auth)
+        membership.update("tracks", ["t1"], True)
+        with WriteBehindQueue(auth, membership=membership, flush_interval=60) as queue:
+            queue.remove("tracks", "t2")
+            queue.save("tracks", "t2")
+            queue.save("tracks", "t1")
+        auth.save_tracks.assert_called_once_with(["t2"])
+        self.assertTrue(membership.is_saved("tracks", "t2"))
+        membership.close()
+
+        with self.assertRaises(Exception):
+            queue.save("tracks", "t3")